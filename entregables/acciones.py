@@ -0,0 +1,117 @@
+"""
+Acciones masivas sobre los entregables seleccionados en la lista.
+
+La acción y su valor se validan una sola vez para todo el lote; después,
+dentro de una transacción, se aplica un único UPDATE (o DELETE) con
+`pk IN (...)`. Como update() y el borrado directo no emiten señales, se
+recalculan aquí los contadores de los proyectos afectados con una consulta
+agrupada, se invalida el panel y, al borrar, se liberan los archivos tras
+el commit.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import almacenamiento, contadores, dashboard
+from .models import Comentario, Entregable, Miembro
+
+
+ACCIONES = [
+    ('estado', 'Cambiar estado'),
+    ('prioridad', 'Cambiar prioridad'),
+    ('responsable', 'Reasignar responsable'),
+    ('porcentaje', 'Fijar % completado'),
+    ('eliminar', 'Eliminar'),
+]
+MAXIMO_SELECCION = 1000
+
+# Acciones que cambian los contadores desnormalizados de Proyecto
+AFECTAN_CONTADORES = {'estado', 'porcentaje', 'eliminar'}
+
+
+def _responsable(valor):
+    if not valor:
+        return None
+    filtro = {'pk': valor} if valor.isdigit() else {'email__iexact': valor}
+    miembro = Miembro.objects.filter(activo=True, **filtro).values_list('pk', flat=True).first()
+    if miembro is None:
+        raise ValidationError('No existe un miembro activo con ese identificador o email.')
+    return miembro
+
+
+def _porcentaje(valor):
+    try:
+        porcentaje = int(valor)
+    except (TypeError, ValueError):
+        porcentaje = -1
+    if not 0 <= porcentaje <= 100:
+        raise ValidationError('El porcentaje debe ser un número entre 0 y 100.')
+    return porcentaje
+
+
+def validar(accion, valor):
+    """Devuelve los campos a actualizar ({} para eliminar) o lanza ValidationError"""
+    valor = (valor or '').strip()
+    if accion == 'estado':
+        if valor not in dict(Entregable.ESTADOS):
+            raise ValidationError('Estado no válido.')
+        return {'estado': valor}
+    if accion == 'prioridad':
+        if valor not in dict(Entregable.PRIORIDADES):
+            raise ValidationError('Prioridad no válida.')
+        return {'prioridad': valor}
+    if accion == 'responsable':
+        return {'responsable_id': _responsable(valor)}
+    if accion == 'porcentaje':
+        return {'porcentaje_completado': _porcentaje(valor)}
+    if accion == 'eliminar':
+        return {}
+    raise ValidationError('Acción no válida.')
+
+
+def seleccion(ids):
+    """Convierte los ids recibidos en enteros únicos, dentro del máximo permitido"""
+    try:
+        ids = {int(pk) for pk in ids}
+    except (TypeError, ValueError):
+        raise ValidationError('La selección contiene identificadores no válidos.')
+    if not ids:
+        raise ValidationError('No se seleccionó ningún entregable.')
+    if len(ids) > MAXIMO_SELECCION:
+        raise ValidationError(f'Se pueden modificar como máximo {MAXIMO_SELECCION} entregables a la vez.')
+    return sorted(ids)
+
+
+def _eliminar(entregables):
+    # Los comentarios (única relación en cascada) no tienen señales: un solo
+    # DELETE. Los entregables se borran sin el Collector, que cargaría cada
+    # fila para emitir post_delete; su efecto se aplica en ejecutar()
+    Comentario.objects.filter(entregable__in=entregables).delete()
+    return entregables._raw_delete(entregables.db)
+
+
+def ejecutar(ids, accion, valor=''):
+    """Aplica la acción a los entregables `ids` y devuelve cuántas filas se vieron afectadas"""
+    campos = validar(accion, valor)
+    ids = seleccion(ids)
+    entregables = Entregable.objects.filter(pk__in=ids)
+
+    with transaction.atomic():
+        filas = list(entregables.values_list('proyecto_id', 'archivo'))
+        if accion == 'eliminar':
+            afectados = _eliminar(entregables)
+        else:
+            afectados = entregables.update(fecha_modificacion=timezone.now(), **campos)
+
+        if accion in AFECTAN_CONTADORES:
+            contadores.recalcular({proyecto for proyecto, _ in filas})
+        dashboard.invalidar()
+        transaction.on_commit(dashboard.invalidar)
+        if accion == 'eliminar':
+            transaction.on_commit(lambda: _liberar({archivo for _, archivo in filas if archivo}))
+    return afectados
+
+
+def _liberar(archivos):
+    for archivo in archivos:
+        almacenamiento.liberar(archivo)
@@ -1,9 +1,97 @@
+"""
+Administración pensada para tablas grandes.
+
+- `list_select_related`: las columnas de claves foráneas salen del mismo
+  SELECT que la lista, sin una consulta por fila.
+- Claves foráneas con autocompletado, en los formularios
+  (`autocomplete_fields`) y en los filtros (`FiltroAutocompletar`): no se
+  carga la tabla relacionada completa en un <select> ni en la barra lateral.
+- `PaginadorEstimado`: cuenta como mucho LIMITE_CONTEO filas; por encima,
+  sin filtros, estima con MAX(id), y no se hace el COUNT del total sin
+  filtrar (`show_full_result_count = False`).
+- La búsqueda usa el índice FTS5 de busqueda.py (o prefijos sobre índices
+  NOCASE en miembros) en lugar de `icontains`, que recorre la tabla.
+- La jerarquía de fechas (templatetags/admin_rapido.py) salta de un
+  periodo al siguiente por el índice de la fecha en lugar de agrupar todas
+  las filas.
+"""
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from . import busqueda
 from .models import Equipo, Miembro, Proyecto, Entregable, Comentario
 
 
+LIMITE_CONTEO = 10000
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginador con un COUNT acotado a LIMITE_CONTEO + 1 filas. Si hay más y
+    la lista no está filtrada se estima con MAX(id), que SQLite resuelve
+    sobre la clave primaria sin recorrer la tabla; tras borrados la
+    estimación puede sobrar y las últimas páginas salir vacías.
+    """
+
+    @cached_property
+    def count(self):
+        consulta = self.object_list.order_by()
+        acotado = consulta[:LIMITE_CONTEO + 1].count()
+        if acotado <= LIMITE_CONTEO or consulta.query.where:
+            return acotado
+        return max(consulta.aggregate(maximo=Max('pk'))['maximo'] or 0, acotado)
+
+
+class FiltroAutocompletar(admin.RelatedFieldListFilter):
+    """Filtro por clave foránea con un campo de autocompletado en lugar de la lista de todas las opciones"""
+    template = 'admin/entregables/filtro_autocompletar.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        # El widget consulta solo la opción seleccionada
+        return []
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Los valores no válidos no llegan aquí: la lista ya habría fallado al filtrar
+        valor = self.lookup_val[0] if self.lookup_val else None
+        campo = self.field.formfield(widget=AutocompleteSelect(self.field, self.admin_site), required=False)
+        yield {
+            'campo': campo.widget.render(self.lookup_kwarg, valor, attrs={'class': 'filtro-autocompletar'}),
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+        }
+
+
+class AdminRapido(admin.ModelAdmin):
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        if any(isinstance(filtro, tuple) and filtro[1] is FiltroAutocompletar for filtro in self.list_filter):
+            media += AutocompleteSelect(None, self.admin_site).media
+            # Después de jquery.init.js, que define django.jQuery
+            media += forms.Media(js=['admin/js/jquery.init.js', 'js/filtro_autocompletar.js'])
+        return media
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term and self.model.__name__ in busqueda.CAMPOS_INDEXADOS:
+            return busqueda.filtrar_busqueda(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+
 @admin.register(Equipo)
-class EquipoAdmin(admin.ModelAdmin):
+class EquipoAdmin(AdminRapido):
     list_display = ['nombre', 'activo', 'fecha_creacion']
     list_filter = ['activo', 'fecha_creacion']
     search_fields = ['nombre', 'descripcion']
@@ -11,37 +99,50 @@ class EquipoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Miembro)
-class MiembroAdmin(admin.ModelAdmin):
+class MiembroAdmin(AdminRapido):
     list_display = ['nombre', 'email', 'rol', 'equipo', 'activo']
-    list_filter = ['rol', 'activo', 'equipo']
-    search_fields = ['nombre', 'email']
+    list_filter = ['rol', 'activo', ('equipo', FiltroAutocompletar)]
+    list_select_related = ['equipo']
+    autocomplete_fields = ['equipo']
+    # Prefijo del nombre y email exacto: LIKE sobre los índices NOCASE
+    search_fields = ['^nombre', '=email']
     date_hierarchy = 'fecha_ingreso'
+    # Por la columna equipo_id (índice miembro_equipo_nombre_idx), no por el orden de Equipo
+    ordering = ['equipo_id', 'nombre', 'pk']
 
 
 @admin.register(Proyecto)
-class ProyectoAdmin(admin.ModelAdmin):
+class ProyectoAdmin(AdminRapido):
     list_display = ['nombre', 'equipo', 'estado', 'fecha_inicio', 'fecha_fin_estimada']
-    list_filter = ['estado', 'equipo', 'fecha_inicio']
+    list_filter = ['estado', ('equipo', FiltroAutocompletar), 'fecha_inicio']
+    list_select_related = ['equipo']
+    autocomplete_fields = ['equipo']
     search_fields = ['nombre', 'descripcion']
     date_hierarchy = 'fecha_inicio'
 
 
-
-
-
 @admin.register(Entregable)
-class EntregableAdmin(admin.ModelAdmin):
+class EntregableAdmin(AdminRapido):
     list_display = ['titulo', 'proyecto', 'responsable', 'estado', 'prioridad', 'porcentaje_completado', 'fecha_vencimiento']
-    list_filter = ['estado', 'prioridad', 'proyecto', 'fecha_vencimiento']
+    list_filter = ['estado', 'prioridad', ('proyecto', FiltroAutocompletar), 'fecha_vencimiento']
+    list_select_related = ['proyecto', 'responsable']
+    autocomplete_fields = ['proyecto', 'responsable']
     search_fields = ['titulo', 'descripcion']
     date_hierarchy = 'fecha_creacion'
     readonly_fields = ['fecha_creacion']
 
+    def get_queryset(self, request):
+        # str(entregable) incluye el proyecto, también en el autocompletado de
+        # Comentario. La lista solo aplica list_select_related si el queryset
+        # no trae ya un select_related: se incluyen aquí todos
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
 
 @admin.register(Comentario)
-class ComentarioAdmin(admin.ModelAdmin):
+class ComentarioAdmin(AdminRapido):
     list_display = ['autor', 'entregable', 'fecha_creacion']
     list_filter = ['fecha_creacion']
+    list_select_related = ['entregable__proyecto']
+    autocomplete_fields = ['entregable']
     search_fields = ['autor', 'contenido']
     date_hierarchy = 'fecha_creacion'
-
@@ -0,0 +1,112 @@
+"""
+Almacenamiento por contenido para los archivos de los entregables.
+
+`ManejadorSubidaHash` escribe cada subida a un archivo temporal por bloques
+y calcula su SHA-256 mientras tanto, sin cargar el archivo en memoria.
+`AlmacenamientoPorContenido` guarda el archivo como
+<upload_to>/<ab>/<sha256><extensión>: si ya existe un archivo con el mismo
+contenido se reutiliza en lugar de copiarlo otra vez.
+
+Las referencias se cuentan en las propias tablas (entregables, vivos o
+archivados, cuyo `archivo` apunta al blob); `liberar()` borra el blob
+cuando ya nadie lo usa, y las señales la llaman tras el commit al eliminar
+un entregable o reemplazar su archivo.
+
+Un guardado que reutiliza un blob y un `liberar()` del mismo blob pueden
+cruzarse: la fila nueva aún no existe cuando se cuentan las referencias.
+`liberar()` cuenta y borra dentro de una transacción, que con
+transaction_mode IMMEDIATE retiene el bloqueo de escritura, así que ningún
+entregable se confirma entre ambos pasos; y tras el commit de un archivo
+nuevo, `asegurar()` vuelve a escribir el blob si se borró antes.
+"""
+import hashlib
+import logging
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import router, transaction
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+logger = logging.getLogger(__name__)
+
+ALGORITMO = 'sha256'
+
+
+class ManejadorSubidaHash(TemporaryFileUploadHandler):
+    """Escribe la subida en disco por bloques y deja su hash en `archivo.sha256`"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hash = hashlib.new(ALGORITMO)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hash.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        archivo = super().file_complete(file_size)
+        archivo.sha256 = self.hash.hexdigest()
+        return archivo
+
+
+def calcular_hash(contenido):
+    """SHA-256 del contenido, reutilizando el calculado durante la subida si existe"""
+    digest = getattr(contenido, 'sha256', None)
+    if digest:
+        return digest
+    hash_ = hashlib.new(ALGORITMO)
+    for bloque in contenido.chunks():
+        hash_.update(bloque)
+    contenido.seek(0)
+    return hash_.hexdigest()
+
+
+class AlmacenamientoPorContenido(FileSystemStorage):
+    """FileSystemStorage que nombra los archivos por su hash y no duplica contenidos"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        directorio = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        digest = calcular_hash(content)
+        nombre = posixpath.join(directorio, digest[:2], f'{digest}{extension}')
+        if self.exists(nombre):
+            return nombre
+        return super().save(nombre, content, max_length)
+
+    def restaurar(self, nombre, content):
+        """Escribe `content` con el nombre exacto `nombre`"""
+        return super().save(nombre, content)
+
+
+almacenamiento = AlmacenamientoPorContenido()
+
+
+def obtener_almacenamiento():
+    return almacenamiento
+
+
+def liberar(nombre):
+    """Borra el blob si ningún entregable, vivo o archivado, lo referencia"""
+    from .models import Entregable, EntregableArchivado
+
+    if not nombre:
+        return
+    alias = router.db_for_write(Entregable)
+    with transaction.atomic(using=alias):
+        modelos = (Entregable, EntregableArchivado)
+        if not any(modelo.objects.using(alias).filter(archivo=nombre).exists() for modelo in modelos):
+            almacenamiento.delete(nombre)
+
+
+def asegurar(nombre, contenido):
+    """Tras el commit de una subida: reescribe el blob reutilizado si un liberar() lo borró"""
+    if almacenamiento.exists(nombre):
+        return
+    if contenido.closed:
+        logger.error('El blob %s se liberó mientras se guardaba y la subida ya está cerrada', nombre)
+        return
+    contenido.seek(0)
+    almacenamiento.restaurar(nombre, contenido)
@@ -0,0 +1,259 @@
+"""
+API JSON de lectura y escritura para los cinco modelos.
+
+    GET    /api/<recurso>/          lista paginada por cursor
+    GET    /api/<recurso>/?format=ndjson
+                                    exportación completa en streaming (una fila por línea)
+    POST   /api/<recurso>/          crea un registro
+    GET    /api/<recurso>/<pk>/     detalle
+    PUT    /api/<recurso>/<pk>/     reemplaza todos los campos editables
+    PATCH  /api/<recurso>/<pk>/     actualiza solo los campos enviados
+    DELETE /api/<recurso>/<pk>/     elimina
+
+Parámetros de lista: `fields` (selección de campos), `por_pagina`,
+`despues`/`antes` (cursores), `q` (búsqueda) y los filtros de cada recurso.
+
+La lectura es pública. Las escrituras requieren `Authorization: Bearer
+<API_TOKEN>` o una sesión iniciada que envíe el token CSRF en la cabecera
+X-CSRFToken; si no, responden 403 con el error en JSON. Las vistas están
+exentas del middleware CSRF (que respondería con su página HTML) y hacen la
+misma comprobación solo para las sesiones: el token no viaja en una cookie.
+"""
+import hmac
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .busqueda import CAMPOS_INDEXADOS, filtrar_busqueda
+from .models import Equipo, Miembro, Proyecto, Entregable, Comentario
+from .paginacion import PaginadorCursor, tamano_pagina
+
+
+TAMANO_LOTE_STREAMING = 2000
+
+
+class Recurso:
+    """Describe cómo exponer un modelo en la API"""
+
+    def __init__(self, modelo, orden, filtros=()):
+        self.modelo = modelo
+        self.orden = orden
+        self.filtros = filtros
+        campos = [f for f in modelo._meta.concrete_fields]
+        self.campos = [f.name for f in campos]
+        self.campos_editables = [
+            f.name for f in campos
+            if f.editable and not f.primary_key and not isinstance(f, models.FileField)
+        ]
+
+    @property
+    def con_busqueda(self):
+        return self.modelo.__name__ in CAMPOS_INDEXADOS
+
+
+RECURSOS = {
+    'equipos': Recurso(Equipo, 'fecha_creacion', filtros=['activo']),
+    'miembros': Recurso(Miembro, 'fecha_ingreso', filtros=['equipo', 'rol', 'activo']),
+    'proyectos': Recurso(Proyecto, 'fecha_inicio', filtros=['equipo', 'estado']),
+    'entregables': Recurso(Entregable, 'fecha_creacion', filtros=['proyecto', 'responsable', 'estado', 'prioridad']),
+    'comentarios': Recurso(Comentario, 'fecha_creacion', filtros=['entregable']),
+}
+
+
+class ErrorAPI(Exception):
+    def __init__(self, errores, status=400):
+        super().__init__(errores)
+        self.errores = errores
+        self.status = status
+
+
+class NoEncontrado(ErrorAPI):
+    def __init__(self, mensaje='No encontrado.'):
+        super().__init__({'__all__': [mensaje]}, status=404)
+
+
+def _recurso(nombre):
+    try:
+        return RECURSOS[nombre]
+    except KeyError:
+        raise NoEncontrado('Recurso desconocido.')
+
+
+def _respuesta(datos, status=200):
+    return JsonResponse(datos, status=status, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+
+
+def _campos_solicitados(request, recurso):
+    """Campos pedidos con `fields`, validados contra los del modelo"""
+    valor = request.GET.get('fields')
+    if not valor:
+        return list(recurso.campos)
+    campos = [campo.strip() for campo in valor.split(',') if campo.strip()]
+    desconocidos = [campo for campo in campos if campo not in recurso.campos]
+    if desconocidos:
+        raise ErrorAPI({'fields': [f'Campo desconocido: {campo}' for campo in desconocidos]})
+    return campos
+
+
+def _filtrar(request, recurso):
+    queryset = recurso.modelo.objects.all()
+    for nombre in recurso.filtros:
+        valor = request.GET.get(nombre)
+        if valor in (None, ''):
+            continue
+        field = recurso.modelo._meta.get_field(nombre)
+        try:
+            valor = field.target_field.to_python(valor) if field.is_relation else field.to_python(valor)
+        except ValidationError as error:
+            raise ErrorAPI({nombre: error.messages})
+        queryset = queryset.filter(**{nombre: valor})
+    busqueda = request.GET.get('q')
+    if busqueda and recurso.con_busqueda:
+        queryset = filtrar_busqueda(queryset, busqueda)
+    return queryset
+
+
+def _quiere_ndjson(request):
+    return (
+        request.GET.get('format') == 'ndjson'
+        or 'application/x-ndjson' in request.headers.get('Accept', '')
+    )
+
+
+def _filas_ndjson(queryset, campos):
+    for fila in queryset.values(*campos).iterator(chunk_size=TAMANO_LOTE_STREAMING):
+        yield json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def _leer_json(request):
+    try:
+        datos = json.loads(request.body or b'{}')
+    except (UnicodeDecodeError, ValueError):
+        raise ErrorAPI({'__all__': ['El cuerpo no es JSON válido.']})
+    if not isinstance(datos, dict):
+        raise ErrorAPI({'__all__': ['Se esperaba un objeto JSON.']})
+    return datos
+
+
+def _guardar(recurso, instancia, datos, parcial):
+    """Asigna `datos` a la instancia, valida y guarda"""
+    desconocidos = [campo for campo in datos if campo not in recurso.campos_editables]
+    if desconocidos:
+        raise ErrorAPI({campo: ['Campo desconocido o de solo lectura.'] for campo in desconocidos})
+    if not parcial:
+        faltantes = [
+            campo for campo in recurso.campos_editables
+            if campo not in datos and not recurso.modelo._meta.get_field(campo).has_default()
+            and not recurso.modelo._meta.get_field(campo).null
+        ]
+        if faltantes:
+            raise ErrorAPI({campo: ['Este campo es obligatorio.'] for campo in faltantes})
+    for campo, valor in datos.items():
+        field = recurso.modelo._meta.get_field(campo)
+        setattr(instancia, field.attname, valor)
+    # Los campos nulos vacíos se aceptan igual que en los formularios HTML
+    vacios = [
+        f.name for f in instancia._meta.concrete_fields
+        if f.null and getattr(instancia, f.attname) is None
+    ]
+    try:
+        instancia.full_clean(exclude=vacios)
+    except ValidationError as error:
+        raise ErrorAPI(error.message_dict)
+    instancia.save()
+    return instancia
+
+
+def _con_token(request):
+    token = getattr(settings, 'API_TOKEN', '')
+    esquema, _, enviado = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and esquema.lower() == 'bearer' and hmac.compare_digest(enviado.strip().encode(), token.encode())
+
+
+def _autorizar(request):
+    """Las escrituras requieren el token de la API o una sesión con token CSRF válido"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or _con_token(request):
+        return
+    if not request.user.is_authenticated:
+        raise ErrorAPI({'__all__': ['Se requiere autenticación.']}, status=403)
+    # process_view devuelve la respuesta de rechazo, o None si el token es válido
+    if CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {}) is not None:
+        raise ErrorAPI({'__all__': ['Token CSRF ausente o incorrecto.']}, status=403)
+
+
+def _detalle(recurso, pk, campos=None):
+    return recurso.modelo.objects.filter(pk=pk).values(*(campos or recurso.campos)).first()
+
+
+def _manejar_errores(vista):
+    """Autoriza la petición y convierte los ErrorAPI en respuestas JSON"""
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        try:
+            _autorizar(request)
+            return vista(request, *args, **kwargs)
+        except ErrorAPI as error:
+            return _respuesta({'errors': error.errores}, status=error.status)
+    return envoltura
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+@_manejar_errores
+def lista(request, recurso):
+    """Lista paginada (o exportación NDJSON) y creación"""
+    recurso = _recurso(recurso)
+
+    if request.method == 'POST':
+        instancia = _guardar(recurso, recurso.modelo(), _leer_json(request), parcial=False)
+        return _respuesta(_detalle(recurso, instancia.pk), status=201)
+
+    campos = _campos_solicitados(request, recurso)
+    queryset = _filtrar(request, recurso)
+
+    if _quiere_ndjson(request):
+        queryset = queryset.order_by(f'-{recurso.orden}', '-pk')
+        return StreamingHttpResponse(_filas_ndjson(queryset, campos), content_type='application/x-ndjson')
+
+    # El campo de orden y el id se consultan siempre para construir los cursores
+    consulta = list(dict.fromkeys(campos + [recurso.orden, 'id']))
+    paginador = PaginadorCursor(queryset.values(*consulta), recurso.orden, tamano_pagina(request))
+    pagina = paginador.pagina(despues=request.GET.get('despues'), antes=request.GET.get('antes'))
+    return _respuesta({
+        'results': [{campo: fila[campo] for campo in campos} for fila in pagina],
+        'next': pagina.cursor_siguiente,
+        'previous': pagina.cursor_anterior,
+    })
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'PUT', 'PATCH', 'DELETE'])
+@_manejar_errores
+def detalle(request, recurso, pk):
+    """Lectura, actualización y eliminación de un registro"""
+    recurso = _recurso(recurso)
+
+    if request.method == 'GET':
+        fila = _detalle(recurso, pk, _campos_solicitados(request, recurso))
+        if fila is None:
+            raise NoEncontrado()
+        return _respuesta(fila)
+
+    try:
+        instancia = recurso.modelo.objects.get(pk=pk)
+    except recurso.modelo.DoesNotExist:
+        raise NoEncontrado()
+    if request.method == 'DELETE':
+        instancia.delete()
+        return HttpResponse(status=204)
+
+    _guardar(recurso, instancia, _leer_json(request), parcial=request.method == 'PATCH')
+    return _respuesta(_detalle(recurso, instancia.pk))
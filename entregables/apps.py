@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def asegurar_triggers_busqueda(sender, using, **kwargs):
+    from . import busqueda
+    busqueda.asegurar_triggers(connections[using])
+
+
+def asegurar_triggers_versiones(sender, using, **kwargs):
+    from . import versiones
+    versiones.asegurar_triggers(connections[using])
 
 
 class EntregablesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'entregables'
+
+    def ready(self):
+        from . import metricas, signals  # noqa: F401
+        post_migrate.connect(asegurar_triggers_busqueda, sender=self)
+        post_migrate.connect(asegurar_triggers_versiones, sender=self)
+        connection_created.connect(metricas.instalar, dispatch_uid='entregables.metricas')
@@ -0,0 +1,127 @@
+"""
+Archivo de proyectos terminados.
+
+Los proyectos completados o cancelados que llevan `dias` sin cambios se
+mueven, con sus entregables y comentarios, a las tablas de archivo
+(ProyectoArchivado, EntregableArchivado, ComentarioArchivado). Así las
+listas, la búsqueda FTS, el panel y la API solo recorren los registros
+vivos, y sus tablas e índices no crecen con el histórico.
+
+Cada lote de proyectos se copia con INSERT ... SELECT y se borra de las
+tablas de origen dentro de una misma transacción, sin cargar filas en
+Python ni emitir señales; `restaurar()` hace el camino inverso y recalcula
+los contadores de los proyectos devueltos. Los ids se conservan, de modo que
+las URL siguen valiendo: el detalle de un entregable y las listas con
+`?archivados=1` leen del archivo a demanda.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import connections, router, transaction
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+
+from . import contadores, dashboard
+from .models import (
+    Comentario, ComentarioArchivado, Entregable, EntregableArchivado, Proyecto, ProyectoArchivado,
+)
+
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_ARCHIVABLES = ['completado', 'cancelado']
+DIAS = 90
+LOTE = 100
+
+NIVELES = ['proyectos', 'entregables', 'comentarios']
+VIVOS = [Proyecto, Entregable, Comentario]
+ARCHIVADOS = [ProyectoArchivado, EntregableArchivado, ComentarioArchivado]
+
+
+def _registrar(movidos):
+    logger.info('Archivo: %s', ', '.join(f'{cantidad} {nivel}' for nivel, cantidad in movidos.items()))
+
+
+def archivables(dias=DIAS):
+    """Proyectos completados o cancelados sin cambios en los últimos `dias` días"""
+    limite = timezone.now() - timedelta(days=dias)
+    return Proyecto.objects.filter(estado__in=ESTADOS_ARCHIVABLES, fecha_modificacion__lt=limite)
+
+
+def columnas_comunes(origen, destino):
+    """(atributo en origen, columna) de las columnas de `destino` que también tiene `origen`"""
+    columnas = {campo.column: campo.attname for campo in origen._meta.concrete_fields}
+    return [(columnas[campo.column], campo.column) for campo in destino._meta.concrete_fields if campo.column in columnas]
+
+
+def _copiar(consulta, destino):
+    """INSERT INTO destino (...) SELECT ... con las filas de `consulta`; devuelve cuántas"""
+    conexion = connections[router.db_for_write(destino)]
+    comunes = columnas_comunes(consulta.model, destino)
+    select = consulta.order_by().values_list(*(atributo for atributo, _ in comunes))
+    sql, params = select.query.get_compiler(conexion.alias).as_sql()
+    columnas = ', '.join(conexion.ops.quote_name(columna) for _, columna in comunes)
+    with conexion.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {conexion.ops.quote_name(destino._meta.db_table)} ({columnas}) {sql}', params)
+        return cursor.rowcount
+
+
+def _mover(ids, origenes, destinos):
+    """Copia los proyectos `ids` con su contenido de `origenes` a `destinos` y los borra del origen"""
+    proyecto, entregable, comentario = origenes
+    consultas = [
+        proyecto.objects.filter(pk__in=ids),
+        entregable.objects.filter(proyecto__in=ids),
+        comentario.objects.filter(entregable__proyecto__in=ids),
+    ]
+    # De arriba abajo al copiar y de abajo arriba al borrar: las claves foráneas siempre apuntan a una fila
+    movidos = [_copiar(consulta, destino) for consulta, destino in zip(consultas, destinos)]
+    for consulta in reversed(consultas):
+        consulta._raw_delete(consulta.db)
+    return movidos
+
+
+def _por_lotes(candidatos, origenes, destinos, lote, progreso, al_mover=None):
+    totales = dict.fromkeys(NIVELES, 0)
+    candidatos = candidatos.order_by('pk').values_list('pk', flat=True)
+    while True:
+        with transaction.atomic():
+            ids = list(candidatos[:lote])
+            if ids:
+                for nivel, cantidad in zip(NIVELES, _mover(ids, origenes, destinos)):
+                    totales[nivel] += cantidad
+                if al_mover:
+                    al_mover(ids)
+        if ids:
+            progreso(dict(totales))
+        if len(ids) < lote:
+            break
+    if totales['proyectos']:
+        dashboard.invalidar()
+        transaction.on_commit(dashboard.invalidar)
+    return totales
+
+
+def archivar(dias=DIAS, lote=LOTE, progreso=_registrar):
+    """Mueve al archivo los proyectos archivables, `lote` proyectos por transacción"""
+    return _por_lotes(archivables(dias), VIVOS, ARCHIVADOS, lote, progreso)
+
+
+def restaurar(proyectos=None, lote=LOTE, progreso=_registrar):
+    """Devuelve a las tablas vivas los proyectos archivados `proyectos` (por defecto, todos)"""
+    candidatos = ProyectoArchivado.objects.all()
+    if proyectos is not None:
+        candidatos = candidatos.filter(pk__in=proyectos)
+    # Los vencidos pueden haber cambiado mientras estaban archivados
+    return _por_lotes(candidatos, ARCHIVADOS, VIVOS, lote, progreso, al_mover=contadores.recalcular)
+
+
+def obtener(vivos, archivados, pk):
+    """El registro `pk` de `vivos` o, si no está, de `archivados`; el archivo solo se consulta si falta"""
+    objeto = vivos.filter(pk=pk).first()
+    return objeto if objeto is not None else get_object_or_404(archivados, pk=pk)
+
+
+async def aobtener(vivos, archivados, pk):
+    objeto = await vivos.filter(pk=pk).afirst()
+    return objeto if objeto is not None else await aget_object_or_404(archivados, pk=pk)
@@ -0,0 +1,91 @@
+"""
+Autocompletado de proyectos, miembros y equipos para los formularios.
+
+Los formularios ya no incluyen todas las opciones: piden al escribir
+/autocompletar/<fuente>/?q=<prefijo> y reciben como mucho `limite`
+resultados. La búsqueda es por prefijo del nombre (LIKE 'prefijo%'), que
+SQLite resuelve como un rango sobre los índices `nombre COLLATE NOCASE` (en
+miembros y equipos, parciales sobre los activos) ya ordenados por nombre,
+así que el coste no depende del tamaño de la tabla. Cada respuesta se guarda
+unos segundos en la caché.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Collate
+from django.http import Http404, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+from .models import Equipo, Miembro, Proyecto
+
+
+LIMITE_DEFECTO = 10
+LIMITE_MAXIMO = 25
+LONGITUD_MAXIMA = 100
+
+
+@dataclass(frozen=True)
+class Fuente:
+    modelo: type
+    campos: tuple = ('nombre',)
+    solo_activos: bool = False
+
+    def texto(self, fila):
+        return fila['nombre']
+
+
+class FuenteMiembros(Fuente):
+    def texto(self, fila):
+        return f"{fila['nombre']} ({dict(Miembro.ROLES).get(fila['rol'], fila['rol'])})"
+
+
+FUENTES = {
+    'proyectos': Fuente(Proyecto),
+    'miembros': FuenteMiembros(Miembro, ('nombre', 'rol'), solo_activos=True),
+    'equipos': Fuente(Equipo, solo_activos=True),
+}
+
+
+def _limite(valor):
+    try:
+        return min(max(int(valor), 1), LIMITE_MAXIMO)
+    except (TypeError, ValueError):
+        return LIMITE_DEFECTO
+
+
+def buscar(fuente, prefijo, limite=LIMITE_DEFECTO):
+    """Lista de {id, texto} cuyo nombre empieza por `prefijo`, en orden alfabético"""
+    queryset = fuente.modelo.objects.all()
+    if fuente.solo_activos:
+        queryset = queryset.filter(activo=True)
+    if prefijo:
+        queryset = queryset.filter(nombre__istartswith=prefijo)
+    # Mismo orden que el índice: sin ordenar en un B-tree temporal
+    filas = queryset.order_by(Collate('nombre', 'nocase')).values('pk', *fuente.campos)[:limite]
+    return [{'id': fila['pk'], 'texto': fuente.texto(fila)} for fila in filas]
+
+
+@require_safe
+def autocompletar(request, fuente):
+    """Opciones de un campo de formulario que empiezan por `q`"""
+    if fuente not in FUENTES:
+        raise Http404('Fuente de autocompletado no válida.')
+    prefijo = request.GET.get('q', '').strip()[:LONGITUD_MAXIMA]
+    limite = _limite(request.GET.get('limite', LIMITE_DEFECTO))
+
+    timeout = settings.AUTOCOMPLETAR_CACHE_TIMEOUT
+    clave = 'autocompletar:%s:%s:%s' % (
+        fuente, limite, hashlib.md5(prefijo.encode(), usedforsecurity=False).hexdigest(),
+    )
+    resultados = cache.get(clave) if timeout else None
+    if resultados is None:
+        resultados = buscar(FUENTES[fuente], prefijo, limite)
+        if timeout:
+            cache.set(clave, resultados, timeout)
+
+    respuesta = JsonResponse({'resultados': resultados})
+    patch_cache_control(respuesta, private=True, max_age=timeout)
+    return respuesta
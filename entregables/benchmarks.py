@@ -0,0 +1,296 @@
+"""
+Benchmark de las rutas de entregables/urls.py.
+
+Cada ruta se ejecuta con el cliente de pruebas de Django contra la base de
+datos configurada; para las rutas con parámetros se usa un registro
+existente. Por ruta se registran el tiempo (mediana, mínimo y máximo), el
+número de consultas y el pico de memoria de Python (tracemalloc, en una
+pasada aparte para no distorsionar los tiempos).
+
+`comparar_wsgi_asgi` mide las vistas con versión asíncrona por las dos vías
+(WSGIHandler con las vistas síncronas, ASGIHandler con las de
+vistas_async.py) y devuelve los percentiles 50 y 99 de la latencia.
+
+`comparar_fragmentos` mide las listas con filas en la caché de fragmentos
+sin esa caché, con la caché vacía y con las filas ya guardadas.
+"""
+import asyncio
+import json
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import urls as urls_app
+from .api import RECURSOS
+from .models import Equipo, Proyecto, Entregable
+from .paginacion import TAMANOS_PAGINA
+
+
+# Prefijo del nombre de la ruta -> modelo del que se toma el pk
+MODELOS_POR_PREFIJO = {
+    'equipo': Equipo,
+    'proyecto': Proyecto,
+    'entregable': Entregable,
+}
+
+# Rutas que necesitan un registro con datos concretos
+FILTROS_POR_RUTA = {
+    'entregable_archivo': {'archivo__gt': ''},
+}
+
+# Rutas que solo aceptan POST: no se miden
+RUTAS_SOLO_POST = {'entregable_acciones'}
+
+METRICAS_COMPARADAS = ['tiempo_mediana_ms', 'consultas', 'memoria_pico_kb']
+
+# Rutas con versión asíncrona y la URLconf de cada vía
+RUTAS_ASYNC = ['index', 'entregable_list', 'entregable_detail']
+URLCONF_WSGI = 'gestion_entregables.urls'
+URLCONF_ASGI = 'gestion_entregables.urls_asgi'
+
+# Listas cuyas filas se guardan en la caché de fragmentos
+RUTAS_FRAGMENTOS = ['entregable_list', 'proyecto_list']
+SIN_FRAGMENTOS = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+
+def _primer_pk(modelo, **filtros):
+    return modelo.objects.filter(**filtros).values_list('pk', flat=True).first()
+
+
+def casos():
+    """Genera (nombre, url) para cada ruta; omite las que no tienen registros con qué resolverse"""
+    for patron in urls_app.urlpatterns:
+        nombre = patron.name
+        if nombre in RUTAS_SOLO_POST:
+            continue
+        parametros = set(patron.pattern.converters)
+        if not parametros:
+            yield nombre, reverse(nombre)
+        elif 'recurso' in parametros:
+            for recurso, definicion in RECURSOS.items():
+                kwargs = {'recurso': recurso}
+                if 'pk' in parametros:
+                    kwargs['pk'] = _primer_pk(definicion.modelo)
+                    if kwargs['pk'] is None:
+                        continue
+                yield f'{nombre}:{recurso}', reverse(nombre, kwargs=kwargs)
+        elif parametros == {'pk'}:
+            modelo = MODELOS_POR_PREFIJO.get(nombre.split('_')[0])
+            pk = _primer_pk(modelo, **FILTROS_POR_RUTA.get(nombre, {})) if modelo else None
+            if pk is not None:
+                yield nombre, reverse(nombre, kwargs={'pk': pk})
+
+
+def _pedir(cliente, url, en_frio):
+    if en_frio:
+        cache.clear()
+    respuesta = cliente.get(url)
+    # Consumir el cuerpo para medir también las respuestas en streaming
+    if respuesta.streaming:
+        for _ in respuesta.streaming_content:
+            pass
+    return respuesta
+
+
+def medir(cliente, url, repeticiones=5, en_frio=False):
+    """Mide una URL; la primera petición calienta cachés y no se cuenta"""
+    respuesta = _pedir(cliente, url, en_frio)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _pedir(cliente, url, en_frio)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    with CaptureQueriesContext(connection) as contexto:
+        _pedir(cliente, url, en_frio)
+    # Se lee ya: la siguiente petición vacía el registro de consultas (reset_queries)
+    consultas = len(contexto)
+
+    tracemalloc.start()
+    try:
+        _pedir(cliente, url, en_frio)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'url': url,
+        'status': respuesta.status_code,
+        'tiempo_mediana_ms': round(statistics.median(tiempos), 3),
+        'tiempo_min_ms': round(min(tiempos), 3),
+        'tiempo_max_ms': round(max(tiempos), 3),
+        'consultas': consultas,
+        'memoria_pico_kb': round(pico / 1024, 1),
+    }
+
+
+def ejecutar(repeticiones=5, en_frio=False, filtro=None):
+    """Ejecuta el benchmark y devuelve el informe como diccionario"""
+    cliente = Client(SERVER_NAME='localhost')
+    resultados = {}
+    for nombre, url in casos():
+        if filtro and filtro not in nombre:
+            continue
+        resultados[nombre] = medir(cliente, url, repeticiones, en_frio)
+    return {
+        'fecha': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base_de_datos': connection.vendor,
+        'filas': {modelo.__name__: modelo.objects.count() for modelo in MODELOS_POR_PREFIJO.values()},
+        'repeticiones': repeticiones,
+        'en_frio': en_frio,
+        'resultados': resultados,
+    }
+
+
+def comparar(anterior, actual):
+    """Devuelve filas (ruta, métrica, antes, después, variación %) entre dos informes"""
+    filas = []
+    for nombre, datos in actual['resultados'].items():
+        previo = anterior.get('resultados', {}).get(nombre)
+        if previo is None:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            antes, despues = previo.get(metrica), datos.get(metrica)
+            if antes is None or despues is None:
+                continue
+            variacion = ((despues - antes) / antes * 100) if antes else 0.0
+            filas.append((nombre, metrica, antes, despues, variacion))
+    return filas
+
+
+def guardar(informe, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def percentil(valores, p):
+    """Percentil por el método del rango más cercano"""
+    ordenados = sorted(valores)
+    return ordenados[max(math.ceil(p / 100 * len(ordenados)) - 1, 0)]
+
+
+def _repartir(repeticiones, concurrencia):
+    return [repeticiones // concurrencia + (1 if i < repeticiones % concurrencia else 0) for i in range(concurrencia)]
+
+
+def _latencias_wsgi(url, repeticiones, concurrencia, en_frio):
+    def trabajador(veces):
+        cliente = Client(SERVER_NAME='localhost')
+        tiempos = []
+        for _ in range(veces):
+            inicio = time.perf_counter()
+            _pedir(cliente, url, en_frio)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return tiempos
+
+    if concurrencia == 1:
+        return trabajador(repeticiones)
+    with ThreadPoolExecutor(concurrencia) as ejecutor:
+        return [t for tiempos in ejecutor.map(trabajador, _repartir(repeticiones, concurrencia)) for t in tiempos]
+
+
+async def _latencias_asgi(url, repeticiones, concurrencia, en_frio):
+    async def trabajador(veces):
+        cliente = AsyncClient(SERVER_NAME='localhost')
+        tiempos = []
+        for _ in range(veces):
+            if en_frio:
+                await cache.aclear()
+            inicio = time.perf_counter()
+            await cliente.get(url)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return tiempos
+
+    resultados = await asyncio.gather(*(trabajador(veces) for veces in _repartir(repeticiones, concurrencia)))
+    return [t for tiempos in resultados for t in tiempos]
+
+
+def _resumen(tiempos):
+    return {
+        'p50_ms': round(percentil(tiempos, 50), 3),
+        'p99_ms': round(percentil(tiempos, 99), 3),
+        'peticiones': len(tiempos),
+    }
+
+
+def comparar_wsgi_asgi(repeticiones=50, concurrencia=1, en_frio=False):
+    """Latencias p50/p99 de las rutas con versión asíncrona, por WSGI y por ASGI"""
+    urls = {nombre: url for nombre, url in casos() if nombre in RUTAS_ASYNC}
+    resultados = {}
+    for nombre, url in urls.items():
+        with override_settings(ROOT_URLCONF=URLCONF_WSGI):
+            _pedir(Client(SERVER_NAME='localhost'), url, en_frio)
+            wsgi = _latencias_wsgi(url, repeticiones, concurrencia, en_frio)
+        with override_settings(ROOT_URLCONF=URLCONF_ASGI):
+            # async_to_sync: las consultas se ejecutan en este hilo, como con WSGI
+            asgi = async_to_sync(_latencias_asgi)(url, repeticiones, concurrencia, en_frio)
+        resultados[nombre] = {'url': url, 'wsgi': _resumen(wsgi), 'asgi': _resumen(asgi)}
+    return {
+        'fecha': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'repeticiones': repeticiones,
+        'concurrencia': concurrencia,
+        'en_frio': en_frio,
+        'resultados': resultados,
+    }
+
+
+def _mediana_ms(cliente, url, repeticiones, preparar=None):
+    _pedir(cliente, url, False)
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        _pedir(cliente, url, False)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tiempos), 3)
+
+
+def comparar_fragmentos(repeticiones=20):
+    """Mediana de cada lista (página más grande) sin caché de fragmentos, en frío y en caliente"""
+    cliente = Client(SERVER_NAME='localhost')
+    url_pagina = f'?por_pagina={max(TAMANOS_PAGINA)}'
+    resultados = {}
+    for nombre in RUTAS_FRAGMENTOS:
+        url = reverse(nombre) + url_pagina
+        with override_settings(CACHES={**settings.CACHES, 'fragmentos': SIN_FRAGMENTOS}):
+            sin_cache = _mediana_ms(cliente, url, repeticiones)
+        en_frio = _mediana_ms(cliente, url, repeticiones, preparar=lambda: caches['fragmentos'].clear())
+        en_caliente = _mediana_ms(cliente, url, repeticiones)
+        resultados[nombre] = {
+            'url': url,
+            'sin_cache_ms': sin_cache,
+            'en_frio_ms': en_frio,
+            'en_caliente_ms': en_caliente,
+            'reduccion_pct': round((sin_cache - en_caliente) / sin_cache * 100, 1) if sin_cache else 0.0,
+        }
+    return {
+        'fecha': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'filas': {modelo.__name__: modelo.objects.count() for modelo in MODELOS_POR_PREFIJO.values()},
+        'repeticiones': repeticiones,
+        'resultados': resultados,
+    }
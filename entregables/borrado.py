@@ -0,0 +1,181 @@
+"""
+Borrado en cascada de equipos y proyectos por lotes.
+
+`Model.delete()` carga en memoria cada proyecto, entregable y comentario
+dependiente para emitir sus señales y los borra en una sola transacción,
+que retiene el bloqueo de escritura de SQLite mientras dura. Aquí se borra
+de abajo arriba, nivel por nivel (comentarios, entregables y proyectos,
+vivos y archivados, miembros y al final el propio registro), con un
+DELETE ... WHERE pk IN (...) de como mucho `lote` filas por transacción:
+entre lote y lote pueden escribir otras peticiones. Como cada nivel se
+vacía antes que el superior, una interrupción no deja referencias
+colgantes y basta con repetir el borrado.
+
+De las filas solo se leen las claves y las rutas de los adjuntos, que se
+liberan al terminar en un hilo en segundo plano. Los triggers de FTS y de
+versiones se disparan por fila como en cualquier DELETE; las señales no, así
+que el panel se invalida aquí. Los contadores de Proyecto no cambian: los
+entregables solo desaparecen junto con su proyecto.
+"""
+import logging
+import threading
+
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import almacenamiento, dashboard
+from .models import (
+    Comentario, ComentarioArchivado, Entregable, EntregableArchivado, Equipo, Miembro, Proyecto, ProyectoArchivado,
+)
+
+
+logger = logging.getLogger(__name__)
+
+LOTE = 1000
+LIMITE_CONTEO = 10000
+
+
+def _registrar(nivel, borrados):
+    logger.info('Borrado en cascada: %s %s', borrados, nivel)
+
+
+def _borrar(nivel, consulta, lote, progreso, archivos=None):
+    """Borra las filas de `consulta` de `lote` en `lote`; devuelve cuántas"""
+    modelo = consulta.model
+    columnas = ['pk', 'archivo'] if archivos is not None else ['pk']
+    consulta = consulta.order_by().values_list(*columnas)
+    total = 0
+    while True:
+        with transaction.atomic():
+            filas = list(consulta[:lote])
+            if archivos is not None:
+                archivos.update(archivo for _, archivo in filas if archivo)
+            # Sin el Collector: no carga los objetos para emitir señales
+            seleccion = modelo.objects.filter(pk__in=[fila[0] for fila in filas])
+            borrados = seleccion._raw_delete(seleccion.db) if filas else 0
+        total += borrados
+        if borrados:
+            progreso(nivel, total)
+        if len(filas) < lote:
+            return total
+
+
+def _desasignar(modelo, miembros, lote, progreso):
+    # SET_NULL de responsable (entregables de otros equipos). Se toca
+    # fecha_modificacion para que la caché de fragmentos no muestre al
+    # miembro borrado
+    asignados = modelo.objects.filter(responsable__in=miembros).order_by().values('pk')
+    total = 0
+    while True:
+        with transaction.atomic():
+            actualizados = modelo.objects.filter(pk__in=asignados[:lote]).update(
+                responsable=None, fecha_modificacion=timezone.now(),
+            )
+        total += actualizados
+        if actualizados:
+            progreso('entregables desasignados', total)
+        if actualizados < lote:
+            return total
+
+
+def _vaciar_proyectos(proyectos, lote, progreso, archivos, comentario=Comentario, entregable=Entregable):
+    return {
+        'comentarios': _borrar(
+            'comentarios', comentario.objects.filter(entregable__proyecto__in=proyectos), lote, progreso,
+        ),
+        'entregables': _borrar(
+            'entregables', entregable.objects.filter(proyecto__in=proyectos), lote, progreso, archivos,
+        ),
+    }
+
+
+def _terminar(borrados, archivos, segundo_plano):
+    dashboard.invalidar()
+    transaction.on_commit(dashboard.invalidar)
+    if archivos:
+        liberar = liberar_en_segundo_plano if segundo_plano else liberar_archivos
+        transaction.on_commit(lambda: liberar(archivos))
+    return borrados
+
+
+def eliminar_proyecto(proyecto, lote=LOTE, progreso=_registrar, segundo_plano=True):
+    """Borra el proyecto con sus entregables y comentarios; devuelve las filas borradas por nivel"""
+    pk = getattr(proyecto, 'pk', proyecto)
+    archivos = set()
+    proyectos = Proyecto.objects.filter(pk=pk).values('pk')
+    borrados = _vaciar_proyectos(proyectos, lote, progreso, archivos)
+    borrados['proyectos'] = _borrar('proyectos', Proyecto.objects.filter(pk=pk), lote, progreso)
+    return _terminar(borrados, archivos, segundo_plano)
+
+
+def eliminar_equipo(equipo, lote=LOTE, progreso=_registrar, segundo_plano=True):
+    """Borra el equipo con sus miembros, proyectos, entregables y comentarios"""
+    pk = getattr(equipo, 'pk', equipo)
+    archivos = set()
+    proyectos = Proyecto.objects.filter(equipo=pk)
+    miembros = Miembro.objects.filter(equipo=pk)
+    borrados = _vaciar_proyectos(proyectos.values('pk'), lote, progreso, archivos)
+    borrados['proyectos'] = _borrar('proyectos', proyectos, lote, progreso)
+
+    # Proyectos archivados (archivado.py), por el mismo camino
+    archivados = ProyectoArchivado.objects.filter(equipo=pk)
+    vaciados = _vaciar_proyectos(
+        archivados.values('pk'), lote, progreso, archivos, ComentarioArchivado, EntregableArchivado,
+    )
+    for nivel, cantidad in vaciados.items():
+        borrados[nivel] += cantidad
+    borrados['proyectos_archivados'] = _borrar('proyectos archivados', archivados, lote, progreso)
+
+    for modelo in (Entregable, EntregableArchivado):
+        _desasignar(modelo, miembros.values('pk'), lote, progreso)
+    borrados['miembros'] = _borrar('miembros', miembros, lote, progreso)
+    borrados['equipos'] = _borrar('equipos', Equipo.objects.filter(pk=pk), lote, progreso)
+    return _terminar(borrados, archivos, segundo_plano)
+
+
+def liberar_archivos(archivos):
+    for archivo in archivos:
+        almacenamiento.liberar(archivo)
+
+
+def liberar_en_segundo_plano(archivos):
+    """Libera los blobs en un hilo, sin hacer esperar a la petición; devuelve el hilo"""
+    def liberar():
+        try:
+            liberar_archivos(archivos)
+        except Exception:
+            # Quedan blobs huérfanos en disco, pero ningún entregable los referencia
+            logger.exception('No se pudieron liberar %s archivos', len(archivos))
+        finally:
+            connections.close_all()
+
+    hilo = threading.Thread(target=liberar, name='liberar-archivos', daemon=True)
+    hilo.start()
+    return hilo
+
+
+def _acotado(consulta):
+    # COUNT sobre como mucho LIMITE_CONTEO + 1 filas del índice de la clave foránea
+    return consulta.order_by()[:LIMITE_CONTEO + 1].count()
+
+
+def estimar_proyecto(proyecto):
+    """Filas afectadas para la página de confirmación: [(etiqueta, cantidad)]"""
+    return [
+        # Contador desnormalizado: sin consulta
+        ('Entregables', proyecto.total_entregables),
+        ('Comentarios', _acotado(Comentario.objects.filter(entregable__proyecto=proyecto))),
+    ]
+
+
+def estimar_equipo(equipo):
+    proyectos = Proyecto.objects.filter(equipo=equipo)
+    return [
+        ('Miembros', _acotado(Miembro.objects.filter(equipo=equipo))),
+        ('Proyectos', _acotado(proyectos)),
+        ('Entregables', proyectos.aggregate(total=Coalesce(Sum('total_entregables'), 0))['total']),
+        ('Comentarios', _acotado(Comentario.objects.filter(entregable__proyecto__equipo=equipo))),
+        ('Proyectos archivados', _acotado(ProyectoArchivado.objects.filter(equipo=equipo))),
+    ]
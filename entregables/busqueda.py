@@ -0,0 +1,174 @@
+"""
+Búsqueda de texto completo sobre SQLite FTS5.
+
+Cada modelo indexado tiene una tabla virtual FTS5 de contenido externo
+(`<tabla>_fts`) que apunta a la tabla original y se mantiene sincronizada
+mediante triggers, de modo que también las operaciones masivas
+(bulk_create, update, borrados en lote) quedan reflejadas en el índice.
+El tokenizador elimina diacríticos, así "revision" encuentra "Revisión".
+Las listas ordenan los resultados de una búsqueda por relevancia (BM25).
+
+En motores distintos de SQLite, y en las tablas de archivo, se recurre a
+`icontains`.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+# Modelo -> columnas indexadas
+CAMPOS_INDEXADOS = {
+    'Equipo': ['nombre', 'descripcion'],
+    'Proyecto': ['nombre', 'descripcion'],
+    'Entregable': ['titulo', 'descripcion'],
+    'Comentario': ['autor', 'contenido'],
+}
+
+# Tablas de archivo (archivado.py): se consultan a demanda y sin índice FTS
+CAMPOS_SIN_INDICE = {
+    'ProyectoArchivado': CAMPOS_INDEXADOS['Proyecto'],
+    'EntregableArchivado': CAMPOS_INDEXADOS['Entregable'],
+}
+
+CAMPO_RELEVANCIA = 'relevancia'
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+PREFIJOS = "2 3"
+
+
+def _modelo(nombre):
+    return apps.get_model('entregables', nombre)
+
+
+def tabla_fts(modelo):
+    return f'{modelo._meta.db_table}_fts'
+
+
+def usa_fts(alias):
+    return connections[alias].vendor == 'sqlite'
+
+
+def _sql_triggers(modelo):
+    tabla = modelo._meta.db_table
+    fts = tabla_fts(modelo)
+    columnas = CAMPOS_INDEXADOS[modelo.__name__]
+    lista = ', '.join(columnas)
+    nuevos = ', '.join(f'new.{c}' for c in columnas)
+    viejos = ', '.join(f'old.{c}' for c in columnas)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN
+            INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos});
+            INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos});
+        END""",
+    ]
+
+
+def crear_indices(connection, modelos=None):
+    """Crea las tablas FTS5 y sus triggers, y las llena con los datos existentes"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nombre in modelos or CAMPOS_INDEXADOS:
+            modelo = _modelo(nombre)
+            fts = tabla_fts(modelo)
+            columnas = ', '.join(CAMPOS_INDEXADOS[nombre])
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{columnas}, content='{modelo._meta.db_table}', content_rowid='id', "
+                f"tokenize='{TOKENIZADOR}', prefix='{PREFIJOS}')"
+            )
+            for sql in _sql_triggers(modelo):
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def eliminar_indices(connection, modelos=None):
+    """Elimina las tablas FTS5 y sus triggers"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nombre in modelos or CAMPOS_INDEXADOS:
+            fts = tabla_fts(_modelo(nombre))
+            for sufijo in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{sufijo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def asegurar_triggers(connection):
+    """
+    Vuelve a crear los triggers si faltan.
+
+    El editor de esquema de SQLite reconstruye la tabla (y pierde sus
+    triggers) en muchas operaciones de migración; los ids se conservan, así
+    que basta con restaurar los triggers.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    tablas = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for nombre in CAMPOS_INDEXADOS:
+            modelo = _modelo(nombre)
+            if tabla_fts(modelo) in tablas and modelo._meta.db_table in tablas:
+                for sql in _sql_triggers(modelo):
+                    cursor.execute(sql)
+
+
+def expresion_fts(texto):
+    """Convierte el texto del usuario en una consulta FTS5 de prefijos unidos con AND"""
+    terminos = re.findall(r'\w+', texto or '')
+    if not terminos:
+        return None
+    return ' '.join(f'"{termino}"*' for termino in terminos)
+
+
+def _filtro_icontains(modelo, texto):
+    campos = CAMPOS_INDEXADOS.get(modelo.__name__) or CAMPOS_SIN_INDICE[modelo.__name__]
+    return reduce(or_, (Q(**{f'{campo}__icontains': texto}) for campo in campos))
+
+
+def filtrar_busqueda(queryset, texto):
+    """Restringe el queryset a los registros que coinciden con `texto`"""
+    modelo = queryset.model
+    expresion = expresion_fts(texto)
+    if expresion is None or not usa_fts(queryset.db) or modelo.__name__ not in CAMPOS_INDEXADOS:
+        return queryset.filter(_filtro_icontains(modelo, texto))
+    fts = tabla_fts(modelo)
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [expresion])
+    )
+
+
+def ordenar_por_relevancia(queryset, texto):
+    """
+    Filtra por `texto` y ordena por relevancia, anotada como `relevancia`
+    (BM25 cambiado de signo: mayor es mejor). Sin índice FTS (otros motores,
+    tablas de archivo) solo filtra y conserva el orden del queryset.
+    """
+    modelo = queryset.model
+    filtrado = filtrar_busqueda(queryset, texto)
+    expresion = expresion_fts(texto)
+    if expresion is None or not usa_fts(queryset.db) or modelo.__name__ not in CAMPOS_INDEXADOS:
+        return filtrado
+    fts = tabla_fts(modelo)
+    tabla = modelo._meta.db_table
+    relevancia = RawSQL(
+        f'SELECT -rank FROM {fts} WHERE {fts} MATCH %s AND rowid = {tabla}.id',
+        [expresion], output_field=FloatField(),
+    )
+    return filtrado.annotate(**{CAMPO_RELEVANCIA: relevancia}).order_by(f'-{CAMPO_RELEVANCIA}', '-pk')
+
+
+def campo_orden(queryset, campo):
+    """Campo por el que paginar: la relevancia si la búsqueda la anotó, si no `campo`"""
+    return CAMPO_RELEVANCIA if CAMPO_RELEVANCIA in queryset.query.annotations else campo
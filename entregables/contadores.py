@@ -0,0 +1,154 @@
+"""
+Contadores desnormalizados de entregables en Proyecto.
+
+Cada entregable aporta a su proyecto: 1 al total, 1 al contador de su
+estado y su porcentaje a `suma_porcentaje` (el promedio es suma / total).
+Las señales aplican la diferencia entre el aporte anterior y el nuevo con
+UPDATE ... SET campo = campo + delta, sin leer el proyecto. Las cargas
+masivas (bulk_create, update()) no emiten señales y deben llamar a
+`recalcular()`.
+
+Los vencidos no entran en las diferencias: un entregable vence con el paso
+de los días sin que nada lo guarde, así que su aporte anterior no se puede
+deducir de la fecha de hoy. Cuando un cambio toca a un vencido, el mismo
+UPDATE vuelve a contar los vencidos del proyecto con una subconsulta; el
+resto lo corrigen el barrido diario (vencidos.py) y `recalcular()`.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Equipo, Proyecto, Entregable, condicion_vencido
+
+
+CAMPOS_ESTADO = {
+    'pendiente': 'entregables_pendientes',
+    'en_progreso': 'entregables_en_progreso',
+    'en_revision': 'entregables_en_revision',
+    'aprobado': 'entregables_aprobados',
+    'rechazado': 'entregables_rechazados',
+}
+CAMPOS = Proyecto.CAMPOS_CONTADORES
+CAMPOS_INCREMENTALES = [campo for campo in CAMPOS if campo != 'entregables_vencidos']
+
+
+def _normalizar(campo, valor):
+    # Las vistas asignan los valores del formulario tal cual (cadenas)
+    return Entregable._meta.get_field(campo).to_python(valor)
+
+
+def aporte(valores):
+    """Aporte de un entregable (diccionario de CAMPOS_SEGUIDOS) a los contadores de su proyecto"""
+    resultado = {
+        'total_entregables': 1,
+        'suma_porcentaje': _normalizar('porcentaje_completado', valores['porcentaje_completado']) or 0,
+    }
+    campo_estado = CAMPOS_ESTADO.get(valores['estado'])
+    if campo_estado:
+        resultado[campo_estado] = 1
+    return resultado
+
+
+def vencido(valores, hoy=None):
+    hoy = hoy or timezone.localdate()
+    vencimiento = _normalizar('fecha_vencimiento', valores['fecha_vencimiento'])
+    return bool(valores['fecha_completado'] is None and vencimiento and vencimiento < hoy)
+
+
+def _vencidos_del_proyecto():
+    conteo = (
+        Entregable.objects.filter(condicion_vencido(), proyecto=OuterRef('pk'))
+        .order_by().values('proyecto').annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(conteo), 0)
+
+
+def aplicar(proyecto_id, deltas, recontar_vencidos=False):
+    """
+    Suma `deltas` a los contadores del proyecto; con `recontar_vencidos`,
+    vuelve a contar sus vencidos en el mismo UPDATE
+    """
+    cambios = {
+        # Nunca por debajo de cero, aunque el contador se haya desviado
+        campo: Greatest(F(campo) + delta, 0) if delta < 0 else F(campo) + delta
+        for campo, delta in deltas.items() if delta
+    }
+    if recontar_vencidos:
+        cambios['entregables_vencidos'] = _vencidos_del_proyecto()
+    if proyecto_id and cambios:
+        Proyecto.objects.filter(pk=proyecto_id).update(fecha_modificacion=timezone.now(), **cambios)
+
+
+def _negar(deltas):
+    return {campo: -delta for campo, delta in deltas.items()}
+
+
+def al_guardar(anteriores, actuales):
+    """Aplica el cambio de un entregable; `anteriores` es None si es nuevo"""
+    proyecto_id = _normalizar('proyecto', actuales['proyecto_id'])
+    nuevo = aporte(actuales)
+    if anteriores is None:
+        aplicar(proyecto_id, nuevo, vencido(actuales))
+        return
+    # Los campos no cargados (only/defer) no han cambiado
+    anteriores = {**actuales, **anteriores}
+    proyecto_anterior = _normalizar('proyecto', anteriores['proyecto_id'])
+    previo = aporte(anteriores)
+    # Ya esté contado o no, un vencido antes o después del cambio obliga a recontar
+    recontar = vencido(anteriores) or vencido(actuales)
+    if proyecto_anterior == proyecto_id:
+        deltas = {campo: nuevo.get(campo, 0) - previo.get(campo, 0) for campo in CAMPOS_INCREMENTALES}
+        aplicar(proyecto_id, deltas, recontar)
+    else:
+        aplicar(proyecto_anterior, _negar(previo), recontar)
+        aplicar(proyecto_id, nuevo, recontar)
+
+
+def al_eliminar(valores, origen=None):
+    # Si se borra el proyecto (o su equipo) en cascada, no hay nada que ajustar
+    modelo_origen = getattr(origen, 'model', type(origen))
+    if modelo_origen in (Proyecto, Equipo):
+        return
+    aplicar(_normalizar('proyecto', valores['proyecto_id']), _negar(aporte(valores)), vencido(valores))
+
+
+def recalcular(proyectos=None, lote=1000):
+    """
+    Recalcula los contadores desde los entregables con una consulta agrupada y
+    escribe solo los proyectos que difieren. Devuelve cuántos se corrigieron.
+
+    Usa los modelos actuales: las migraciones no deben llamarla (la 0006 lleva
+    su propia copia sobre los modelos históricos).
+    """
+    ahora = timezone.now()
+    hoy = timezone.localdate(ahora)
+    conteos = {
+        campo: Count('pk', filter=Q(estado=estado)) for estado, campo in CAMPOS_ESTADO.items()
+    }
+    entregables = Entregable.objects.order_by()
+    proyectos_qs = Proyecto.objects.order_by()
+    if proyectos is not None:
+        entregables = entregables.filter(proyecto__in=proyectos)
+        proyectos_qs = proyectos_qs.filter(pk__in=proyectos)
+
+    esperados = {
+        fila.pop('proyecto'): fila
+        for fila in entregables.values('proyecto').annotate(
+            total_entregables=Count('pk'),
+            entregables_vencidos=Count('pk', filter=condicion_vencido(hoy)),
+            suma_porcentaje=Coalesce(Sum('porcentaje_completado'), 0),
+            **conteos,
+        )
+    }
+    ceros = dict.fromkeys(CAMPOS, 0)
+    corregidos = []
+    for pk, *actuales in proyectos_qs.values_list('pk', *CAMPOS).iterator():
+        esperado = esperados.get(pk, ceros)
+        if [esperado[campo] for campo in CAMPOS] != actuales:
+            corregidos.append(Proyecto(pk=pk, fecha_modificacion=ahora, **esperado))
+
+    for inicio in range(0, len(corregidos), lote):
+        with transaction.atomic():
+            Proyecto.objects.bulk_update(corregidos[inicio:inicio + lote], [*CAMPOS, 'fecha_modificacion'])
+    return len(corregidos)
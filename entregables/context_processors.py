@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragmentos(request):
+    """Duración de los fragmentos en caché, para la etiqueta {% cache %}"""
+    return {'FRAGMENTOS_CACHE_TIMEOUT': settings.FRAGMENTOS_CACHE_TIMEOUT}
@@ -0,0 +1,116 @@
+"""
+Datos del panel de control (vista index).
+
+Los contadores se obtienen en una única consulta y el resultado completo se
+guarda en la caché configurada; las señales de `signals.py` lo invalidan
+cuando cambian equipos, miembros, proyectos o entregables. `aobtener()` es
+la variante para la vista asíncrona: lanza las tres consultas a la vez con
+asyncio.gather.
+
+Como la caché la comparten todos los clientes, se calcula siempre en la
+primaria: leído de una réplica con retraso, el panel mostraría datos
+anteriores a la última escritura durante DASHBOARD_CACHE_TIMEOUT segundos.
+
+Los entregables vencen a medianoche sin que nada se guarde, así que la clave
+lleva la fecha local: el primer acceso de cada día vuelve a contar los
+vencidos en lugar de servir los del día anterior.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Func
+from django.utils import timezone
+
+from .models import Equipo, Miembro, Proyecto, Entregable
+
+
+CLAVE_CACHE = 'entregables:dashboard'
+
+
+def clave_cache():
+    """Clave del panel para el día local de hoy"""
+    return f'{CLAVE_CACHE}:{timezone.localdate().isoformat()}'
+
+
+def contar_en_una_consulta(using='default', **querysets):
+    """Devuelve {nombre: COUNT(*)} de varios querysets con un solo SELECT de subconsultas"""
+    partes, parametros = [], []
+    for queryset in querysets.values():
+        subconsulta = queryset.order_by().values(total=Func(F('pk'), function='COUNT'))
+        sql, params = subconsulta.query.sql_with_params()
+        partes.append(f'({sql})')
+        parametros.extend(params)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(partes)}', parametros)
+        fila = cursor.fetchone()
+    return dict(zip(querysets, fila))
+
+
+def _contadores():
+    return contar_en_una_consulta(
+        using=DEFAULT_DB_ALIAS,
+        equipos_count=Equipo.objects.filter(activo=True),
+        proyectos_count=Proyecto.objects.all(),
+        entregables_count=Entregable.objects.all(),
+        miembros_count=Miembro.objects.filter(activo=True),
+        vencidos_count=Entregable.objects.vencidos(),
+    )
+
+
+def _recientes():
+    return (
+        Entregable.objects.using(DEFAULT_DB_ALIAS)
+        .select_related('proyecto', 'responsable').order_by('-fecha_creacion')[:5]
+    )
+
+
+def _activos():
+    return Proyecto.objects.using(DEFAULT_DB_ALIAS).filter(estado='en_progreso').select_related('equipo')[:5]
+
+
+def calcular():
+    """Calcula el contexto del panel de control"""
+    datos = _contadores()
+    datos['entregables_recientes'] = list(_recientes())
+    datos['proyectos_activos'] = list(_activos())
+    return datos
+
+
+async def _alistar(queryset):
+    return [objeto async for objeto in queryset]
+
+
+async def acalcular():
+    """Versión asíncrona de calcular(); las consultas son independientes y se lanzan juntas"""
+    datos, recientes, activos = await asyncio.gather(
+        sync_to_async(_contadores)(), _alistar(_recientes()), _alistar(_activos()),
+    )
+    datos['entregables_recientes'] = recientes
+    datos['proyectos_activos'] = activos
+    return datos
+
+
+def obtener():
+    """Devuelve el contexto del panel desde la caché, calculándolo si falta"""
+    clave = clave_cache()
+    datos = cache.get(clave)
+    if datos is None:
+        datos = calcular()
+        cache.set(clave, datos, settings.DASHBOARD_CACHE_TIMEOUT)
+    return datos
+
+
+async def aobtener():
+    clave = clave_cache()
+    datos = await cache.aget(clave)
+    if datos is None:
+        datos = await acalcular()
+        await cache.aset(clave, datos, settings.DASHBOARD_CACHE_TIMEOUT)
+    return datos
+
+
+def invalidar():
+    cache.delete(clave_cache())
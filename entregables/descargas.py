@@ -0,0 +1,165 @@
+"""
+Descarga de los archivos adjuntos de los entregables.
+
+Responde a GET condicionales (ETag, Last-Modified) con 304 y a peticiones
+Range de un solo tramo con 206, de modo que las descargas repetidas o
+reanudadas no vuelven a transferir lo que el cliente ya tiene. Los
+archivos se envían con FileResponse, que el servidor WSGI puede servir con
+sendfile; con DESCARGAS_OFFLOAD la transferencia se delega en el proxy
+(X-Accel-Redirect de nginx o X-Sendfile de Apache/lighttpd) y el proceso de
+Django queda libre en cuanto envía las cabeceras.
+"""
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from . import archivado
+from .models import Entregable, EntregableArchivado
+
+
+TAMANO_BLOQUE = 64 * 1024
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+
+class RespuestaArchivo(FileResponse):
+    block_size = TAMANO_BLOQUE
+
+
+class Tramo:
+    """Vista de solo lectura sobre `longitud` bytes de un archivo ya posicionado"""
+
+    def __init__(self, archivo, longitud):
+        self.archivo = archivo
+        self.restante = longitud
+
+    def read(self, tamano=-1):
+        if self.restante <= 0:
+            return b''
+        if tamano < 0 or tamano > self.restante:
+            tamano = self.restante
+        datos = self.archivo.read(tamano)
+        self.restante -= len(datos)
+        return datos
+
+    def close(self):
+        self.archivo.close()
+
+
+def calcular_etag(nombre, tamano, modificado):
+    """El hash del almacenamiento por contenido, o tamaño y fecha para archivos antiguos"""
+    base = posixpath.splitext(posixpath.basename(nombre))[0]
+    if _HASH.match(base):
+        return quote_etag(base)
+    return f'W/"{tamano:x}-{int(modificado):x}"'
+
+
+def interpretar_rango(cabecera, tamano):
+    """
+    Devuelve (inicio, fin) inclusivos para un único tramo, None si la cabecera
+    no aplica (ausente o con varios tramos) y False si no es satisfacible.
+    """
+    coincidencia = _RANGO.match(cabecera.replace(' ', ''))
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # Sufijo: los últimos N bytes
+        longitud = int(fin)
+        if longitud == 0:
+            return False
+        return max(tamano - longitud, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio >= tamano or fin < inicio:
+        return False
+    return inicio, fin
+
+
+def _rango_vigente(request, etag, modificado):
+    """If-Range: el tramo solo se sirve si el cliente tiene la misma versión"""
+    condicion = request.headers.get('If-Range')
+    if not condicion:
+        return True
+    if condicion.startswith(('"', 'W/')):
+        return condicion == etag and not etag.startswith('W/')
+    fecha = parse_http_date_safe(condicion)
+    return fecha is not None and fecha >= int(modificado)
+
+
+def _cabeceras(respuesta, etag, modificado, nombre_descarga):
+    respuesta['ETag'] = etag
+    respuesta['Last-Modified'] = http_date(modificado)
+    respuesta['Accept-Ranges'] = 'bytes'
+    respuesta['Cache-Control'] = 'private, no-cache'
+    respuesta['Content-Disposition'] = content_disposition_header(True, nombre_descarga)
+    return respuesta
+
+
+def _delegar(nombre, almacenamiento, tipo, etag, modificado, nombre_descarga):
+    """Respuesta vacía que indica al proxy qué archivo enviar"""
+    respuesta = HttpResponse(content_type=tipo)
+    if settings.DESCARGAS_OFFLOAD == 'x-accel-redirect':
+        respuesta['X-Accel-Redirect'] = quote(settings.DESCARGAS_OFFLOAD_PREFIJO.rstrip('/') + '/' + nombre)
+    else:
+        respuesta['X-Sendfile'] = almacenamiento.path(nombre)
+    return _cabeceras(respuesta, etag, modificado, nombre_descarga)
+
+
+@require_safe
+def descargar(request, pk):
+    """Descarga el archivo adjunto de un entregable"""
+    campos = ['archivo', 'archivo_nombre']
+    entregable = archivado.obtener(Entregable.objects.only(*campos), EntregableArchivado.objects.only(*campos), pk)
+    if not entregable.archivo:
+        raise Http404('El entregable no tiene archivo adjunto.')
+    archivo = entregable.archivo
+    almacenamiento = archivo.storage
+    try:
+        tamano = almacenamiento.size(archivo.name)
+        modificado = almacenamiento.get_modified_time(archivo.name).timestamp()
+    except FileNotFoundError:
+        raise Http404('El archivo adjunto no existe.')
+
+    etag = calcular_etag(archivo.name, tamano, modificado)
+    nombre_descarga = entregable.archivo_nombre or posixpath.basename(archivo.name)
+    condicional = get_conditional_response(request, etag=etag, last_modified=int(modificado))
+    if condicional is not None:
+        return _cabeceras(condicional, etag, modificado, nombre_descarga)
+
+    tipo = mimetypes.guess_type(nombre_descarga)[0] or 'application/octet-stream'
+    if settings.DESCARGAS_OFFLOAD:
+        # El proxy atiende también los Range
+        return _delegar(archivo.name, almacenamiento, tipo, etag, modificado, nombre_descarga)
+
+    rango = None
+    if 'Range' in request.headers and _rango_vigente(request, etag, modificado):
+        rango = interpretar_rango(request.headers['Range'], tamano)
+    if rango is False:
+        respuesta = HttpResponse(status=416)
+        respuesta['Content-Range'] = f'bytes */{tamano}'
+        return _cabeceras(respuesta, etag, modificado, nombre_descarga)
+
+    contenido = almacenamiento.open(archivo.name, 'rb')
+    if rango is None:
+        respuesta = RespuestaArchivo(contenido, content_type=tipo)
+    else:
+        inicio, fin = rango
+        contenido.seek(inicio)
+        if fin == tamano - 1:
+            # Hasta el final: se pasa el archivo tal cual y se conserva sendfile
+            respuesta = RespuestaArchivo(contenido, status=206, content_type=tipo)
+        else:
+            respuesta = RespuestaArchivo(Tramo(contenido, fin - inicio + 1), status=206, content_type=tipo)
+            respuesta['Content-Length'] = fin - inicio + 1
+        respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+    return _cabeceras(respuesta, etag, modificado, nombre_descarga)
@@ -0,0 +1,320 @@
+"""
+Archivos estáticos con hash en el nombre, precomprimidos y con caché larga.
+
+`AlmacenamientoEstatico` amplía ManifestStaticFilesStorage: al ejecutar
+`collectstatic` minifica las hojas de estilo y scripts propios, les da un
+nombre con el hash de su contenido (css/style.3f2a….css) y escribe junto a
+cada archivo comprimible sus variantes .gz y .br (esta última solo si está
+instalado el paquete `brotli`). Las plantillas siguen usando
+{% static 'css/style.css' %}, que devuelve el nombre con hash.
+
+`EstaticosMiddleware` sirve STATIC_ROOT sin pasar por las vistas: elige la
+variante precomprimida según Accept-Encoding y marca los nombres con hash
+como inmutables durante un año, de modo que las visitas repetidas no vuelven
+a pedirlos; tras un despliegue cambian el nombre y la URL.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.utils import matches_patterns
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRIMIBLES = ('*.css', '*.js', '*.svg', '*.json', '*.txt', '*.map', '*.html', '*.xml')
+TAMANO_MINIMO = 256  # bytes: por debajo, la cabecera gzip no compensa
+UN_ANO = 365 * 24 * 60 * 60
+# ManifestStaticFilesStorage inserta los 12 primeros hex del MD5 antes de la extensión
+_HASHEADO = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+# Comentarios y cadenas de CSS: las cadenas se copian tal cual
+_LITERAL_CSS = re.compile(r'/\*.*?\*/|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'', re.S)
+# Tras estas palabras una '/' abre una expresión regular, no divide
+_ANTES_DE_REGEX = frozenset([
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do', 'else',
+    'yield', 'await',
+])
+
+
+def _compactar_css(codigo):
+    codigo = re.sub(r'\s+', ' ', codigo)
+    codigo = re.sub(r'\s*([{};,])\s*', r'\1', codigo)
+    return re.sub(r':\s+', ':', codigo).replace(';}', '}')
+
+
+def minificar_css(texto):
+    """Quita comentarios y espacios sobrantes (no los anteriores a ':', que separan selectores)"""
+    partes, codigo, fin = [], '', 0
+    for literal in _LITERAL_CSS.finditer(texto):
+        codigo += texto[fin:literal.start()]
+        if not literal.group().startswith('/*'):
+            partes += [_compactar_css(codigo), literal.group()]
+            codigo = ''
+        fin = literal.end()
+    partes.append(_compactar_css(codigo + texto[fin:]))
+    return ''.join(partes).strip()
+
+
+def _fin_cadena(texto, i):
+    """Posición tras la cadena '...' o "..." que empieza en `i`"""
+    comilla, i = texto[i], i + 1
+    while i < len(texto) and texto[i] not in (comilla, '\n'):
+        i += 2 if texto[i] == '\\' else 1
+    return i + 1
+
+
+def _fin_plantilla(texto, i):
+    """Posición tras la plantilla `...` que empieza en `i`, con sus ${...} anidados"""
+    i += 1
+    while i < len(texto) and texto[i] != '`':
+        if texto[i] == '\\':
+            i += 2
+        elif texto.startswith('${', i):
+            i = _fin_expresion(texto, i + 2)
+        else:
+            i += 1
+    return i + 1
+
+
+def _fin_expresion(texto, i):
+    """Posición tras la '}' que cierra una expresión ${...} de una plantilla"""
+    profundidad = 0
+    while i < len(texto):
+        caracter = texto[i]
+        if caracter in '\'"':
+            i = _fin_cadena(texto, i)
+            continue
+        if caracter == '`':
+            i = _fin_plantilla(texto, i)
+            continue
+        if caracter == '}':
+            if not profundidad:
+                return i + 1
+            profundidad -= 1
+        elif caracter == '{':
+            profundidad += 1
+        i += 1
+    return i
+
+
+def _fin_regex(texto, i):
+    """Posición tras la expresión regular /.../flags que empieza en `i`"""
+    i, en_clase = i + 1, False
+    while i < len(texto) and texto[i] != '\n':
+        caracter = texto[i]
+        if caracter == '\\':
+            i += 2
+            continue
+        if caracter == '/' and not en_clase:
+            break
+        if caracter in '[]':
+            en_clase = caracter == '['
+        i += 1
+    i += 1
+    while i < len(texto) and texto[i].isalpha():
+        i += 1
+    return i
+
+
+def _abre_regex(previo):
+    """Si una '/' tras el código `previo` abre una expresión regular o es una división"""
+    previo = previo.rstrip()
+    palabra = re.search(r'[\w$]+$', previo)
+    if palabra:
+        return palabra.group() in _ANTES_DE_REGEX
+    return not previo or previo[-1] not in ')]'
+
+
+def _trozos_js(texto):
+    """
+    Divide el script en (trozo, es_literal). Cadenas, plantillas y expresiones
+    regulares salen enteras; los comentarios, como un espacio o un salto de línea.
+    """
+    inicio = i = 0
+    previo = ''
+    while i < len(texto):
+        caracter, siguiente = texto[i], texto[i + 1:i + 2]
+        if caracter == '/' and siguiente == '/':
+            fin = texto.find('\n', i)
+            fin, sustituto = len(texto) if fin < 0 else fin, ''
+        elif caracter == '/' and siguiente == '*':
+            fin = texto.find('*/', i + 2)
+            fin = len(texto) if fin < 0 else fin + 2
+            sustituto = '\n' if '\n' in texto[i:fin] else ' '
+        elif caracter in '\'"`' or (caracter == '/' and _abre_regex(previo + texto[inicio:i])):
+            fin, sustituto = {'`': _fin_plantilla, '/': _fin_regex}.get(caracter, _fin_cadena)(texto, i), None
+        else:
+            i += 1
+            continue
+        yield texto[inicio:i], False
+        # Un literal cuenta como operando: una '/' detrás divide
+        previo = (previo + texto[inicio:i])[-20:] + (' 0' if sustituto is None else '')
+        yield (texto[i:fin], True) if sustituto is None else (sustituto, False)
+        inicio = i = fin
+    yield texto[inicio:], False
+
+
+def minificar_js(texto):
+    """
+    Quita comentarios, sangría y líneas vacías. Conserva los saltos de línea
+    (la inserción automática de ';' depende de ellos) y el contenido de las
+    cadenas, plantillas y expresiones regulares.
+    """
+    lineas, actual = [], ''
+    for trozo, literal in _trozos_js(texto):
+        if literal:
+            actual += trozo
+            continue
+        primera, *resto = trozo.split('\n')
+        actual += primera if actual else primera.lstrip()
+        for linea in resto:
+            if actual.rstrip():
+                lineas.append(actual.rstrip())
+            actual = linea.lstrip()
+    if actual.rstrip():
+        lineas.append(actual.rstrip())
+    return '\n'.join(lineas) + '\n'
+
+
+MINIFICADORES = {'.css': minificar_css, '.js': minificar_js}
+
+
+class AlmacenamientoEstatico(ManifestStaticFilesStorage):
+    # Solo los recursos propios (static/); los de admin ya vienen preparados
+    patrones_minificar = ('css/*.css', 'js/*.js')
+
+    def stored_name(self, name):
+        # Sin collectstatic (desarrollo, pruebas) no hay manifiesto: nombre original
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = self._minificar(paths)
+        for nombre, hasheado, procesado in super().post_process(paths, dry_run, **options):
+            if hasheado and not isinstance(procesado, Exception):
+                for variante in {nombre, hasheado}:
+                    comprimir(self, variante)
+            yield nombre, hasheado, procesado
+
+    def _minificar(self, paths):
+        """Minifica las copias en STATIC_ROOT y hace que el hash se calcule sobre ellas"""
+        paths = dict(paths)
+        for nombre in paths:
+            if '.min.' in nombre or not matches_patterns(nombre, self.patrones_minificar):
+                continue
+            with self.open(nombre) as archivo:
+                texto = archivo.read().decode('utf-8')
+            minificador = MINIFICADORES[os.path.splitext(nombre)[1]]
+            self.delete(nombre)
+            self._save(nombre, ContentFile(minificador(texto).encode('utf-8')))
+            paths[nombre] = (self, nombre)
+        return paths
+
+
+def comprimir(storage, nombre):
+    """Escribe `nombre`.gz y `nombre`.br si el archivo es comprimible y se reduce"""
+    if not matches_patterns(nombre, COMPRIMIBLES):
+        return
+    with storage.open(nombre) as archivo:
+        datos = archivo.read()
+    if len(datos) < TAMANO_MINIMO:
+        return
+    variantes = {'.gz': gzip.compress(datos, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(datos, quality=11)
+    for extension, comprimido in variantes.items():
+        if len(comprimido) < len(datos):
+            if storage.exists(nombre + extension):
+                storage.delete(nombre + extension)
+            storage._save(nombre + extension, ContentFile(comprimido))
+
+
+def codificaciones_aceptadas(cabecera):
+    """Codificaciones de Accept-Encoding con q > 0"""
+    aceptadas = set()
+    for parte in cabecera.split(','):
+        codificacion, _, parametros = parte.partition(';')
+        calidad = parametros.strip().removeprefix('q=')
+        try:
+            if parametros and float(calidad) <= 0:
+                continue
+        except ValueError:
+            continue
+        aceptadas.add(codificacion.strip().lower())
+    return aceptadas
+
+
+class EstaticosMiddleware:
+    """Sirve STATIC_ROOT con la variante comprimida que acepte el cliente"""
+    sync_capable = True
+    async_capable = True
+    VARIANTES = [('br', '.br'), ('gzip', '.gz')]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.servir(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.servir(request) or await self.get_response(request)
+
+    def servir(self, request):
+        if not getattr(settings, 'ESTATICOS_SERVIR', True) or not settings.STATIC_ROOT:
+            return None
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(settings.STATIC_URL):
+            return None
+        nombre = request.path_info.removeprefix(settings.STATIC_URL)
+        try:
+            ruta = safe_join(settings.STATIC_ROOT, nombre)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(ruta):
+            return None
+
+        aceptadas = codificaciones_aceptadas(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        codificacion, servida = None, ruta
+        for candidata, extension in self.VARIANTES:
+            if candidata in aceptadas and os.path.isfile(ruta + extension):
+                codificacion, servida = candidata, ruta + extension
+                break
+
+        # Las variantes se escriben a la vez que el original: se valida contra este
+        modificado = os.path.getmtime(ruta)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), modificado):
+            respuesta = HttpResponseNotModified()
+        else:
+            tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+            respuesta = FileResponse(open(servida, 'rb'), content_type=tipo)
+            # FileResponse lo deduce del archivo abierto (nombre.js.gz): se sirve como el original
+            del respuesta['Content-Disposition']
+            if codificacion:
+                respuesta['Content-Encoding'] = codificacion
+        respuesta['Last-Modified'] = http_date(modificado)
+        if _HASHEADO.search(nombre):
+            respuesta['Cache-Control'] = f'public, max-age={UN_ANO}, immutable'
+        else:
+            respuesta['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        patch_vary_headers(respuesta, ['Accept-Encoding'])
+        return respuesta
@@ -0,0 +1,126 @@
+"""
+Prueba de concurrencia de la conexión SQLite.
+
+Lanza hilos lectores y escritores durante unos segundos contra una base de
+datos temporal en disco, abierta con las OPTIONS de `default` o sin ellas
+para comparar, y cuenta las operaciones que completa cada grupo, las que
+fallan con "database is locked" y la mayor espera de una lectura. Cada
+escritura reproduce un comentario nuevo: lee un contador, inserta una fila y
+actualiza el contador en la misma transacción, el caso en que una
+transacción DEFERRED falla al pasar de lectura a escritura.
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+ALIAS = 'estres_sqlite'
+TEXTO = 'x' * 200
+
+
+@contextmanager
+def base_temporal(opciones):
+    """Registra el alias ALIAS sobre un archivo temporal con las tablas de la prueba"""
+    directorio = tempfile.mkdtemp(prefix='estres-sqlite-')
+    connections.settings[ALIAS] = dict(
+        connections.settings[DEFAULT_DB_ALIAS],
+        NAME=os.path.join(directorio, 'estres.sqlite3'),
+        OPTIONS=dict(opciones),
+    )
+    try:
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE contador (id INTEGER PRIMARY KEY, valor INTEGER NOT NULL)')
+            cursor.execute('CREATE TABLE comentario (id INTEGER PRIMARY KEY, texto TEXT NOT NULL)')
+            cursor.execute('INSERT INTO contador (id, valor) VALUES (1, 0)')
+        yield ALIAS
+    finally:
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def _bloqueado(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def _escritor(alias, fin):
+    conexion = connections[alias]
+    resultado = {'escrituras': 0, 'bloqueos_escritura': 0}
+    try:
+        while time.monotonic() < fin:
+            try:
+                with transaction.atomic(using=alias), conexion.cursor() as cursor:
+                    cursor.execute('SELECT valor FROM contador WHERE id = 1')
+                    valor = cursor.fetchone()[0]
+                    cursor.execute('INSERT INTO comentario (texto) VALUES (%s)', [TEXTO])
+                    cursor.execute('UPDATE contador SET valor = %s WHERE id = 1', [valor + 1])
+                resultado['escrituras'] += 1
+            except OperationalError as error:
+                if not _bloqueado(error):
+                    raise
+                resultado['bloqueos_escritura'] += 1
+    finally:
+        conexion.close()
+    return resultado
+
+
+def _lector(alias, fin):
+    conexion = connections[alias]
+    resultado = {'lecturas': 0, 'bloqueos_lectura': 0, 'espera_max_lectura_ms': 0.0}
+    try:
+        while time.monotonic() < fin:
+            inicio = time.perf_counter()
+            try:
+                with conexion.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*), MAX(id) FROM comentario')
+                    cursor.fetchone()
+                    cursor.execute('SELECT valor FROM contador WHERE id = 1')
+                    cursor.fetchone()
+                resultado['lecturas'] += 1
+            except OperationalError as error:
+                if not _bloqueado(error):
+                    raise
+                resultado['bloqueos_lectura'] += 1
+            espera = (time.perf_counter() - inicio) * 1000
+            resultado['espera_max_lectura_ms'] = max(resultado['espera_max_lectura_ms'], espera)
+    finally:
+        conexion.close()
+    return resultado
+
+
+def ejecutar(opciones, lectores=4, escritores=4, segundos=2.0):
+    """Ejecuta la prueba con las OPTIONS dadas y devuelve los totales"""
+    with base_temporal(opciones) as alias:
+        fin = time.monotonic() + segundos
+        with ThreadPoolExecutor(lectores + escritores) as ejecutor:
+            tareas = [ejecutor.submit(_escritor, alias, fin) for _ in range(escritores)]
+            tareas += [ejecutor.submit(_lector, alias, fin) for _ in range(lectores)]
+            parciales = [tarea.result() for tarea in tareas]
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT (SELECT valor FROM contador WHERE id = 1), (SELECT COUNT(*) FROM comentario)')
+            contador, comentarios = cursor.fetchone()
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+
+    totales = {
+        'journal_mode': journal_mode,
+        'lecturas': 0, 'escrituras': 0,
+        'bloqueos_lectura': 0, 'bloqueos_escritura': 0,
+        'espera_max_lectura_ms': 0.0,
+    }
+    for parcial in parciales:
+        for clave, valor in parcial.items():
+            if clave == 'espera_max_lectura_ms':
+                totales[clave] = round(max(totales[clave], valor), 3)
+            else:
+                totales[clave] += valor
+    # Sin actualizaciones perdidas: el contador coincide con las filas insertadas
+    totales['consistente'] = contador == comentarios == totales['escrituras']
+    return totales
@@ -0,0 +1,174 @@
+"""
+Base común de los comandos de importación masiva (importar_*).
+
+El archivo de entrada (CSV o NDJSON) se lee fila a fila; las claves
+foráneas se resuelven contra índices en memoria construidos una sola vez al
+inicio, y las filas válidas se insertan con bulk_create en lotes, cada uno en
+su propia transacción. Las filas rechazadas se escriben, con el motivo, en
+un archivo aparte con el mismo formato que la entrada.
+"""
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from . import dashboard
+
+
+FORMATOS = ('csv', 'ndjson')
+
+
+class IndiceClaves:
+    """Resuelve una clave foránea por id o por un campo de texto (sin distinguir mayúsculas)"""
+
+    AMBIGUO = object()
+
+    def __init__(self, queryset, campo):
+        self.ids = set()
+        self.textos = {}
+        for pk, texto in queryset.order_by().values_list('pk', campo).iterator():
+            self.ids.add(pk)
+            clave = texto.strip().lower()
+            self.textos[clave] = pk if self.textos.get(clave, pk) == pk else self.AMBIGUO
+
+    def resolver(self, valor, descripcion):
+        valor = str(valor).strip()
+        if valor.isdigit() and int(valor) in self.ids:
+            return int(valor)
+        pk = self.textos.get(valor.lower())
+        if pk is self.AMBIGUO:
+            raise ValidationError(f'{descripcion} ambiguo: {valor}')
+        if pk is None:
+            raise ValidationError(f'{descripcion} no encontrado: {valor}')
+        return pk
+
+
+class ComandoImportacion(BaseCommand):
+    """
+    Subclases:
+      - `modelo`: modelo a importar.
+      - `campos`: columnas que se copian al campo homónimo (validadas con field.clean).
+      - `relaciones`: columna -> descripción, para las claves foráneas.
+      - `preparar()`: construye en `self.indices` un IndiceClaves por relación.
+    """
+    modelo = None
+    campos = []
+    relaciones = {}
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Archivo CSV o NDJSON a importar')
+        parser.add_argument('--formato', choices=FORMATOS, help='Formato de entrada (por defecto, según la extensión)')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por inserción y transacción')
+        parser.add_argument('--rechazados', help='Archivo para las filas rechazadas (por defecto, <archivo>.rechazados.<ext>)')
+        parser.add_argument('--delimitador', default=',', help='Delimitador del CSV')
+
+    def preparar(self):
+        self.indices = {}
+
+    def validar(self, instancia, fila):
+        """Validaciones adicionales por fila; lanza ValidationError para rechazarla"""
+
+    def construir(self, fila):
+        """Convierte una fila en una instancia sin guardar"""
+        datos = {}
+        for columna in self.campos:
+            valor = fila.get(columna)
+            field = self.modelo._meta.get_field(columna)
+            if valor in (None, '') and (field.has_default() or field.null):
+                continue
+            try:
+                datos[columna] = field.clean(valor, None)
+            except ValidationError as error:
+                raise ValidationError(f'{columna}: {"; ".join(error.messages)}')
+        for columna, descripcion in self.relaciones.items():
+            valor = fila.get(columna)
+            field = self.modelo._meta.get_field(columna)
+            if valor in (None, ''):
+                if field.null:
+                    continue
+                raise ValidationError(f'{columna}: este campo es obligatorio')
+            datos[field.attname] = self.indices[columna].resolver(valor, descripcion)
+        instancia = self.modelo(**datos)
+        self.validar(instancia, fila)
+        return instancia
+
+    def leer(self, archivo, formato, delimitador):
+        if formato == 'csv':
+            yield from csv.DictReader(archivo, delimiter=delimitador)
+            return
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except ValueError:
+                fila = None
+            if not isinstance(fila, dict):
+                raise CommandError(f'Línea {numero}: no es un objeto JSON')
+            yield fila
+
+    def insertar(self, lote):
+        with transaction.atomic():
+            self.modelo.objects.bulk_create(lote, batch_size=len(lote))
+
+    def finalizar(self, importadas):
+        """Se ejecuta tras la última inserción"""
+        dashboard.invalidar()
+
+    def handle(self, *args, **options):
+        ruta = Path(options['archivo'])
+        if not ruta.exists():
+            raise CommandError(f'No existe el archivo {ruta}')
+        formato = options['formato'] or ('csv' if ruta.suffix.lower() == '.csv' else 'ndjson')
+        tamano_lote = options['lote']
+        if tamano_lote < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+        ruta_rechazados = Path(options['rechazados'] or ruta.with_suffix(f'.rechazados{ruta.suffix}'))
+
+        inicio = time.perf_counter()
+        self.preparar()
+        importadas = rechazadas = 0
+        lote = []
+        escritor = None
+
+        with open(ruta, newline='', encoding='utf-8-sig') as archivo, \
+                open(ruta_rechazados, 'w', newline='', encoding='utf-8') as salida:
+            for numero, fila in enumerate(self.leer(archivo, formato, options['delimitador']), 1):
+                try:
+                    lote.append(self.construir(fila))
+                except ValidationError as error:
+                    rechazadas += 1
+                    fila = {**fila, 'error': f'fila {numero}: {"; ".join(error.messages)}'}
+                    if formato == 'csv':
+                        if escritor is None:
+                            escritor = csv.DictWriter(
+                                salida, fieldnames=list(fila), delimiter=options['delimitador'], extrasaction='ignore',
+                            )
+                            escritor.writeheader()
+                        escritor.writerow(fila)
+                    else:
+                        salida.write(json.dumps(fila, ensure_ascii=False) + '\n')
+                    continue
+                if len(lote) >= tamano_lote:
+                    self.insertar(lote)
+                    importadas += len(lote)
+                    lote = []
+            if lote:
+                self.insertar(lote)
+                importadas += len(lote)
+
+        self.finalizar(importadas)
+        if not rechazadas:
+            ruta_rechazados.unlink()
+        duracion = time.perf_counter() - inicio
+        velocidad = (importadas + rechazadas) / duracion if duracion else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{importadas} {self.modelo._meta.verbose_name_plural.lower()} importados, '
+            f'{rechazadas} rechazados en {duracion:.2f} s ({velocidad:.0f} filas/s)'
+        ))
+        if rechazadas:
+            self.stdout.write(self.style.WARNING(f'Filas rechazadas en {ruta_rechazados}'))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import archivado
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve a las tablas de archivo los proyectos completados o cancelados sin cambios '
+        'recientes, con sus entregables y comentarios'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=archivado.DIAS, help='Días sin cambios para archivar un proyecto')
+        parser.add_argument('--lote', type=int, default=archivado.LOTE, help='Proyectos movidos por transacción')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+        if options['dias'] < 0:
+            raise CommandError('--dias no puede ser negativo')
+
+        def progreso(movidos):
+            self.stdout.write(', '.join(f'{cantidad} {nivel}' for nivel, cantidad in movidos.items()))
+
+        inicio = time.perf_counter()
+        movidos = archivado.archivar(options['dias'], options['lote'], progreso)
+        self.stdout.write(self.style.SUCCESS(
+            f"{movidos['proyectos']} proyectos archivados ({movidos['entregables']} entregables, "
+            f"{movidos['comentarios']} comentarios) en {time.perf_counter() - inicio:.2f} s"
+        ))
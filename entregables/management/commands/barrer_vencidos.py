@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import vencidos
+
+
+class Command(BaseCommand):
+    help = 'Marca en lotes los entregables vencidos pendientes de aviso (un UPDATE por lote)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Entregables marcados por UPDATE')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+        inicio = time.perf_counter()
+        marcados, marca = vencidos.barrer(options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{marcados} entregables vencidos marcados para aviso ({marca.isoformat()}) '
+            f'en {time.perf_counter() - inicio:.2f} s'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Compara la latencia (p50/p99) de las vistas síncronas por WSGI con sus versiones asíncronas por ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=50, help='Peticiones por ruta y vía')
+        parser.add_argument('--concurrencia', type=int, default=1, help='Peticiones simultáneas')
+        parser.add_argument('--en-frio', action='store_true', help='Vacía la caché antes de cada petición')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1 or options['concurrencia'] < 1:
+            raise CommandError('--repeticiones y --concurrencia deben ser mayores que cero')
+        informe = benchmarks.comparar_wsgi_asgi(options['repeticiones'], options['concurrencia'], options['en_frio'])
+
+        self.stdout.write(f'{"ruta":<20} {"WSGI p50":>10} {"WSGI p99":>10} {"ASGI p50":>10} {"ASGI p99":>10}')
+        for nombre, datos in informe['resultados'].items():
+            wsgi, asgi = datos['wsgi'], datos['asgi']
+            self.stdout.write(
+                f'{nombre:<20} {wsgi["p50_ms"]:>8.2f}ms {wsgi["p99_ms"]:>8.2f}ms '
+                f'{asgi["p50_ms"]:>8.2f}ms {asgi["p99_ms"]:>8.2f}ms'
+            )
+        if options['salida']:
+            benchmarks.guardar(informe, options['salida'])
+            self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
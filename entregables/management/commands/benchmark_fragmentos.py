@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Mide las listas sin caché de fragmentos, con la caché vacía y con las filas ya en caché'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones por lista y modo')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser mayor que cero')
+        informe = benchmarks.comparar_fragmentos(options['repeticiones'])
+
+        self.stdout.write(f'{"ruta":<18} {"sin caché":>11} {"en frío":>11} {"en caliente":>12} {"reducción":>10}')
+        for nombre, datos in informe['resultados'].items():
+            self.stdout.write(
+                f'{nombre:<18} {datos["sin_cache_ms"]:>9.2f}ms {datos["en_frio_ms"]:>9.2f}ms '
+                f'{datos["en_caliente_ms"]:>10.2f}ms {datos["reduccion_pct"]:>9.1f}%'
+            )
+        if options['salida']:
+            benchmarks.guardar(informe, options['salida'])
+            self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, consultas y memoria de cada ruta de la aplicación y guarda el resultado en JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', default='benchmark.json', help='Archivo JSON de resultados')
+        parser.add_argument('--comparar', help='Informe JSON anterior con el que comparar')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--en-frio', action='store_true', help='Vacía la caché antes de cada petición')
+        parser.add_argument('--filtro', help='Mide solo las rutas cuyo nombre contenga este texto')
+        parser.add_argument(
+            '--umbral', type=float, default=20.0,
+            help='Variación porcentual a partir de la cual se marca una regresión al comparar',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser mayor que cero')
+        informe = benchmarks.ejecutar(options['repeticiones'], options['en_frio'], options['filtro'])
+
+        for nombre, datos in informe['resultados'].items():
+            self.stdout.write(
+                f'{nombre:<32} {datos["status"]:>3}  {datos["tiempo_mediana_ms"]:>9.2f} ms  '
+                f'{datos["consultas"]:>4} consultas  {datos["memoria_pico_kb"]:>9.1f} KiB'
+            )
+        benchmarks.guardar(informe, options['salida'])
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
+
+        if options['comparar']:
+            anterior = benchmarks.cargar(options['comparar'])
+            self.stdout.write(f'\nComparación con {options["comparar"]}:')
+            for nombre, metrica, antes, despues, variacion in benchmarks.comparar(anterior, informe):
+                linea = f'{nombre:<32} {metrica:<18} {antes:>10} -> {despues:<10} ({variacion:+.1f}%)'
+                if variacion > options['umbral']:
+                    linea = self.style.ERROR(linea)
+                elif variacion < -options['umbral']:
+                    linea = self.style.SUCCESS(linea)
+                self.stdout.write(linea)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import borrado
+from entregables.models import Equipo, Proyecto
+
+
+class Command(BaseCommand):
+    help = 'Elimina un equipo o un proyecto con todo lo que depende de él, en lotes de DELETE por nivel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=['equipo', 'proyecto'])
+        parser.add_argument('pk', type=int)
+        parser.add_argument('--lote', type=int, default=borrado.LOTE, help='Filas borradas por DELETE y transacción')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+        modelo = Equipo if options['modelo'] == 'equipo' else Proyecto
+        if not modelo.objects.filter(pk=options['pk']).exists():
+            raise CommandError(f"No existe el {options['modelo']} {options['pk']}")
+
+        def progreso(nivel, borrados):
+            self.stdout.write(f'{nivel}: {borrados}')
+
+        eliminar = borrado.eliminar_equipo if modelo is Equipo else borrado.eliminar_proyecto
+        inicio = time.perf_counter()
+        # Los archivos se liberan aquí mismo: un hilo en segundo plano moriría con el comando
+        borrados = eliminar(options['pk'], options['lote'], progreso, segundo_plano=False)
+        resumen = ', '.join(f'{cantidad} {nivel}' for nivel, cantidad in borrados.items())
+        self.stdout.write(self.style.SUCCESS(f'Eliminados {resumen} en {time.perf_counter() - inicio:.2f} s'))
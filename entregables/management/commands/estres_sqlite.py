@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import estres
+
+
+class Command(BaseCommand):
+    help = 'Prueba de concurrencia de SQLite con lectores y escritores simultáneos sobre una base temporal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=4, help='Hilos que solo leen')
+        parser.add_argument('--escritores', type=int, default=4, help='Hilos que escriben')
+        parser.add_argument('--segundos', type=float, default=2.0, help='Duración de cada prueba')
+        parser.add_argument(
+            '--comparar', action='store_true',
+            help='Ejecuta también la prueba con la conexión por defecto de SQLite',
+        )
+
+    def handle(self, *args, **options):
+        if options['lectores'] < 0 or options['escritores'] < 0 or options['segundos'] <= 0:
+            raise CommandError('--lectores, --escritores y --segundos no pueden ser negativos')
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('La base de datos configurada no es SQLite')
+
+        perfiles = {'configurado': settings.DATABASES['default'].get('OPTIONS', {})}
+        if options['comparar']:
+            perfiles['por defecto'] = {}
+
+        self.stdout.write(
+            f'{"perfil":<12} {"journal":>8} {"lecturas":>9} {"escrituras":>10} '
+            f'{"bloq. lect.":>11} {"bloq. escr.":>11} {"espera máx.":>12}'
+        )
+        for nombre, opciones in perfiles.items():
+            datos = estres.ejecutar(opciones, options['lectores'], options['escritores'], options['segundos'])
+            self.stdout.write(
+                f'{nombre:<12} {datos["journal_mode"]:>8} {datos["lecturas"]:>9} {datos["escrituras"]:>10} '
+                f'{datos["bloqueos_lectura"]:>11} {datos["bloqueos_escritura"]:>11} '
+                f'{datos["espera_max_lectura_ms"]:>10.1f}ms'
+            )
+            if not datos['consistente']:
+                self.stdout.write(self.style.ERROR(f'{nombre}: el contador no coincide con las filas insertadas'))
@@ -0,0 +1,163 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from entregables import contadores, dashboard
+from entregables.models import Equipo, Miembro, Proyecto, Entregable, Comentario
+
+
+ESCALAS = {
+    'pequena': {'equipos': 10, 'proyectos': 100, 'entregables': 5_000, 'comentarios': 20_000},
+    'mediana': {'equipos': 50, 'proyectos': 1_000, 'entregables': 50_000, 'comentarios': 200_000},
+    'grande': {'equipos': 100, 'proyectos': 5_000, 'entregables': 500_000, 'comentarios': 2_000_000},
+}
+
+PESOS_ESTADO_PROYECTO = {'planificacion': 15, 'en_progreso': 40, 'revision': 15, 'completado': 25, 'cancelado': 5}
+PESOS_ESTADO_ENTREGABLE = {'pendiente': 30, 'en_progreso': 25, 'en_revision': 15, 'aprobado': 25, 'rechazado': 5}
+PESOS_PRIORIDAD = {'baja': 20, 'media': 45, 'alta': 25, 'critica': 10}
+PESOS_ROL = {'desarrollador': 50, 'tester': 15, 'disenador': 12, 'analista': 13, 'lider': 10}
+
+PALABRAS = (
+    'análisis diseño revisión implementación pruebas despliegue documentación integración '
+    'migración interfaz reporte módulo servicio arquitectura seguridad rendimiento datos '
+    'usuario cliente portal pagos inventario catálogo notificaciones auditoría'
+).split()
+NOMBRES = 'Ana Luis María José Carmen Pedro Lucía Jorge Sofía Diego Elena Pablo Valeria Andrés'.split()
+APELLIDOS = 'García López Martínez Rodríguez Pérez Sánchez Romero Torres Flores Rivera'.split()
+
+
+class Command(BaseCommand):
+    help = 'Genera datos sintéticos a gran escala para pruebas de rendimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=ESCALAS, default='pequena', help='Volúmenes predefinidos')
+        parser.add_argument('--equipos', type=int, help='Sobrescribe el número de equipos de la escala')
+        parser.add_argument('--miembros-por-equipo', type=int, default=8)
+        parser.add_argument('--proyectos', type=int)
+        parser.add_argument('--entregables', type=int)
+        parser.add_argument('--comentarios', type=int)
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por bulk_create y transacción')
+        parser.add_argument('--semilla', type=int, help='Semilla del generador aleatorio, para datos reproducibles')
+
+    def handle(self, *args, **options):
+        volumenes = dict(ESCALAS[options['escala']])
+        for clave in volumenes:
+            if options[clave] is not None:
+                volumenes[clave] = options[clave]
+        if volumenes['equipos'] < 1:
+            raise CommandError('Se necesita al menos un equipo')
+        if volumenes['entregables'] and volumenes['proyectos'] < 1:
+            raise CommandError('Los entregables necesitan al menos un proyecto')
+        if volumenes['comentarios'] and volumenes['entregables'] < 1:
+            raise CommandError('Los comentarios necesitan al menos un entregable')
+        self.azar = random.Random(options['semilla'])
+        self.lote = options['lote']
+        self.ahora = timezone.now()
+        inicio = time.perf_counter()
+
+        equipos = self.insertar(Equipo, volumenes['equipos'], self.equipo)
+        # Prefijo por ejecución para no chocar con emails de ejecuciones anteriores
+        prefijo = uuid.uuid4().hex[:8]
+        miembros = self.insertar(
+            Miembro, volumenes['equipos'] * options['miembros_por_equipo'],
+            lambda i: self.miembro(i, equipos, prefijo),
+        )
+        proyectos = self.insertar(Proyecto, volumenes['proyectos'], lambda i: self.proyecto(i, equipos))
+        entregables = self.insertar(
+            Entregable, volumenes['entregables'], lambda i: self.entregable(i, proyectos, miembros),
+        )
+        self.insertar(Comentario, volumenes['comentarios'], lambda i: self.comentario(entregables))
+
+        contadores.recalcular(proyectos)
+        dashboard.invalidar()
+        self.stdout.write(self.style.SUCCESS(f'Datos generados en {time.perf_counter() - inicio:.1f} s'))
+
+    def insertar(self, modelo, total, fabrica):
+        """Inserta `total` filas creadas por `fabrica(i)` y devuelve sus ids"""
+        ids = []
+        lote = []
+        inicio = time.perf_counter()
+        for i in range(total):
+            lote.append(fabrica(i))
+            if len(lote) >= self.lote or i == total - 1:
+                with transaction.atomic():
+                    ids.extend(objeto.pk for objeto in modelo.objects.bulk_create(lote))
+                lote = []
+                self.stdout.write(f'\r{modelo._meta.verbose_name_plural}: {len(ids)}/{total}', ending='')
+                self.stdout.flush()
+        duracion = time.perf_counter() - inicio
+        velocidad = total / duracion if duracion else 0
+        self.stdout.write(f'\r{modelo._meta.verbose_name_plural}: {total} ({velocidad:.0f} filas/s)')
+        return ids
+
+    def elegir(self, pesos):
+        return self.azar.choices(list(pesos), weights=list(pesos.values()))[0]
+
+    def frase(self, minimo, maximo):
+        return ' '.join(self.azar.choices(PALABRAS, k=self.azar.randint(minimo, maximo))).capitalize()
+
+    def fecha_pasada(self, dias):
+        return self.ahora - timedelta(seconds=self.azar.randint(0, dias * 86400))
+
+    def equipo(self, i):
+        return Equipo(
+            nombre=f'Equipo {self.frase(1, 2)} {i + 1}',
+            descripcion=self.frase(8, 20),
+            fecha_creacion=self.fecha_pasada(1000),
+            activo=self.azar.random() < 0.9,
+        )
+
+    def miembro(self, i, equipos, prefijo):
+        return Miembro(
+            nombre=f'{self.azar.choice(NOMBRES)} {self.azar.choice(APELLIDOS)}',
+            email=f'{prefijo}.{i}@ejemplo.com',
+            rol=self.elegir(PESOS_ROL),
+            equipo_id=self.azar.choice(equipos),
+            fecha_ingreso=self.fecha_pasada(1000).date(),
+            activo=self.azar.random() < 0.92,
+        )
+
+    def proyecto(self, i, equipos):
+        inicio = self.fecha_pasada(730).date()
+        estado = self.elegir(PESOS_ESTADO_PROYECTO)
+        fin_estimado = inicio + timedelta(days=self.azar.randint(30, 365))
+        return Proyecto(
+            nombre=f'Proyecto {self.frase(1, 3)} {i + 1}',
+            descripcion=self.frase(10, 30),
+            equipo_id=self.azar.choice(equipos),
+            estado=estado,
+            fecha_inicio=inicio,
+            fecha_fin_estimada=fin_estimado,
+            fecha_fin_real=fin_estimado + timedelta(days=self.azar.randint(-20, 60)) if estado == 'completado' else None,
+            presupuesto=self.azar.randint(1_000, 500_000) if self.azar.random() < 0.7 else None,
+        )
+
+    def entregable(self, i, proyectos, miembros):
+        creacion = self.fecha_pasada(730)
+        estado = self.elegir(PESOS_ESTADO_ENTREGABLE)
+        porcentaje = {'pendiente': 0, 'aprobado': 100}.get(estado, self.azar.randint(5, 95))
+        return Entregable(
+            titulo=f'{self.frase(2, 5)} {i + 1}',
+            descripcion=self.frase(15, 60),
+            proyecto_id=self.azar.choice(proyectos),
+            responsable_id=self.azar.choice(miembros) if miembros and self.azar.random() < 0.85 else None,
+            estado=estado,
+            prioridad=self.elegir(PESOS_PRIORIDAD),
+            fecha_creacion=creacion,
+            fecha_vencimiento=(creacion + timedelta(days=self.azar.randint(7, 120))).date(),
+            fecha_completado=creacion + timedelta(days=self.azar.randint(1, 90)) if estado == 'aprobado' else None,
+            porcentaje_completado=porcentaje,
+        )
+
+    def comentario(self, entregables):
+        return Comentario(
+            entregable_id=self.azar.choice(entregables),
+            autor=f'{self.azar.choice(NOMBRES)} {self.azar.choice(APELLIDOS)}',
+            contenido=self.frase(5, 40),
+            fecha_creacion=self.fecha_pasada(700),
+        )
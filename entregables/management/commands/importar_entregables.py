@@ -0,0 +1,36 @@
+from django.core.exceptions import ValidationError
+
+from entregables import contadores
+from entregables.importacion import ComandoImportacion, IndiceClaves
+from entregables.models import Entregable, Miembro, Proyecto
+
+
+class Command(ComandoImportacion):
+    help = (
+        'Importa entregables desde CSV o NDJSON. Columnas: titulo, descripcion, proyecto (id o nombre), '
+        'responsable (id o email), estado, prioridad, fecha_vencimiento, porcentaje_completado, fecha_creacion'
+    )
+    modelo = Entregable
+    campos = ['titulo', 'descripcion', 'estado', 'prioridad', 'fecha_vencimiento', 'porcentaje_completado', 'fecha_creacion']
+    relaciones = {'proyecto': 'Proyecto', 'responsable': 'Responsable'}
+
+    def preparar(self):
+        self.indices = {
+            'proyecto': IndiceClaves(Proyecto.objects.all(), 'nombre'),
+            'responsable': IndiceClaves(Miembro.objects.all(), 'email'),
+        }
+        self.proyectos = set()
+
+    def validar(self, instancia, fila):
+        if not 0 <= instancia.porcentaje_completado <= 100:
+            raise ValidationError('porcentaje_completado: debe estar entre 0 y 100')
+
+    def insertar(self, lote):
+        super().insertar(lote)
+        self.proyectos.update(entregable.proyecto_id for entregable in lote)
+
+    def finalizar(self, importadas):
+        super().finalizar(importadas)
+        # bulk_create no emite señales: se recalculan los contadores de los proyectos con filas nuevas
+        if self.proyectos:
+            contadores.recalcular(self.proyectos)
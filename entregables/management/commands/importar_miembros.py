@@ -0,0 +1,24 @@
+from django.core.exceptions import ValidationError
+
+from entregables.importacion import ComandoImportacion, IndiceClaves
+from entregables.models import Equipo, Miembro
+
+
+class Command(ComandoImportacion):
+    help = (
+        'Importa miembros desde CSV o NDJSON. Columnas: nombre, email, rol, equipo (id o nombre), '
+        'fecha_ingreso, activo'
+    )
+    modelo = Miembro
+    campos = ['nombre', 'email', 'rol', 'fecha_ingreso', 'activo']
+    relaciones = {'equipo': 'Equipo'}
+
+    def preparar(self):
+        self.indices = {'equipo': IndiceClaves(Equipo.objects.all(), 'nombre')}
+        self.emails = {email.lower() for email in Miembro.objects.order_by().values_list('email', flat=True).iterator()}
+
+    def validar(self, instancia, fila):
+        email = instancia.email.lower()
+        if email in self.emails:
+            raise ValidationError(f'email: ya existe un miembro con {instancia.email}')
+        self.emails.add(email)
@@ -0,0 +1,15 @@
+from entregables.importacion import ComandoImportacion, IndiceClaves
+from entregables.models import Equipo, Proyecto
+
+
+class Command(ComandoImportacion):
+    help = (
+        'Importa proyectos desde CSV o NDJSON. Columnas: nombre, descripcion, equipo (id o nombre), estado, '
+        'fecha_inicio, fecha_fin_estimada, fecha_fin_real, presupuesto'
+    )
+    modelo = Proyecto
+    campos = ['nombre', 'descripcion', 'estado', 'fecha_inicio', 'fecha_fin_estimada', 'fecha_fin_real', 'presupuesto']
+    relaciones = {'equipo': 'Equipo'}
+
+    def preparar(self):
+        self.indices = {'equipo': IndiceClaves(Equipo.objects.all(), 'nombre')}
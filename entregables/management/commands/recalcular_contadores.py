@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from entregables import contadores
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula los contadores desnormalizados de entregables en los proyectos '
+        '(conviene ejecutarlo a diario para actualizar los vencidos)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proyecto', type=int, action='append',
+            help='Id del proyecto a recalcular (se puede repetir). Por defecto, todos.',
+        )
+        parser.add_argument('--lote', type=int, default=1000, help='Proyectos por bulk_update y transacción')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        corregidos = contadores.recalcular(options['proyecto'], options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{corregidos} proyectos corregidos en {time.perf_counter() - inicio:.2f} s'
+        ))
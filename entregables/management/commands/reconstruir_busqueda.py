@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from entregables import busqueda
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero los índices de búsqueda de texto completo (FTS5)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo', action='append', choices=list(busqueda.CAMPOS_INDEXADOS),
+            help='Modelo a reindexar (se puede repetir). Por defecto, todos.',
+        )
+        parser.add_argument('--database', default='default', help='Alias de la base de datos')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('La búsqueda de texto completo solo está disponible en SQLite.')
+        modelos = options['modelo'] or list(busqueda.CAMPOS_INDEXADOS)
+        with transaction.atomic(using=options['database']):
+            busqueda.eliminar_indices(connection, modelos)
+            busqueda.crear_indices(connection, modelos)
+        self.stdout.write(self.style.SUCCESS(f'Índices reconstruidos: {", ".join(modelos)}'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from entregables import archivado
+
+
+class Command(BaseCommand):
+    help = 'Devuelve proyectos archivados, con sus entregables y comentarios, a las tablas vivas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--proyecto', type=int, action='append',
+            help='Id del proyecto a restaurar (se puede repetir). Por defecto, todos.',
+        )
+        parser.add_argument('--lote', type=int, default=archivado.LOTE, help='Proyectos movidos por transacción')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        def progreso(movidos):
+            self.stdout.write(', '.join(f'{cantidad} {nivel}' for nivel, cantidad in movidos.items()))
+
+        inicio = time.perf_counter()
+        movidos = archivado.restaurar(options['proyecto'], options['lote'], progreso)
+        self.stdout.write(self.style.SUCCESS(
+            f"{movidos['proyectos']} proyectos restaurados ({movidos['entregables']} entregables, "
+            f"{movidos['comentarios']} comentarios) en {time.perf_counter() - inicio:.2f} s"
+        ))
@@ -0,0 +1,265 @@
+"""
+Métricas de latencia y SQL por vista, expuestas en formato de texto de Prometheus.
+
+`MetricasMiddleware` (síncrono y asíncrono) mide cada petición y publica su
+`Medicion` en una ContextVar; `registrar_consulta`, instalado como
+execute_wrapper en cada conexión al abrirse, cuenta las consultas y su
+tiempo. La ContextVar se copia a los hilos de sync_to_async, así que también
+se cuentan las consultas de las vistas asíncronas. Al terminar la petición
+el resultado se acumula en el registro del proceso (histograma de latencia
+por nombre de ruta, consultas, tiempo SQL y las sentencias normalizadas más
+lentas); la vista `exponer` lo publica en /metrics. Cada proceso de trabajo
+mantiene su propio registro.
+
+Ajustes:
+  - METRICAS_SERVER_TIMING: añade la cabecera Server-Timing a cada respuesta.
+  - METRICAS_UMBRAL_LENTO_MS: registra en el log `entregables.metricas` las
+    peticiones que lo superen (0 lo desactiva).
+  - METRICAS_IPS y METRICAS_TOKEN: quién puede leer /metrics (las IP de la
+    lista o quien envíe `Authorization: Bearer <token>`); el resto recibe 404.
+"""
+import hmac
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+
+logger = logging.getLogger(__name__)
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SENTENCIAS_EXPUESTAS = 20
+SENTENCIAS_MAXIMAS = 500
+SIN_RUTA = '<sin_ruta>'
+
+_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LISTAS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_ESPACIOS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(sql):
+    """Sustituye literales por `?` y colapsa listas IN para agrupar sentencias equivalentes"""
+    sql = _CADENAS.sub('?', sql)
+    sql = _NUMEROS.sub('?', sql)
+    sql = _LISTAS.sub('(...)', sql)
+    return _ESPACIOS.sub(' ', sql).strip()
+
+
+class Medicion:
+    """Consultas ejecutadas durante una petición"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.sentencias = {}
+
+    def anotar(self, sql, duracion):
+        self.consultas += 1
+        self.tiempo_sql += duracion
+        total, maximo, veces = self.sentencias.get(sql, (0.0, 0.0, 0))
+        self.sentencias[sql] = (total + duracion, max(maximo, duracion), veces + 1)
+
+
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+def registrar_consulta(execute, sql, params, many, context):
+    """execute_wrapper: anota la consulta en la medición de la petición en curso, si la hay"""
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.anotar(sql, time.perf_counter() - inicio)
+
+
+def instalar(sender, connection, **kwargs):
+    """Receptor de connection_created; cada conexión lleva el wrapper una sola vez"""
+    if registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(registrar_consulta)
+
+
+class Registro:
+    """Acumulado de métricas del proceso; seguro entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.vistas = {}
+            self.sentencias = {}
+
+    def registrar(self, vista, duracion, medicion):
+        with self._lock:
+            datos = self.vistas.get(vista)
+            if datos is None:
+                datos = self.vistas[vista] = {
+                    'cubetas': [0] * len(LIMITES_LATENCIA),
+                    'peticiones': 0,
+                    'duracion': 0.0,
+                    'consultas': 0,
+                    'tiempo_sql': 0.0,
+                }
+            for i, limite in enumerate(LIMITES_LATENCIA):
+                if duracion <= limite:
+                    datos['cubetas'][i] += 1
+            datos['peticiones'] += 1
+            datos['duracion'] += duracion
+            datos['consultas'] += medicion.consultas
+            datos['tiempo_sql'] += medicion.tiempo_sql
+
+            for sql, (total, maximo, veces) in medicion.sentencias.items():
+                clave = normalizar_sql(sql)
+                previo = self.sentencias.get(clave, (0.0, 0.0, 0))
+                self.sentencias[clave] = (previo[0] + total, max(previo[1], maximo), previo[2] + veces)
+            if len(self.sentencias) > SENTENCIAS_MAXIMAS:
+                # Se descartan las sentencias que menos tiempo acumulan
+                conservar = sorted(self.sentencias.items(), key=lambda item: item[1][0], reverse=True)
+                self.sentencias = dict(conservar[:SENTENCIAS_MAXIMAS // 2])
+
+    def instantanea(self):
+        with self._lock:
+            vistas = {vista: dict(datos, cubetas=list(datos['cubetas'])) for vista, datos in self.vistas.items()}
+            sentencias = sorted(self.sentencias.items(), key=lambda item: item[1][0], reverse=True)
+        return vistas, sentencias[:SENTENCIAS_EXPUESTAS]
+
+
+registro = Registro()
+
+
+def _nombre_vista(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    return coincidencia.view_name if coincidencia else SIN_RUTA
+
+
+class MetricasMiddleware:
+    """Mide latencia y consultas de cada petición y las acumula en `registro`"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self.terminar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        return self.terminar(request, response, medicion, time.perf_counter() - inicio)
+
+    def terminar(self, request, response, medicion, duracion):
+        vista = _nombre_vista(request)
+        registro.registrar(vista, duracion, medicion)
+
+        if getattr(settings, 'METRICAS_SERVER_TIMING', True):
+            response['Server-Timing'] = (
+                f'db;dur={medicion.tiempo_sql * 1000:.2f};desc="{medicion.consultas} consultas", '
+                f'total;dur={duracion * 1000:.2f}'
+            )
+        umbral = getattr(settings, 'METRICAS_UMBRAL_LENTO_MS', 0)
+        if umbral and duracion * 1000 >= umbral:
+            logger.warning(
+                'Petición lenta: %s %s (%s) %.1f ms, %d consultas, %.1f ms en SQL',
+                request.method, request.path, vista, duracion * 1000,
+                medicion.consultas, medicion.tiempo_sql * 1000,
+            )
+        return response
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def texto_prometheus():
+    """Genera el contenido de /metrics"""
+    vistas, sentencias = registro.instantanea()
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        for sufijo, etiquetas, valor in muestras:
+            texto = ','.join(f'{clave}="{_etiqueta(v)}"' for clave, v in etiquetas)
+            lineas.append(f'{nombre}{sufijo}{{{texto}}} {_numero(valor)}')
+
+    histograma = []
+    for vista, datos in sorted(vistas.items()):
+        for limite, cantidad in zip(LIMITES_LATENCIA, datos['cubetas']):
+            histograma.append(('_bucket', [('vista', vista), ('le', limite)], cantidad))
+        histograma.append(('_bucket', [('vista', vista), ('le', '+Inf')], datos['peticiones']))
+        histograma.append(('_sum', [('vista', vista)], datos['duracion']))
+        histograma.append(('_count', [('vista', vista)], datos['peticiones']))
+    metrica('entregables_vista_duracion_segundos', 'histogram', 'Latencia de las peticiones por vista.', histograma)
+
+    metrica(
+        'entregables_vista_consultas_total', 'counter', 'Consultas SQL ejecutadas por vista.',
+        [('', [('vista', vista)], datos['consultas']) for vista, datos in sorted(vistas.items())],
+    )
+    metrica(
+        'entregables_vista_sql_segundos_total', 'counter', 'Tiempo total en SQL por vista.',
+        [('', [('vista', vista)], datos['tiempo_sql']) for vista, datos in sorted(vistas.items())],
+    )
+    metrica(
+        'entregables_sql_segundos_total', 'counter', 'Tiempo acumulado de las sentencias SQL más costosas.',
+        [('', [('sql', sql)], total) for sql, (total, _, _) in sentencias],
+    )
+    metrica(
+        'entregables_sql_segundos_max', 'gauge', 'Duración máxima de las sentencias SQL más costosas.',
+        [('', [('sql', sql)], maximo) for sql, (_, maximo, _) in sentencias],
+    )
+    metrica(
+        'entregables_sql_ejecuciones_total', 'counter', 'Ejecuciones de las sentencias SQL más costosas.',
+        [('', [('sql', sql)], veces) for sql, (_, _, veces) in sentencias],
+    )
+    return '\n'.join(lineas) + '\n'
+
+
+def autorizado(request):
+    """Si la petición viene de METRICAS_IPS o trae el token METRICAS_TOKEN"""
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token:
+        esquema, _, enviado = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if esquema.lower() == 'bearer' and hmac.compare_digest(enviado.strip().encode(), token.encode()):
+            return True
+    return request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICAS_IPS', ())
+
+
+def exponer(request):
+    """Endpoint /metrics en formato de texto de Prometheus"""
+    # 404 y no 403: no se revela que el endpoint existe
+    if not autorizado(request):
+        raise Http404
+    return HttpResponse(texto_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
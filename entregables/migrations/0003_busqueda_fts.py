@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from entregables import busqueda
+
+
+def crear_indices(apps, schema_editor):
+    busqueda.crear_indices(schema_editor.connection)
+
+
+def eliminar_indices(apps, schema_editor):
+    busqueda.eliminar_indices(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0002_alter_entregable_estado_delete_estadoentregable'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0003_busqueda_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['entregable', 'fecha_creacion', 'id'], name='comentario_entregable_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='entregable_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['estado', 'fecha_creacion', 'id'], name='entregable_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['prioridad', 'fecha_creacion', 'id'], name='entregable_prioridad_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['estado', 'prioridad', 'fecha_creacion', 'id'], name='entregable_est_prio_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipo',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='equipo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipo',
+            index=models.Index(fields=['activo'], name='equipo_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(fields=['activo'], name='miembro_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['fecha_inicio', 'id'], name='proyecto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['estado', 'fecha_inicio', 'id'], name='proyecto_estado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:13
+
+import entregables.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0004_indices_compuestos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entregable',
+            name='archivo_nombre',
+            field=models.CharField(blank=True, default='', help_text='Nombre original del archivo subido', max_length=255, verbose_name='Nombre del Archivo'),
+        ),
+        migrations.AlterField(
+            model_name='entregable',
+            name='archivo',
+            field=models.FileField(blank=True, null=True, storage=entregables.almacenamiento.obtener_almacenamiento, upload_to='entregables/', verbose_name='Archivo Adjunto'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['archivo'], name='entregable_archivo_idx'),
+        ),
+    ]
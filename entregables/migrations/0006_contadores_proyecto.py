@@ -0,0 +1,86 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:16
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+CAMPOS_ESTADO = {
+    'pendiente': 'entregables_pendientes',
+    'en_progreso': 'entregables_en_progreso',
+    'en_revision': 'entregables_en_revision',
+    'aprobado': 'entregables_aprobados',
+    'rechazado': 'entregables_rechazados',
+}
+CAMPOS = [
+    'total_entregables', *CAMPOS_ESTADO.values(), 'entregables_vencidos', 'suma_porcentaje',
+]
+
+
+def calcular_contadores(apps, schema_editor):
+    # Copia congelada del recálculo de contadores.py: solo las columnas que existen en esta migración
+    Proyecto = apps.get_model('entregables', 'Proyecto')
+    Entregable = apps.get_model('entregables', 'Entregable')
+    alias = schema_editor.connection.alias
+    filas = Entregable.objects.using(alias).order_by().values('proyecto').annotate(
+        total_entregables=Count('pk'),
+        entregables_vencidos=Count('pk', filter=Q(
+            fecha_completado__isnull=True, fecha_vencimiento__lt=timezone.localdate(),
+        )),
+        suma_porcentaje=Coalesce(Sum('porcentaje_completado'), 0),
+        **{campo: Count('pk', filter=Q(estado=estado)) for estado, campo in CAMPOS_ESTADO.items()},
+    )
+    proyectos = [Proyecto(pk=fila.pop('proyecto'), **fila) for fila in filas]
+    Proyecto.objects.using(alias).bulk_update(proyectos, CAMPOS, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0005_archivo_por_contenido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_aprobados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Aprobados'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_en_progreso',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='En Progreso'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_en_revision',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='En Revisión'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_pendientes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Pendientes'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_rechazados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Rechazados'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='entregables_vencidos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Vencidos'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='suma_porcentaje',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Suma de % Completado'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='total_entregables',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Entregables'),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0006_contadores_proyecto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entregable',
+            name='fecha_aviso_vencido',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Fecha de Aviso de Vencimiento'),
+        ),
+        migrations.AddField(
+            model_name='entregable',
+            name='vencimiento_avisado',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Vencimiento Avisado'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(condition=models.Q(('fecha_completado__isnull', True)), fields=['fecha_vencimiento', 'id'], name='entregable_vencidos_idx'),
+        ),
+    ]
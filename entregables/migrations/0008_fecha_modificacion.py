@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0007_vencidos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entregable',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Fecha de Modificación'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='equipo',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Fecha de Modificación'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Fecha de Modificación'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from entregables import versiones
+
+
+def crear(apps, schema_editor):
+    versiones.crear(schema_editor.connection)
+
+
+def eliminar(apps, schema_editor):
+    versiones.eliminar(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0008_fecha_modificacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, eliminar),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:31
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0009_versiones'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipo',
+            index=models.Index(django.db.models.functions.comparison.Collate('nombre', 'nocase'), condition=models.Q(('activo', True)), name='equipo_nombre_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(django.db.models.functions.comparison.Collate('nombre', 'nocase'), condition=models.Q(('activo', True)), name='miembro_nombre_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(django.db.models.functions.comparison.Collate('nombre', 'nocase'), name='proyecto_nombre_idx'),
+        ),
+    ]
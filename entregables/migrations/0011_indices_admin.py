@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:42
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0010_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='comentario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['proyecto', 'fecha_creacion', 'id'], name='entregable_proyecto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(fields=['equipo', 'nombre', 'id'], name='miembro_equipo_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(django.db.models.functions.comparison.Collate('nombre', 'nocase'), name='miembro_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(django.db.models.functions.comparison.Collate('email', 'nocase'), name='miembro_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='miembro',
+            index=models.Index(fields=['fecha_ingreso', 'id'], name='miembro_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['equipo', 'fecha_inicio', 'id'], name='proyecto_equipo_fecha_idx'),
+        ),
+    ]
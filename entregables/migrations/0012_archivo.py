@@ -0,0 +1,107 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:47
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+import entregables.almacenamiento
+from django.db import migrations, models
+
+from entregables import versiones
+
+
+def crear_versiones(apps, schema_editor):
+    # Versiones y triggers de las tablas de archivo (GET condicionales)
+    versiones.crear(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0011_indices_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProyectoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=200, verbose_name='Nombre del Proyecto')),
+                ('descripcion', models.TextField(verbose_name='Descripción')),
+                ('estado', models.CharField(choices=[('planificacion', 'Planificación'), ('en_progreso', 'En Progreso'), ('revision', 'En Revisión'), ('completado', 'Completado'), ('cancelado', 'Cancelado')], max_length=20, verbose_name='Estado')),
+                ('fecha_inicio', models.DateField(verbose_name='Fecha de Inicio')),
+                ('fecha_fin_estimada', models.DateField(verbose_name='Fecha de Fin Estimada')),
+                ('fecha_fin_real', models.DateField(blank=True, null=True, verbose_name='Fecha de Fin Real')),
+                ('presupuesto', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Presupuesto')),
+                ('fecha_modificacion', models.DateTimeField(verbose_name='Fecha de Modificación')),
+                ('total_entregables', models.PositiveIntegerField(default=0, verbose_name='Entregables')),
+                ('entregables_pendientes', models.PositiveIntegerField(default=0, verbose_name='Pendientes')),
+                ('entregables_en_progreso', models.PositiveIntegerField(default=0, verbose_name='En Progreso')),
+                ('entregables_en_revision', models.PositiveIntegerField(default=0, verbose_name='En Revisión')),
+                ('entregables_aprobados', models.PositiveIntegerField(default=0, verbose_name='Aprobados')),
+                ('entregables_rechazados', models.PositiveIntegerField(default=0, verbose_name='Rechazados')),
+                ('entregables_vencidos', models.PositiveIntegerField(default=0, verbose_name='Vencidos')),
+                ('suma_porcentaje', models.PositiveBigIntegerField(default=0, verbose_name='Suma de % Completado')),
+                ('fecha_archivado', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), verbose_name='Fecha de Archivado')),
+                ('equipo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proyectos_archivados', to='entregables.equipo', verbose_name='Equipo')),
+            ],
+            options={
+                'verbose_name': 'Proyecto Archivado',
+                'verbose_name_plural': 'Proyectos Archivados',
+                'ordering': ['-fecha_inicio'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EntregableArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('descripcion', models.TextField(verbose_name='Descripción')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_progreso', 'En Progreso'), ('en_revision', 'En Revisión'), ('aprobado', 'Aprobado'), ('rechazado', 'Rechazado')], max_length=20, verbose_name='Estado')),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta'), ('critica', 'Crítica')], max_length=10, verbose_name='Prioridad')),
+                ('fecha_creacion', models.DateTimeField(verbose_name='Fecha de Creación')),
+                ('fecha_vencimiento', models.DateField(verbose_name='Fecha de Vencimiento')),
+                ('fecha_completado', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Completado')),
+                ('fecha_modificacion', models.DateTimeField(verbose_name='Fecha de Modificación')),
+                ('archivo', models.FileField(blank=True, null=True, storage=entregables.almacenamiento.obtener_almacenamiento, upload_to='entregables/', verbose_name='Archivo Adjunto')),
+                ('archivo_nombre', models.CharField(blank=True, default='', max_length=255, verbose_name='Nombre del Archivo')),
+                ('porcentaje_completado', models.IntegerField(default=0, verbose_name='% Completado')),
+                ('vencimiento_avisado', models.DateField(blank=True, null=True, verbose_name='Vencimiento Avisado')),
+                ('fecha_aviso_vencido', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Aviso de Vencimiento')),
+                ('responsable', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entregables_archivados', to='entregables.miembro', verbose_name='Responsable')),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregables', to='entregables.proyectoarchivado', verbose_name='Proyecto')),
+            ],
+            options={
+                'verbose_name': 'Entregable Archivado',
+                'verbose_name_plural': 'Entregables Archivados',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ComentarioArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('autor', models.CharField(max_length=200, verbose_name='Autor')),
+                ('contenido', models.TextField(verbose_name='Contenido')),
+                ('fecha_creacion', models.DateTimeField(verbose_name='Fecha de Creación')),
+                ('entregable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comentarios', to='entregables.entregablearchivado', verbose_name='Entregable')),
+            ],
+            options={
+                'verbose_name': 'Comentario Archivado',
+                'verbose_name_plural': 'Comentarios Archivados',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['entregable', 'fecha_creacion', 'id'], name='archivado_comentario_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='proyectoarchivado',
+            index=models.Index(fields=['fecha_inicio', 'id'], name='archivado_proyecto_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregablearchivado',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='archivado_entregable_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entregablearchivado',
+            index=models.Index(fields=['archivo'], name='archivado_entregable_arch_idx'),
+        ),
+        migrations.RunPython(crear_versiones, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,70 @@
 from django.db import models
+from django.db.models import BooleanField, Count, ExpressionWrapper, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Collate, Now
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .almacenamiento import obtener_almacenamiento
+
+
+def _conteo_relacionados(modelo, campo):
+    """Subconsulta correlacionada que cuenta las filas de `modelo` que apuntan al registro externo"""
+    subconsulta = (
+        modelo.objects.filter(**{campo: OuterRef('pk')})
+        .order_by()
+        .values(campo)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(subconsulta, output_field=IntegerField()), 0)
+
+
+class EquipoQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Anota num_miembros y num_proyectos sin consultas adicionales por fila"""
+        return self.annotate(
+            num_miembros=_conteo_relacionados(Miembro, 'equipo'),
+            num_proyectos=_conteo_relacionados(Proyecto, 'equipo'),
+        )
+
+
+def condicion_vencido(hoy=None):
+    """Predicado SQL de "vencido": sin completar y con la fecha de vencimiento pasada"""
+    return Q(fecha_completado__isnull=True, fecha_vencimiento__lt=hoy or timezone.localdate())
+
+
+class EntregableQuerySet(models.QuerySet):
+    def vencidos(self, hoy=None):
+        """Entregables vencidos; usa el índice parcial entregable_vencidos_idx"""
+        return self.filter(condicion_vencido(hoy))
+
+    def annotate_vencido(self, hoy=None):
+        """Anota `vencido` (booleano) para no evaluar esta_vencido() fila a fila"""
+        return self.annotate(
+            vencido=ExpressionWrapper(condicion_vencido(hoy), output_field=BooleanField())
+        )
+
 
 class Equipo(models.Model):
     """Modelo para representar un equipo de trabajo"""
     nombre = models.CharField(max_length=200, verbose_name="Nombre del Equipo")
     descripcion = models.TextField(verbose_name="Descripción", blank=True)
     fecha_creacion = models.DateTimeField(default=timezone.now, verbose_name="Fecha de Creación")
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Modificación")
     activo = models.BooleanField(default=True, verbose_name="Activo")
 
+    objects = EquipoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Equipo"
         verbose_name_plural = "Equipos"
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='equipo_fecha_idx'),
+            models.Index(fields=['activo'], name='equipo_activo_idx'),
+            # Autocompletado por prefijo (LIKE 'x%' insensible a mayúsculas)
+            models.Index(Collate('nombre', 'nocase'), name='equipo_nombre_activo_idx', condition=Q(activo=True)),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -40,6 +91,15 @@ class Miembro(models.Model):
         verbose_name = "Miembro"
         verbose_name_plural = "Miembros"
         ordering = ['equipo', 'nombre']
+        indexes = [
+            models.Index(fields=['activo'], name='miembro_activo_idx'),
+            models.Index(Collate('nombre', 'nocase'), name='miembro_nombre_activo_idx', condition=Q(activo=True)),
+            # Admin: orden por equipo, búsqueda por prefijo del nombre o email y jerarquía de fechas
+            models.Index(fields=['equipo', 'nombre', 'id'], name='miembro_equipo_nombre_idx'),
+            models.Index(Collate('nombre', 'nocase'), name='miembro_nombre_idx'),
+            models.Index(Collate('email', 'nocase'), name='miembro_email_idx'),
+            models.Index(fields=['fecha_ingreso', 'id'], name='miembro_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} - {self.get_rol_display()}"
@@ -63,15 +123,57 @@ class Proyecto(models.Model):
     fecha_fin_estimada = models.DateField(verbose_name="Fecha de Fin Estimada")
     fecha_fin_real = models.DateField(null=True, blank=True, verbose_name="Fecha de Fin Real")
     presupuesto = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Presupuesto")
+    # auto_now solo actúa en save(): los update() que cambian algo visible la asignan
+    # explícitamente, porque forma parte de la clave de los fragmentos en caché
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Modificación")
+
+    # Contadores desnormalizados de sus entregables, mantenidos por contadores.py
+    total_entregables = models.PositiveIntegerField(default=0, editable=False, verbose_name="Entregables")
+    entregables_pendientes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Pendientes")
+    entregables_en_progreso = models.PositiveIntegerField(default=0, editable=False, verbose_name="En Progreso")
+    entregables_en_revision = models.PositiveIntegerField(default=0, editable=False, verbose_name="En Revisión")
+    entregables_aprobados = models.PositiveIntegerField(default=0, editable=False, verbose_name="Aprobados")
+    entregables_rechazados = models.PositiveIntegerField(default=0, editable=False, verbose_name="Rechazados")
+    entregables_vencidos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Vencidos")
+    suma_porcentaje = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Suma de % Completado")
+
+    CAMPOS_CONTADORES = [
+        'total_entregables', 'entregables_pendientes', 'entregables_en_progreso', 'entregables_en_revision',
+        'entregables_aprobados', 'entregables_rechazados', 'entregables_vencidos', 'suma_porcentaje',
+    ]
 
     class Meta:
         verbose_name = "Proyecto"
         verbose_name_plural = "Proyectos"
         ordering = ['-fecha_inicio']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id'], name='proyecto_fecha_idx'),
+            models.Index(fields=['estado', 'fecha_inicio', 'id'], name='proyecto_estado_fecha_idx'),
+            models.Index(Collate('nombre', 'nocase'), name='proyecto_nombre_idx'),
+            # Admin filtrado por equipo, en el orden de la lista
+            models.Index(fields=['equipo', 'fecha_inicio', 'id'], name='proyecto_equipo_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} - {self.get_estado_display()}"
 
+    def save(self, *args, **kwargs):
+        # Los contadores solo se modifican con F() desde contadores.py: un save()
+        # con valores leídos antes podría pisar incrementos concurrentes
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.CAMPOS_CONTADORES
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def porcentaje_promedio(self):
+        """Promedio del % completado de sus entregables"""
+        if not self.total_entregables:
+            return 0
+        return round(self.suma_porcentaje / self.total_entregables)
+
 
 
 class Entregable(models.Model):
@@ -99,23 +201,73 @@ class Entregable(models.Model):
     fecha_creacion = models.DateTimeField(default=timezone.now, verbose_name="Fecha de Creación")
     fecha_vencimiento = models.DateField(verbose_name="Fecha de Vencimiento")
     fecha_completado = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Completado")
-    archivo = models.FileField(upload_to='entregables/', null=True, blank=True, verbose_name="Archivo Adjunto")
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Modificación")
+    archivo = models.FileField(upload_to='entregables/', storage=obtener_almacenamiento, null=True, blank=True, verbose_name="Archivo Adjunto")
+    archivo_nombre = models.CharField(max_length=255, blank=True, default='', verbose_name="Nombre del Archivo",
+                                      help_text="Nombre original del archivo subido")
     porcentaje_completado = models.IntegerField(default=0, verbose_name="% Completado", 
                                                help_text="Porcentaje de completado (0-100)")
 
+    # Último vencimiento ya registrado para avisar (comando barrer_vencidos)
+    vencimiento_avisado = models.DateField(null=True, blank=True, editable=False, verbose_name="Vencimiento Avisado")
+    fecha_aviso_vencido = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Fecha de Aviso de Vencimiento")
+
+    objects = EntregableQuerySet.as_manager()
+
+    CAMPOS_SEGUIDOS = ['proyecto_id', 'estado', 'porcentaje_completado', 'fecha_vencimiento', 'fecha_completado', 'archivo']
+
     class Meta:
         verbose_name = "Entregable"
         verbose_name_plural = "Entregables"
         ordering = ['-fecha_creacion']
+        # Índices (filtro, fecha_creacion, id): sirven al filtro y al orden de
+        # la paginación por cursor sin ordenar en un B-tree temporal
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='entregable_fecha_idx'),
+            models.Index(fields=['estado', 'fecha_creacion', 'id'], name='entregable_estado_fecha_idx'),
+            models.Index(fields=['prioridad', 'fecha_creacion', 'id'], name='entregable_prioridad_fecha_idx'),
+            models.Index(fields=['estado', 'prioridad', 'fecha_creacion', 'id'], name='entregable_est_prio_fecha_idx'),
+            # Admin filtrado por proyecto
+            models.Index(fields=['proyecto', 'fecha_creacion', 'id'], name='entregable_proyecto_fecha_idx'),
+            # Conteo de referencias de los archivos por contenido (almacenamiento.liberar)
+            models.Index(fields=['archivo'], name='entregable_archivo_idx'),
+            # Solo los no completados: el índice de vencidos() se mantiene pequeño
+            models.Index(
+                fields=['fecha_vencimiento', 'id'], name='entregable_vencidos_idx',
+                condition=Q(fecha_completado__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.proyecto.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Valores guardados en la base: las señales los comparan al guardar para
+        # ajustar los contadores del proyecto y liberar el archivo reemplazado
+        instancia._guardado = instancia.valores_seguidos(solo_cargados=True)
+        return instancia
+
+    def valores_seguidos(self, solo_cargados=False):
+        valores = {}
+        for campo in self.CAMPOS_SEGUIDOS:
+            if solo_cargados and campo not in self.__dict__:
+                continue
+            valor = self.__dict__[campo] if solo_cargados else getattr(self, campo)
+            valores[campo] = getattr(valor, 'name', valor)
+        return valores
+
+    def adjuntar(self, archivo):
+        """Asigna un archivo subido conservando su nombre original"""
+        self.archivo = archivo
+        self.archivo_nombre = archivo.name[:255]
+
     def esta_vencido(self):
         """Verifica si el entregable está vencido"""
         if self.fecha_completado:
             return False
-        return timezone.now().date() > self.fecha_vencimiento
+        return timezone.localdate() > self.fecha_vencimiento
 
 
 class Comentario(models.Model):
@@ -129,7 +281,109 @@ class Comentario(models.Model):
         verbose_name = "Comentario"
         verbose_name_plural = "Comentarios"
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['entregable', 'fecha_creacion', 'id'], name='comentario_entregable_idx'),
+            models.Index(fields=['fecha_creacion', 'id'], name='comentario_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Comentario de {self.autor} en {self.entregable.titulo}"
 
+
+
+# ===== ARCHIVO =====
+# Proyectos completados o cancelados movidos fuera de las tablas calientes
+# con sus entregables y comentarios (archivado.py). Tienen las mismas
+# columnas y conservan los ids, que SQLite no reutiliza (AUTOINCREMENT):
+# restaurar un proyecto no choca con los creados después.
+
+
+class ProyectoArchivado(models.Model):
+    """Proyecto archivado"""
+    id = models.BigIntegerField(primary_key=True)
+    nombre = models.CharField(max_length=200, verbose_name="Nombre del Proyecto")
+    descripcion = models.TextField(verbose_name="Descripción")
+    equipo = models.ForeignKey(Equipo, on_delete=models.CASCADE, related_name='proyectos_archivados', verbose_name="Equipo")
+    estado = models.CharField(max_length=20, choices=Proyecto.ESTADOS, verbose_name="Estado")
+    fecha_inicio = models.DateField(verbose_name="Fecha de Inicio")
+    fecha_fin_estimada = models.DateField(verbose_name="Fecha de Fin Estimada")
+    fecha_fin_real = models.DateField(null=True, blank=True, verbose_name="Fecha de Fin Real")
+    presupuesto = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Presupuesto")
+    fecha_modificacion = models.DateTimeField(verbose_name="Fecha de Modificación")
+
+    total_entregables = models.PositiveIntegerField(default=0, verbose_name="Entregables")
+    entregables_pendientes = models.PositiveIntegerField(default=0, verbose_name="Pendientes")
+    entregables_en_progreso = models.PositiveIntegerField(default=0, verbose_name="En Progreso")
+    entregables_en_revision = models.PositiveIntegerField(default=0, verbose_name="En Revisión")
+    entregables_aprobados = models.PositiveIntegerField(default=0, verbose_name="Aprobados")
+    entregables_rechazados = models.PositiveIntegerField(default=0, verbose_name="Rechazados")
+    entregables_vencidos = models.PositiveIntegerField(default=0, verbose_name="Vencidos")
+    suma_porcentaje = models.PositiveBigIntegerField(default=0, verbose_name="Suma de % Completado")
+
+    # Lo asigna la base de datos en el INSERT ... SELECT del archivado
+    fecha_archivado = models.DateTimeField(db_default=Now(), verbose_name="Fecha de Archivado")
+
+    class Meta:
+        verbose_name = "Proyecto Archivado"
+        verbose_name_plural = "Proyectos Archivados"
+        ordering = ['-fecha_inicio']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'id'], name='archivado_proyecto_fecha_idx'),
+        ]
+
+    __str__ = Proyecto.__str__
+    porcentaje_promedio = Proyecto.porcentaje_promedio
+
+
+class EntregableArchivado(models.Model):
+    """Entregable de un proyecto archivado"""
+    id = models.BigIntegerField(primary_key=True)
+    titulo = models.CharField(max_length=200, verbose_name="Título")
+    descripcion = models.TextField(verbose_name="Descripción")
+    proyecto = models.ForeignKey(ProyectoArchivado, on_delete=models.CASCADE, related_name='entregables', verbose_name="Proyecto")
+    responsable = models.ForeignKey(Miembro, on_delete=models.SET_NULL, null=True, related_name='entregables_archivados', verbose_name="Responsable")
+    estado = models.CharField(max_length=20, choices=Entregable.ESTADOS, verbose_name="Estado")
+    prioridad = models.CharField(max_length=10, choices=Entregable.PRIORIDADES, verbose_name="Prioridad")
+    fecha_creacion = models.DateTimeField(verbose_name="Fecha de Creación")
+    fecha_vencimiento = models.DateField(verbose_name="Fecha de Vencimiento")
+    fecha_completado = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Completado")
+    fecha_modificacion = models.DateTimeField(verbose_name="Fecha de Modificación")
+    archivo = models.FileField(upload_to='entregables/', storage=obtener_almacenamiento, null=True, blank=True, verbose_name="Archivo Adjunto")
+    archivo_nombre = models.CharField(max_length=255, blank=True, default='', verbose_name="Nombre del Archivo")
+    porcentaje_completado = models.IntegerField(default=0, verbose_name="% Completado")
+    vencimiento_avisado = models.DateField(null=True, blank=True, verbose_name="Vencimiento Avisado")
+    fecha_aviso_vencido = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Aviso de Vencimiento")
+
+    objects = EntregableQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Entregable Archivado"
+        verbose_name_plural = "Entregables Archivados"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['fecha_creacion', 'id'], name='archivado_entregable_fecha_idx'),
+            # Los blobs siguen referenciados desde el archivo (almacenamiento.liberar)
+            models.Index(fields=['archivo'], name='archivado_entregable_arch_idx'),
+        ]
+
+    __str__ = Entregable.__str__
+    esta_vencido = Entregable.esta_vencido
+
+
+class ComentarioArchivado(models.Model):
+    """Comentario de un entregable archivado"""
+    id = models.BigIntegerField(primary_key=True)
+    entregable = models.ForeignKey(EntregableArchivado, on_delete=models.CASCADE, related_name='comentarios', verbose_name="Entregable")
+    autor = models.CharField(max_length=200, verbose_name="Autor")
+    contenido = models.TextField(verbose_name="Contenido")
+    fecha_creacion = models.DateTimeField(verbose_name="Fecha de Creación")
+
+    class Meta:
+        verbose_name = "Comentario Archivado"
+        verbose_name_plural = "Comentarios Archivados"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['entregable', 'fecha_creacion', 'id'], name='archivado_comentario_idx'),
+        ]
+
+    __str__ = Comentario.__str__
@@ -0,0 +1,153 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+TAMANOS_PAGINA = [10, 25, 50, 100]
+TAMANO_PAGINA_DEFECTO = 25
+
+
+def tamano_pagina(request):
+    """Obtiene el tamaño de página solicitado, limitado a los valores permitidos"""
+    try:
+        tamano = int(request.GET.get('por_pagina', TAMANO_PAGINA_DEFECTO))
+    except (TypeError, ValueError):
+        return TAMANO_PAGINA_DEFECTO
+    return tamano if tamano in TAMANOS_PAGINA else TAMANO_PAGINA_DEFECTO
+
+
+class PaginaCursor:
+    """Una página de resultados con los cursores para avanzar o retroceder"""
+
+    def __init__(self, objetos, tamano, cursor_siguiente=None, cursor_anterior=None):
+        self.objetos = objetos
+        self.tamano = tamano
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    def __iter__(self):
+        return iter(self.objetos)
+
+    def __len__(self):
+        return len(self.objetos)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class PaginadorCursor:
+    """
+    Paginación por cursor (keyset) sobre un campo de orden descendente.
+
+    Usa el id como desempate, de modo que cada página se resuelve con un
+    rango sobre el índice (campo, id) y cuesta lo mismo sin importar la
+    profundidad, a diferencia de OFFSET. El campo también puede ser una
+    anotación (p. ej. la relevancia de una búsqueda).
+    """
+
+    def __init__(self, queryset, campo, tamano=TAMANO_PAGINA_DEFECTO):
+        self.queryset = queryset
+        self.campo = campo
+        self.tamano = tamano
+        anotacion = queryset.query.annotations.get(campo)
+        self._field = anotacion.output_field if anotacion is not None else queryset.model._meta.get_field(campo)
+
+    def codificar(self, objeto):
+        """Codifica la posición de un objeto (instancia o fila de .values()) como cursor opaco"""
+        if isinstance(objeto, dict):
+            valor, pk = objeto[self.campo], objeto[self.queryset.model._meta.pk.name]
+        else:
+            valor, pk = getattr(objeto, self.campo), objeto.pk
+        datos = json.dumps([valor.isoformat() if hasattr(valor, 'isoformat') else valor, pk])
+        return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+    def decodificar(self, cursor):
+        """Devuelve (valor, pk) o None si el cursor no es válido"""
+        if not cursor:
+            return None
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            valor, pk = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+            valor = self._field.to_python(valor)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, ValidationError):
+            return None
+        if valor is None:
+            return None
+        return valor, pk
+
+    def _consulta(self, despues, antes):
+        """Devuelve (queryset limitado, hacia_atras, hay_cursor_despues)"""
+        campo = self.campo
+        clave_antes = self.decodificar(antes)
+        clave_despues = None if clave_antes else self.decodificar(despues)
+
+        if clave_antes:
+            valor, pk = clave_antes
+            queryset = self.queryset.filter(
+                Q(**{f'{campo}__gt': valor}) | Q(**{campo: valor, 'pk__gt': pk})
+            ).order_by(campo, 'pk')
+        else:
+            queryset = self.queryset.order_by(f'-{campo}', '-pk')
+            if clave_despues:
+                valor, pk = clave_despues
+                queryset = queryset.filter(
+                    Q(**{f'{campo}__lt': valor}) | Q(**{campo: valor, 'pk__lt': pk})
+                )
+        return queryset[:self.tamano + 1], clave_antes is not None, clave_despues is not None
+
+    def _construir(self, filas, hacia_atras, con_despues):
+        if hacia_atras:
+            hay_anterior = len(filas) > self.tamano
+            objetos = filas[:self.tamano][::-1]
+            hay_siguiente = True
+        else:
+            hay_siguiente = len(filas) > self.tamano
+            objetos = filas[:self.tamano]
+            hay_anterior = con_despues
+
+        if not objetos:
+            return PaginaCursor(objetos, self.tamano)
+        return PaginaCursor(
+            objetos,
+            self.tamano,
+            cursor_siguiente=self.codificar(objetos[-1]) if hay_siguiente else None,
+            cursor_anterior=self.codificar(objetos[0]) if hay_anterior else None,
+        )
+
+    def pagina(self, despues=None, antes=None):
+        """Obtiene la página que sigue a `despues` o que precede a `antes`"""
+        queryset, hacia_atras, con_despues = self._consulta(despues, antes)
+        return self._construir(list(queryset), hacia_atras, con_despues)
+
+    async def apagina(self, despues=None, antes=None):
+        """Versión asíncrona de pagina()"""
+        queryset, hacia_atras, con_despues = self._consulta(despues, antes)
+        return self._construir([objeto async for objeto in queryset], hacia_atras, con_despues)
+
+
+def paginar(request, queryset, campo):
+    """Pagina un queryset según los parámetros `despues`, `antes` y `por_pagina`"""
+    paginador = PaginadorCursor(queryset, campo, tamano_pagina(request))
+    return paginador.pagina(
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+    )
+
+
+async def apaginar(request, queryset, campo):
+    """Versión asíncrona de paginar()"""
+    paginador = PaginadorCursor(queryset, campo, tamano_pagina(request))
+    return await paginador.apagina(
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+    )
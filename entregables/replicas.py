@@ -0,0 +1,150 @@
+"""
+Lecturas en réplicas de la base de datos.
+
+`RouterReplicas` envía las lecturas de las peticiones GET y HEAD a uno de
+los alias de REPLICAS ({alias: peso}), elegido por turnos ('rotacion',
+cada alias tantas veces como su peso) o al azar según el peso
+('ponderada'). La réplica se elige una vez por petición, para que todas sus
+consultas vean el mismo estado. Todo lo demás lee de `default`:
+
+- las peticiones que no son GET/HEAD y las vistas con @primaria;
+- el resto de la petición a partir de su primera escritura;
+- las peticiones de un cliente que escribió hace menos de
+  REPLICAS_VENTANA_PRIMARIA segundos (cookie `leer_primaria`), que así ve
+  sus propios cambios aunque la réplica vaya con retraso;
+- el código que corre fuera de una petición (comandos, tareas).
+
+El estado de la petición vive en una ContextVar, que ReplicasMiddleware
+crea y que se copia a los hilos de sync_to_async.
+"""
+import itertools
+import random
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+COOKIE = 'leer_primaria'
+_estado = ContextVar('entregables_replicas', default=None)
+
+
+class Estado:
+    def __init__(self, primaria=False):
+        self.primaria = primaria
+        self.escribio = False
+        self.replica = None
+
+
+@lru_cache(maxsize=8)
+def _rotacion(replicas):
+    """Turnos por peso ponderado suave (como nginx): con 3 y 1, a a b a, sin rachas largas"""
+    total = sum(peso for _, peso in replicas)
+    acumulado = dict.fromkeys((alias for alias, _ in replicas), 0)
+    turnos = []
+    for _ in range(total):
+        for alias, peso in replicas:
+            acumulado[alias] += peso
+        elegido = max(acumulado, key=acumulado.get)
+        acumulado[elegido] -= total
+        turnos.append(elegido)
+    return itertools.cycle(turnos)
+
+
+def elegir_replica():
+    """Alias de réplica según REPLICAS y REPLICAS_ESTRATEGIA, o None si no hay"""
+    replicas = tuple((alias, int(peso)) for alias, peso in getattr(settings, 'REPLICAS', {}).items() if peso > 0)
+    if not replicas:
+        return None
+    if getattr(settings, 'REPLICAS_ESTRATEGIA', 'rotacion') == 'ponderada':
+        return random.choices([alias for alias, _ in replicas], weights=[peso for _, peso in replicas])[0]
+    return next(_rotacion(replicas))
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or estado.primaria:
+            return DEFAULT_DB_ALIAS
+        if estado.replica is None:
+            estado.replica = elegir_replica() or DEFAULT_DB_ALIAS
+        return estado.replica
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = estado.primaria = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas son copias de default: un objeto leído en una vale en otra
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Las réplicas reciben el esquema por la replicación, no por migrate
+        if db in getattr(settings, 'REPLICAS', {}):
+            return False
+        return None
+
+
+def primaria(vista):
+    """Hace que la vista lea siempre de `default` (p. ej. formularios de edición)"""
+    def marcar():
+        estado = _estado.get()
+        if estado is not None:
+            estado.primaria = True
+
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def interna(request, *args, **kwargs):
+            marcar()
+            return await vista(request, *args, **kwargs)
+    else:
+        @wraps(vista)
+        def interna(request, *args, **kwargs):
+            marcar()
+            return vista(request, *args, **kwargs)
+    return interna
+
+
+class ReplicasMiddleware:
+    """Crea el estado de la petición y recuerda al cliente que acaba de escribir"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado = self.estado(request)
+        token = _estado.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _estado.reset(token)
+        return self.terminar(response, estado)
+
+    async def __acall__(self, request):
+        estado = self.estado(request)
+        token = _estado.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _estado.reset(token)
+        return self.terminar(response, estado)
+
+    def estado(self, request):
+        return Estado(primaria=request.method not in ('GET', 'HEAD') or COOKIE in request.COOKIES)
+
+    def terminar(self, response, estado):
+        ventana = getattr(settings, 'REPLICAS_VENTANA_PRIMARIA', 5)
+        if estado.escribio and ventana > 0:
+            # La cookie caduca sola al acabar la ventana
+            response.set_cookie(COOKIE, '1', max_age=ventana, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import almacenamiento, contadores, dashboard
+from .models import Equipo, Miembro, Proyecto, Entregable
+
+
+@receiver([post_save, post_delete], sender=Equipo)
+@receiver([post_save, post_delete], sender=Miembro)
+@receiver([post_save, post_delete], sender=Proyecto)
+@receiver([post_save, post_delete], sender=Entregable)
+def invalidar_dashboard(sender, **kwargs):
+    """Invalida el panel al instante y de nuevo tras el commit, para no recachear datos sin confirmar"""
+    dashboard.invalidar()
+    transaction.on_commit(dashboard.invalidar)
+
+
+@receiver(pre_save, sender=Entregable)
+def recordar_subida(sender, instance, **kwargs):
+    """Conserva el archivo subido: al guardarse, el campo pasa a ser solo el nombre del blob"""
+    archivo = instance.archivo
+    instance._subida = archivo.file if archivo and not archivo._committed else None
+
+
+@receiver(post_save, sender=Entregable)
+def actualizar_entregable(sender, instance, created, **kwargs):
+    """Ajusta los contadores del proyecto y, tras el commit, libera el archivo reemplazado y asegura el nuevo"""
+    anteriores = None if created else getattr(instance, '_guardado', None)
+    actuales = instance.valores_seguidos()
+    contadores.al_guardar(anteriores, actuales)
+
+    archivo_anterior = (anteriores or {}).get('archivo')
+    if archivo_anterior and archivo_anterior != actuales['archivo']:
+        transaction.on_commit(lambda: almacenamiento.liberar(archivo_anterior))
+    subida = getattr(instance, '_subida', None)
+    if subida is not None:
+        instance._subida = None
+        transaction.on_commit(lambda: almacenamiento.asegurar(actuales['archivo'], subida))
+    instance._guardado = actuales
+
+
+@receiver(post_delete, sender=Entregable)
+def eliminar_entregable(sender, instance, origin=None, **kwargs):
+    guardado = getattr(instance, '_guardado', {})
+    valores = {
+        campo: guardado[campo] if campo in guardado else getattr(instance, campo)
+        for campo in Entregable.CAMPOS_SEGUIDOS
+    }
+    valores['archivo'] = getattr(valores['archivo'], 'name', valores['archivo'])
+    contadores.al_eliminar(valores, origin)
+    if valores['archivo']:
+        transaction.on_commit(lambda: almacenamiento.liberar(valores['archivo']))
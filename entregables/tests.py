@@ -1,3 +1,1509 @@
-from django.test import TestCase
+import json
+import re
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.auth.models import User
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models.functions import Collate
+from django.db.migrations.executor import MigrationExecutor
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import admin as admin_entregables
+from . import acciones, almacenamiento, archivado, autocompletar, borrado, busqueda, estaticos, estres, metricas, replicas, vencidos, views
+from .models import (
+    Equipo, Miembro, Proyecto, Entregable, Comentario, ProyectoArchivado, EntregableArchivado, ComentarioArchivado,
+)
+from .paginacion import PaginadorCursor
+from .templatetags.admin_rapido import jerarquia_fechas
+
+
+def crear_equipo(nombre='Equipo', **kwargs):
+    return Equipo.objects.create(nombre=nombre, **kwargs)
+
+
+def crear_proyecto(equipo, nombre='Proyecto', **kwargs):
+    kwargs.setdefault('descripcion', 'Descripción del proyecto')
+    kwargs.setdefault('fecha_inicio', date(2025, 1, 1))
+    kwargs.setdefault('fecha_fin_estimada', date(2025, 12, 31))
+    return Proyecto.objects.create(equipo=equipo, nombre=nombre, **kwargs)
+
+
+def crear_entregable(proyecto, titulo='Entregable', **kwargs):
+    kwargs.setdefault('descripcion', 'Descripción del entregable')
+    kwargs.setdefault('fecha_vencimiento', date.today() + timedelta(days=30))
+    return Entregable.objects.create(proyecto=proyecto, titulo=titulo, **kwargs)
+
+
+class PaginacionCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo()
+        cls.proyecto = crear_proyecto(cls.equipo)
+        # Fechas repetidas para ejercitar el desempate por id
+        base = timezone.now()
+        for i in range(30):
+            crear_entregable(
+                cls.proyecto,
+                titulo=f'Entregable {i}',
+                prioridad='alta' if i % 2 else 'baja',
+                fecha_creacion=base - timedelta(minutes=i // 3),
+            )
+
+    def test_recorre_todas_las_paginas_sin_repetir(self):
+        vistos = []
+        cursor = None
+        while True:
+            pagina = PaginadorCursor(Entregable.objects.all(), 'fecha_creacion', 7).pagina(despues=cursor)
+            vistos.extend(e.pk for e in pagina)
+            if not pagina.has_next():
+                break
+            cursor = pagina.cursor_siguiente
+        esperado = list(Entregable.objects.order_by('-fecha_creacion', '-pk').values_list('pk', flat=True))
+        self.assertEqual(vistos, esperado)
+
+    def test_pagina_anterior(self):
+        paginador = PaginadorCursor(Entregable.objects.all(), 'fecha_creacion', 10)
+        primera = paginador.pagina()
+        segunda = paginador.pagina(despues=primera.cursor_siguiente)
+        vuelta = paginador.pagina(antes=segunda.cursor_anterior)
+        self.assertEqual([e.pk for e in vuelta], [e.pk for e in primera])
+        self.assertFalse(vuelta.has_previous())
+
+    def test_cursor_invalido_devuelve_primera_pagina(self):
+        pagina = PaginadorCursor(Entregable.objects.all(), 'fecha_creacion', 10).pagina(despues='no-es-un-cursor')
+        self.assertEqual(len(pagina), 10)
+        self.assertFalse(pagina.has_previous())
+
+    def test_lista_mantiene_filtros_y_tamano(self):
+        url = reverse('entregable_list')
+        respuesta = self.client.get(url, {'prioridad': 'alta', 'por_pagina': 10})
+        pagina = respuesta.context['pagina']
+        self.assertEqual(len(pagina), 10)
+        self.assertTrue(all(e.prioridad == 'alta' for e in pagina))
+        respuesta = self.client.get(url, {'prioridad': 'alta', 'por_pagina': 10, 'despues': pagina.cursor_siguiente})
+        self.assertEqual(len(respuesta.context['pagina']), 5)
+        self.assertFalse(respuesta.context['pagina'].has_next())
+
+    def test_consultas_constantes_en_paginas_profundas(self):
+        url = reverse('entregable_list')
+        primera = self.client.get(url, {'por_pagina': 10}).context['pagina']
+        # Versiones de las tablas (GET condicional) y la página
+        with self.assertNumQueries(2):
+            self.client.get(url, {'por_pagina': 10, 'despues': primera.cursor_siguiente})
+
+    def test_listas_de_proyectos_y_equipos(self):
+        self.assertEqual(self.client.get(reverse('proyecto_list')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('equipo_list')).status_code, 200)
+
+
+class ConteosAnotadosTests(TestCase):
+    def poblar(self, n):
+        for i in range(n):
+            equipo = crear_equipo(f'Equipo {i}')
+            Miembro.objects.create(nombre=f'Miembro {i}', email=f'm{i}-{equipo.pk}@ejemplo.com', rol='tester', equipo=equipo)
+            proyecto = crear_proyecto(equipo, f'Proyecto {i}')
+            crear_entregable(proyecto)
+            crear_entregable(proyecto)
+
+    def test_with_counts(self):
+        self.poblar(1)
+        equipo = Equipo.objects.with_counts().get()
+        self.assertEqual((equipo.num_miembros, equipo.num_proyectos), (1, 1))
+        vacio = crear_equipo('Vacío')
+        self.assertEqual(Equipo.objects.with_counts().get(pk=vacio.pk).num_miembros, 0)
+
+    def test_consultas_constantes_al_crecer_las_filas(self):
+        for nombre in ['equipo_list', 'proyecto_list']:
+            with self.subTest(vista=nombre):
+                Equipo.objects.all().delete()
+                self.poblar(2)
+                with self.assertNumQueries(2):
+                    self.client.get(reverse(nombre))
+                self.poblar(8)
+                with self.assertNumQueries(2):
+                    self.client.get(reverse(nombre))
+
+
+class BusquedaTextoCompletoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo('Diseño', descripcion='Equipo de interfaces')
+        cls.proyecto = crear_proyecto(cls.equipo, 'Portal de clientes')
+        cls.revision = crear_entregable(cls.proyecto, 'Revisión de arquitectura', descripcion='Documento técnico')
+        cls.otro = crear_entregable(cls.proyecto, 'Manual de usuario', descripcion='Guía de uso')
+
+    def buscar(self, modelo, texto):
+        return list(busqueda.filtrar_busqueda(modelo.objects.all(), texto))
+
+    def test_ignora_acentos_y_mayusculas(self):
+        self.assertEqual(self.buscar(Entregable, 'revision'), [self.revision])
+        self.assertEqual(self.buscar(Equipo, 'DISENO'), [self.equipo])
+
+    def test_prefijos(self):
+        self.assertEqual(self.buscar(Entregable, 'arqui'), [self.revision])
+        self.assertEqual(self.buscar(Entregable, 'man usu'), [self.otro])
+
+    def test_sincroniza_al_actualizar_y_eliminar(self):
+        self.otro.titulo = 'Checklist de despliegue'
+        self.otro.save()
+        self.assertEqual(self.buscar(Entregable, 'manual'), [])
+        self.assertEqual(self.buscar(Entregable, 'despliegue'), [self.otro])
+        Entregable.objects.filter(pk=self.otro.pk).delete()
+        self.assertEqual(self.buscar(Entregable, 'despliegue'), [])
+
+    def test_comentarios_y_ranking(self):
+        Comentario.objects.create(entregable=self.revision, autor='Ana', contenido='Falta la sección de revisión')
+        self.assertEqual(len(self.buscar(Comentario, 'seccion')), 1)
+        crear_entregable(self.proyecto, 'Revisión revisión revisión', descripcion='revisión')
+        resultados = list(busqueda.ordenar_por_relevancia(Entregable.objects.all(), 'revision'))
+        self.assertEqual(resultados[0].titulo, 'Revisión revisión revisión')
+        self.assertEqual(len(resultados), 2)
+
+    def test_vistas_usan_el_indice(self):
+        respuesta = self.client.get(reverse('entregable_list'), {'q': 'revision'})
+        self.assertEqual(list(respuesta.context['entregables']), [self.revision])
+        respuesta = self.client.get(reverse('proyecto_list'), {'q': 'portal'})
+        self.assertEqual(len(respuesta.context['proyectos']), 1)
+
+    def test_vistas_ordenan_por_relevancia_y_paginan(self):
+        # El más relevante es el más antiguo: sin ranking saldría el último
+        intenso = crear_entregable(self.proyecto, 'Revisión revisión revisión', descripcion='revisión')
+        Entregable.objects.filter(pk=intenso.pk).update(fecha_creacion=timezone.now() - timedelta(days=30))
+        for i in range(10):
+            crear_entregable(self.proyecto, f'Tarea {i}', descripcion=f'Incluye una revisión y otros {i} puntos más')
+        url = reverse('entregable_list')
+        respuesta = self.client.get(url, {'q': 'revision', 'por_pagina': 10})
+        primera = list(respuesta.context['entregables'])
+        self.assertEqual(primera[0], intenso)
+        relevancias = [entregable.relevancia for entregable in primera]
+        self.assertEqual(relevancias, sorted(relevancias, reverse=True))
+
+        siguiente = self.client.get(url, {'q': 'revision', 'por_pagina': 10,
+                                          'despues': respuesta.context['pagina'].cursor_siguiente})
+        segunda = list(siguiente.context['entregables'])
+        self.assertEqual(len(primera) + len(segunda), 12)
+        self.assertFalse(set(primera) & set(segunda))
+        self.assertLessEqual(segunda[0].relevancia, relevancias[-1])
+
+    def test_reconstruir_indice(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO entregables_entregable_fts(entregables_entregable_fts) VALUES ('delete-all')")
+        self.assertEqual(self.buscar(Entregable, 'revision'), [])
+        call_command('reconstruir_busqueda', stdout=StringIO())
+        self.assertEqual(self.buscar(Entregable, 'revision'), [self.revision])
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.equipo = crear_equipo()
+        self.proyecto = crear_proyecto(self.equipo, estado='en_progreso')
+        crear_entregable(self.proyecto)
+
+    def test_contadores_en_una_consulta_y_cache(self):
+        with self.assertNumQueries(3):
+            respuesta = self.client.get(reverse('index'))
+        self.assertEqual(respuesta.context['entregables_count'], 1)
+        self.assertEqual(respuesta.context['equipos_count'], 1)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('index'))
+
+    def test_senales_invalidan_la_cache(self):
+        self.client.get(reverse('index'))
+        crear_entregable(self.proyecto)
+        self.assertEqual(self.client.get(reverse('index')).context['entregables_count'], 2)
+        Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='lider', equipo=self.equipo)
+        self.assertEqual(self.client.get(reverse('index')).context['miembros_count'], 1)
+        self.equipo.activo = False
+        self.equipo.save()
+        self.assertEqual(self.client.get(reverse('index')).context['equipos_count'], 0)
+
+    @override_settings(TIME_ZONE='America/Mexico_City')
+    def test_vencidos_al_cambiar_de_dia(self):
+        # Vence a medianoche sin que nada lo guarde ni invalide la caché
+        crear_entregable(self.proyecto, fecha_vencimiento=date(2026, 3, 10))
+        antes = timezone.make_aware(datetime(2026, 3, 10, 23, 58))
+        with mock.patch('django.utils.timezone.now', return_value=antes.astimezone(dt_timezone.utc)):
+            self.assertEqual(self.client.get(reverse('index')).context['vencidos_count'], 0)
+        despues = antes + timedelta(minutes=4)
+        with mock.patch('django.utils.timezone.now', return_value=despues.astimezone(dt_timezone.utc)):
+            self.assertEqual(self.client.get(reverse('index')).context['vencidos_count'], 1)
+
+
+class PlanesDeConsultaTests(TestCase):
+    """Falla si alguna vista recorre una tabla completa u ordena en un B-tree temporal"""
+    ESCANEO_COMPLETO = re.compile(r'^SCAN \w+$')
+
+    @classmethod
+    def setUpTestData(cls):
+        equipo = crear_equipo()
+        Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='lider', equipo=equipo)
+        proyecto = crear_proyecto(equipo, estado='en_progreso')
+        for i in range(20):
+            entregable = crear_entregable(proyecto, f'Entregable {i}')
+            Comentario.objects.create(entregable=entregable, autor='Ana', contenido='Revisado')
+        cls.entregable = entregable
+
+    def planes(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        for consulta in contexto.captured_queries:
+            sql = consulta['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                yield sql, [fila[-1] for fila in cursor.fetchall()]
+
+    def assertSinEscaneos(self, url, params=None):
+        for sql, plan in self.planes(url, params):
+            for paso in plan:
+                self.assertNotRegex(paso, self.ESCANEO_COMPLETO, f'{url}: {sql}')
+                # El conjunto de coincidencias de FTS5 no tiene orden por fecha
+                if 'MATCH' not in sql:
+                    self.assertNotIn('TEMP B-TREE', paso, f'{url}: {sql}')
+
+    def test_listas(self):
+        casos = [
+            ('entregable_list', None),
+            ('entregable_list', {'estado': 'pendiente'}),
+            ('entregable_list', {'prioridad': 'alta'}),
+            ('entregable_list', {'estado': 'pendiente', 'prioridad': 'media'}),
+            ('entregable_list', {'q': 'entregable'}),
+            ('proyecto_list', None),
+            ('proyecto_list', {'estado': 'en_progreso'}),
+            ('equipo_list', None),
+            ('index', None),
+        ]
+        for nombre, params in casos:
+            with self.subTest(vista=nombre, params=params):
+                self.assertSinEscaneos(reverse(nombre), params)
+
+    def test_paginas_siguientes(self):
+        url = reverse('entregable_list')
+        pagina = self.client.get(url, {'por_pagina': 10}).context['pagina']
+        self.assertSinEscaneos(url, {'por_pagina': 10, 'despues': pagina.cursor_siguiente})
+
+    def test_detalle(self):
+        self.assertSinEscaneos(reverse('entregable_detail', args=[self.entregable.pk]))
+
+
+@override_settings(API_TOKEN='token-de-prueba')
+class APITests(TestCase):
+    TOKEN = {'Authorization': 'Bearer token-de-prueba'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo()
+        cls.proyecto = crear_proyecto(cls.equipo)
+        for i in range(12):
+            crear_entregable(cls.proyecto, f'Entregable {i}', estado='aprobado' if i < 4 else 'pendiente')
+
+    def test_lista_paginada_con_campos_y_filtros(self):
+        url = reverse('api_lista', args=['entregables'])
+        datos = self.client.get(url, {'fields': 'id,titulo', 'estado': 'pendiente', 'por_pagina': 10}).json()
+        self.assertEqual(len(datos['results']), 8)
+        self.assertEqual(set(datos['results'][0]), {'id', 'titulo'})
+        datos = self.client.get(url, {'fields': 'titulo', 'por_pagina': 10}).json()
+        self.assertEqual(len(datos['results']), 10)
+        siguiente = self.client.get(url, {'fields': 'titulo', 'por_pagina': 10, 'despues': datos['next']}).json()
+        self.assertEqual(len(siguiente['results']), 2)
+        self.assertIsNone(siguiente['next'])
+
+    def test_campo_desconocido(self):
+        respuesta = self.client.get(reverse('api_lista', args=['entregables']), {'fields': 'titulo,clave'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_lista', args=['otros'])).status_code, 404)
+
+    def test_ndjson_en_streaming(self):
+        respuesta = self.client.get(reverse('api_lista', args=['entregables']), {'format': 'ndjson', 'fields': 'id,estado'})
+        self.assertTrue(respuesta.streaming)
+        filas = [json.loads(linea) for linea in b''.join(respuesta.streaming_content).decode().splitlines()]
+        self.assertEqual(len(filas), 12)
+        self.assertEqual(set(filas[0]), {'id', 'estado'})
+
+    def test_crear_actualizar_y_eliminar(self):
+        url = reverse('api_lista', args=['entregables'])
+        datos = {'titulo': 'Nuevo', 'descripcion': 'Desde la API', 'proyecto': self.proyecto.pk, 'fecha_vencimiento': '2030-01-01'}
+        respuesta = self.client.post(url, json.dumps(datos), content_type='application/json', headers=self.TOKEN)
+        self.assertEqual(respuesta.status_code, 201)
+        pk = respuesta.json()['id']
+        detalle = reverse('api_detalle', args=['entregables', pk])
+        respuesta = self.client.patch(detalle, json.dumps({'estado': 'en_revision'}), content_type='application/json',
+                                     headers=self.TOKEN)
+        self.assertEqual(respuesta.json()['estado'], 'en_revision')
+        respuesta = self.client.patch(detalle, json.dumps({'estado': 'inexistente'}), content_type='application/json',
+                                     headers=self.TOKEN)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('estado', respuesta.json()['errors'])
+        self.assertEqual(self.client.delete(detalle, headers=self.TOKEN).status_code, 204)
+        self.assertEqual(self.client.get(detalle).status_code, 404)
+
+    def test_crear_valida_campos_obligatorios(self):
+        url = reverse('api_lista', args=['proyectos'])
+        respuesta = self.client.post(url, json.dumps({'nombre': 'Sin equipo'}), content_type='application/json',
+                                    headers=self.TOKEN)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('equipo', respuesta.json()['errors'])
+
+    def test_escrituras_requieren_autenticacion(self):
+        cliente = Client(enforce_csrf_checks=True)
+        url = reverse('api_lista', args=['equipos'])
+
+        def crear(**kwargs):
+            datos = json.dumps({'nombre': 'API', 'descripcion': ''})
+            return cliente.post(url, datos, content_type='application/json', **kwargs)
+
+        respuesta = crear()
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertEqual(respuesta.json(), {'errors': {'__all__': ['Se requiere autenticación.']}})
+        self.assertEqual(crear(headers={'Authorization': 'Bearer otro'}).status_code, 403)
+        self.assertEqual(crear(headers=self.TOKEN).status_code, 201)
+        self.assertEqual(cliente.get(url).status_code, 200)
+
+        # Sesión iniciada: hace falta además el token CSRF
+        cliente.force_login(User.objects.create_user('api', password='clave-de-prueba'))
+        respuesta = crear()
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertIn('CSRF', respuesta.json()['errors']['__all__'][0])
+        cliente.get(reverse('equipo_create'))
+        self.assertEqual(crear(headers={'X-CSRFToken': cliente.cookies['csrftoken'].value}).status_code, 201)
+
+
+class ImportacionTests(TestCase):
+    def setUp(self):
+        self.directorio = Path(tempfile.mkdtemp())
+        self.equipo = crear_equipo('Plataforma')
+        self.proyecto = crear_proyecto(self.equipo, 'Migración')
+        self.otro = crear_proyecto(self.equipo, 'Sin importar')
+        Proyecto.objects.filter(pk=self.otro.pk).update(total_entregables=7)
+        Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='lider', equipo=self.equipo)
+
+    def escribir(self, nombre, contenido):
+        ruta = self.directorio / nombre
+        ruta.write_text(contenido, encoding='utf-8')
+        return ruta
+
+    def test_importa_csv_en_lotes_y_rechaza_filas_invalidas(self):
+        ruta = self.escribir('entregables.csv', (
+            'titulo,descripcion,proyecto,responsable,estado,prioridad,fecha_vencimiento,porcentaje_completado\n'
+            'Uno,Desc,migración,ana@ejemplo.com,pendiente,alta,2030-01-01,10\n'
+            f'Dos,Desc,{self.proyecto.pk},,aprobado,baja,2030-01-02,100\n'
+            'Tres,Desc,Migración,,pendiente,media,2030-01-03,\n'
+            'Cuatro,Desc,Inexistente,,pendiente,media,2030-01-03,0\n'
+            'Cinco,Desc,Migración,,desconocido,media,2030-01-03,0\n'
+        ))
+        salida = StringIO()
+        # índices + (savepoint, INSERT, release) por lote + recálculo de contadores (2 lecturas y un bulk_update)
+        with self.assertNumQueries(2 + 3 * 2 + 2 + 3):
+            call_command('importar_entregables', str(ruta), '--lote', '2', stdout=salida)
+        self.assertIn('3 entregables importados, 2 rechazados', salida.getvalue())
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.total_entregables, 3)
+        # Solo se recalculan los proyectos con filas importadas
+        self.assertEqual(Proyecto.objects.get(pk=self.otro.pk).total_entregables, 7)
+        self.assertEqual(Entregable.objects.filter(proyecto=self.proyecto).count(), 3)
+        self.assertEqual(Entregable.objects.get(titulo='Uno').responsable.email, 'ana@ejemplo.com')
+        rechazados = (self.directorio / 'entregables.rechazados.csv').read_text(encoding='utf-8')
+        self.assertIn('Proyecto no encontrado: Inexistente', rechazados)
+        self.assertIn('estado:', rechazados)
+
+    def test_importa_ndjson_de_proyectos_y_miembros(self):
+        ruta = self.escribir('proyectos.ndjson', json.dumps({
+            'nombre': 'Nuevo', 'descripcion': 'D', 'equipo': 'plataforma',
+            'fecha_inicio': '2025-01-01', 'fecha_fin_estimada': '2025-06-01',
+        }) + '\n')
+        call_command('importar_proyectos', str(ruta), stdout=StringIO())
+        self.assertTrue(Proyecto.objects.filter(nombre='Nuevo', equipo=self.equipo).exists())
+
+        ruta = self.escribir('miembros.csv', (
+            'nombre,email,rol,equipo\n'
+            'Luis,luis@ejemplo.com,tester,Plataforma\n'
+            'Ana bis,ANA@ejemplo.com,tester,Plataforma\n'
+            'Luis bis,luis@ejemplo.com,tester,Plataforma\n'
+        ))
+        salida = StringIO()
+        call_command('importar_miembros', str(ruta), stdout=salida)
+        self.assertIn('1 miembros importados, 2 rechazados', salida.getvalue())
+
+
+class BenchmarkTests(TestCase):
+    def test_generar_datos_y_benchmark(self):
+        call_command(
+            'generar_datos', '--equipos', '2', '--proyectos', '4', '--entregables', '30',
+            '--comentarios', '60', '--lote', '7', '--semilla', '1', stdout=StringIO(),
+        )
+        self.assertEqual(Entregable.objects.count(), 30)
+        self.assertEqual(Comentario.objects.count(), 60)
+        self.assertEqual(Miembro.objects.count(), 16)
+
+        ruta = Path(tempfile.mkdtemp()) / 'benchmark.json'
+        call_command('benchmark_vistas', '--salida', str(ruta), '--repeticiones', '1', stdout=StringIO())
+        informe = json.loads(ruta.read_text(encoding='utf-8'))
+        resultados = informe['resultados']
+        self.assertIn('entregable_list', resultados)
+        self.assertIn('entregable_detail', resultados)
+        self.assertIn('api_detalle:comentarios', resultados)
+        self.assertTrue(all(datos['status'] == 200 for datos in resultados.values()))
+        self.assertGreater(resultados['entregable_list']['consultas'], 0)
+
+        salida = StringIO()
+        call_command(
+            'benchmark_vistas', '--salida', str(ruta.with_name('nuevo.json')), '--repeticiones', '1',
+            '--comparar', str(ruta), '--filtro', 'entregable_list', stdout=salida,
+        )
+        self.assertIn('tiempo_mediana_ms', salida.getvalue())
+
+
+class MetricasTests(TestCase):
+    def setUp(self):
+        metricas.registro.reiniciar()
+        crear_proyecto(crear_equipo())
+
+    def test_histograma_consultas_y_server_timing(self):
+        respuesta = self.client.get(reverse('proyecto_list'))
+        self.assertRegex(respuesta['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ consultas", total;dur=[\d.]+$')
+
+        texto = self.client.get(reverse('metricas')).content.decode()
+        self.assertIn('# TYPE entregables_vista_duracion_segundos histogram', texto)
+        self.assertIn('entregables_vista_duracion_segundos_count{vista="proyecto_list"} 1', texto)
+        self.assertIn('entregables_vista_duracion_segundos_bucket{vista="proyecto_list",le="+Inf"} 1', texto)
+        consultas = re.search(r'entregables_vista_consultas_total\{vista="proyecto_list"\} (\d+)', texto)
+        self.assertGreater(int(consultas.group(1)), 0)
+        self.assertIn('entregables_sql_segundos_max{sql="SELECT', texto)
+
+    @override_settings(METRICAS_IPS=['10.0.0.5'], METRICAS_TOKEN='secreto')
+    def test_acceso_restringido(self):
+        url = reverse('metricas')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer otro'}).status_code, 404)
+        self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer secreto'}).status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+    def test_normaliza_sentencias(self):
+        self.assertEqual(
+            metricas.normalizar_sql("SELECT * FROM t WHERE id IN (%s, %s,  %s) AND nombre = 'x' LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND nombre = ? LIMIT ?',
+        )
+
+    @override_settings(METRICAS_UMBRAL_LENTO_MS=0.001)
+    def test_registra_peticiones_lentas(self):
+        with self.assertLogs('entregables.metricas', level='WARNING') as registros:
+            self.client.get(reverse('equipo_list'))
+        self.assertIn('equipo_list', registros.output[0])
+
+
+class AlmacenamientoPorContenidoTests(TestCase):
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=tempfile.mkdtemp()))
+        self.proyecto = crear_proyecto(crear_equipo())
+
+    def subir(self, contenido, nombre='informe.pdf', entregable=None):
+        datos = {
+            'titulo': 'Entregable', 'proyecto': self.proyecto.pk, 'estado': 'pendiente',
+            'prioridad': 'media', 'fecha_vencimiento': '2025-06-30', 'porcentaje_completado': 0,
+            'archivo': SimpleUploadedFile(nombre, contenido),
+        }
+        url = reverse('entregable_update', args=[entregable.pk]) if entregable else reverse('entregable_create')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, datos)
+        return Entregable.objects.get(pk=entregable.pk) if entregable else Entregable.objects.latest('pk')
+
+    def test_contenido_identico_se_guarda_una_vez(self):
+        primero = self.subir(b'contenido' * 1000)
+        segundo = self.subir(b'contenido' * 1000, nombre='copia.PDF')
+        self.assertEqual(primero.archivo.name, segundo.archivo.name)
+        self.assertRegex(primero.archivo.name, r'^entregables/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(segundo.archivo_nombre, 'copia.PDF')
+        self.assertEqual(primero.archivo.read(), b'contenido' * 1000)
+        self.assertTrue(primero.archivo.path.startswith(tempfile.gettempdir()))
+
+    def test_libera_el_blob_sin_referencias(self):
+        primero = self.subir(b'compartido')
+        segundo = self.subir(b'compartido')
+        nombre = primero.archivo.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.delete()
+        self.assertTrue(almacenamiento.almacenamiento.exists(nombre))
+
+        segundo = self.subir(b'nuevo', entregable=segundo)
+        self.assertNotEqual(segundo.archivo.name, nombre)
+        self.assertFalse(almacenamiento.almacenamiento.exists(nombre))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        self.assertFalse(almacenamiento.almacenamiento.exists(segundo.archivo.name))
+
+    def test_reescribe_el_blob_liberado_mientras_se_guardaba(self):
+        primero = self.subir(b'compartido')
+        nombre = primero.archivo.name
+        primero.delete()  # sin ejecutar su liberar() tras el commit: el blob queda sin referencias
+        guardar = almacenamiento.AlmacenamientoPorContenido.save
+
+        def guardar_y_liberar(storage, *args, **kwargs):
+            guardado = guardar(storage, *args, **kwargs)
+            # Otra petición libera el blob reutilizado antes de que exista la fila nueva
+            almacenamiento.liberar(guardado)
+            return guardado
+
+        # Sin pasar por la vista: la subida sigue abierta cuando se ejecutan los on_commit del test
+        segundo = crear_entregable(self.proyecto)
+        segundo.adjuntar(SimpleUploadedFile('copia.pdf', b'compartido'))
+        with mock.patch.object(almacenamiento.AlmacenamientoPorContenido, 'save', guardar_y_liberar), \
+                self.captureOnCommitCallbacks(execute=True):
+            segundo.save()
+        segundo = Entregable.objects.get(pk=segundo.pk)
+        self.assertEqual(segundo.archivo.name, nombre)
+        self.assertEqual(segundo.archivo.read(), b'compartido')
+
+
+class DescargaArchivoTests(TestCase):
+    CONTENIDO = bytes(range(256)) * 40
+
+    def setUp(self):
+        self.enterContext(override_settings(MEDIA_ROOT=tempfile.mkdtemp()))
+        self.entregable = crear_entregable(crear_proyecto(crear_equipo()))
+        self.entregable.adjuntar(ContentFile(self.CONTENIDO, name='Informe final.pdf'))
+        self.entregable.save()
+        self.url = reverse('entregable_archivo', args=[self.entregable.pk])
+
+    def test_descarga_completa(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(b''.join(respuesta.streaming_content), self.CONTENIDO)
+        self.assertEqual(respuesta['Content-Length'], str(len(self.CONTENIDO)))
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+        self.assertEqual(respuesta['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="Informe final.pdf"', respuesta['Content-Disposition'])
+        self.assertRegex(respuesta['ETag'], r'^"[0-9a-f]{64}"$')
+
+    def test_rangos(self):
+        respuesta = self.client.get(self.url, headers={'Range': 'bytes=100-199'})
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta['Content-Range'], f'bytes 100-199/{len(self.CONTENIDO)}')
+        self.assertEqual(b''.join(respuesta.streaming_content), self.CONTENIDO[100:200])
+
+        respuesta = self.client.get(self.url, headers={'Range': 'bytes=-10'})
+        self.assertEqual(b''.join(respuesta.streaming_content), self.CONTENIDO[-10:])
+        self.assertEqual(respuesta['Content-Length'], '10')
+
+        respuesta = self.client.get(self.url, headers={'Range': f'bytes={len(self.CONTENIDO)}-'})
+        self.assertEqual(respuesta.status_code, 416)
+        self.assertEqual(respuesta['Content-Range'], f'bytes */{len(self.CONTENIDO)}')
+
+    def test_get_condicional_e_if_range(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+        respuesta = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': '"otra-version"'})
+        self.assertEqual(respuesta.status_code, 200)
+        respuesta = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': etag})
+        self.assertEqual(respuesta.status_code, 206)
+
+    @override_settings(DESCARGAS_OFFLOAD='x-accel-redirect', DESCARGAS_OFFLOAD_PREFIJO='/interno/')
+    def test_delegar_en_el_proxy(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Accel-Redirect'], f'/interno/{self.entregable.archivo.name}')
+        self.assertEqual(respuesta.content, b'')
+
+    def test_sin_archivo(self):
+        otro = crear_entregable(self.entregable.proyecto)
+        self.assertEqual(self.client.get(reverse('entregable_archivo', args=[otro.pk])).status_code, 404)
+
+
+class ComentariosPaginadosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.entregable = crear_entregable(crear_proyecto(crear_equipo()), responsable=None)
+        inicio = timezone.now()
+        Comentario.objects.bulk_create(
+            Comentario(entregable=cls.entregable, autor=f'Autor {i}', contenido=f'Comentario {i}',
+                       fecha_creacion=inicio - timedelta(minutes=i))
+            for i in range(45)
+        )
+
+    def test_detalle_muestra_la_primera_pagina_con_consultas_fijas(self):
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = self.client.get(reverse('entregable_detail', args=[self.entregable.pk]))
+        # versiones de las tablas, entregable con sus relaciones, página de comentarios y total
+        self.assertEqual(len(contexto), 4)
+        self.assertEqual(len(respuesta.context['comentarios']), 20)
+        self.assertContains(respuesta, 'Comentarios (45)')
+        self.assertContains(respuesta, 'data-cargar-mas=')
+
+    def test_cargar_mas(self):
+        url = reverse('entregable_comentarios', args=[self.entregable.pk])
+        vistos = []
+        while url:
+            datos = self.client.get(url).json()
+            vistos += re.findall(r'Comentario (\d+)</p>', datos['html'])
+            url = datos['siguiente']
+        self.assertEqual(vistos, [str(i) for i in range(45)])
+
+
+class ContadoresProyectoTests(TestCase):
+    def setUp(self):
+        equipo = crear_equipo()
+        self.origen = crear_proyecto(equipo, 'Origen')
+        self.destino = crear_proyecto(equipo, 'Destino')
+
+    def contadores(self, proyecto):
+        proyecto.refresh_from_db()
+        return {campo: getattr(proyecto, campo) for campo in Proyecto.CAMPOS_CONTADORES if getattr(proyecto, campo)}
+
+    def test_incrementales_al_crear_actualizar_mover_y_eliminar(self):
+        vencido = crear_entregable(self.origen, fecha_vencimiento=date.today() - timedelta(days=1), porcentaje_completado=40)
+        crear_entregable(self.origen, estado='aprobado', porcentaje_completado=100)
+        self.assertEqual(self.contadores(self.origen), {
+            'total_entregables': 2, 'entregables_pendientes': 1, 'entregables_aprobados': 1,
+            'entregables_vencidos': 1, 'suma_porcentaje': 140,
+        })
+        self.assertEqual(self.origen.porcentaje_promedio, 70)
+
+        # Como en la vista de edición: valores del formulario como cadenas
+        vencido = Entregable.objects.get(pk=vencido.pk)
+        vencido.estado = 'en_revision'
+        vencido.porcentaje_completado = '80'
+        vencido.fecha_vencimiento = (date.today() + timedelta(days=5)).isoformat()
+        vencido.save()
+        self.assertEqual(self.contadores(self.origen), {
+            'total_entregables': 2, 'entregables_en_revision': 1, 'entregables_aprobados': 1, 'suma_porcentaje': 180,
+        })
+
+        vencido.proyecto = self.destino
+        vencido.save()
+        self.assertEqual(self.contadores(self.origen)['total_entregables'], 1)
+        self.assertEqual(self.contadores(self.destino), {
+            'total_entregables': 1, 'entregables_en_revision': 1, 'suma_porcentaje': 80,
+        })
+
+        vencido.delete()
+        self.assertEqual(self.contadores(self.destino), {})
+
+    def test_vencido_con_el_paso_de_los_dias(self):
+        # Vencen sin que nada los guarde: el contador de vencidos no los incluye
+        primero = crear_entregable(self.origen, 'Primero', fecha_vencimiento=date.today() + timedelta(days=1))
+        segundo = crear_entregable(self.origen, 'Segundo', fecha_vencimiento=date.today() + timedelta(days=1))
+        Entregable.objects.filter(pk__in=[primero.pk, segundo.pk]).update(
+            fecha_vencimiento=date.today() - timedelta(days=1),
+        )
+        self.assertNotIn('entregables_vencidos', self.contadores(self.origen))
+
+        primero = Entregable.objects.get(pk=primero.pk)
+        primero.fecha_completado = timezone.now()
+        primero.save()
+        self.assertEqual(self.contadores(self.origen)['entregables_vencidos'], 1)
+
+        Entregable.objects.get(pk=segundo.pk).delete()
+        self.assertEqual(self.contadores(self.origen), {'total_entregables': 1, 'entregables_pendientes': 1})
+
+        # Un contador desviado no baja de cero
+        Proyecto.objects.filter(pk=self.origen.pk).update(total_entregables=0, entregables_pendientes=0)
+        Entregable.objects.get(pk=primero.pk).delete()
+        self.assertEqual(self.contadores(self.origen), {})
+
+    def test_guardar_el_proyecto_no_pisa_los_contadores(self):
+        proyecto = Proyecto.objects.get(pk=self.origen.pk)
+        crear_entregable(self.origen)
+        proyecto.nombre = 'Renombrado'
+        proyecto.save()
+        self.assertEqual(self.contadores(self.origen), {'total_entregables': 1, 'entregables_pendientes': 1})
+
+    def test_recalcular_corrige_desviaciones(self):
+        crear_entregable(self.origen, porcentaje_completado=30)
+        Entregable.objects.bulk_create([Entregable(
+            proyecto=self.destino, titulo='Masivo', descripcion='Desc', fecha_vencimiento=date.today(),
+        )])
+        Proyecto.objects.filter(pk=self.origen.pk).update(total_entregables=9)
+
+        salida = StringIO()
+        call_command('recalcular_contadores', stdout=salida)
+        self.assertIn('2 proyectos corregidos', salida.getvalue())
+        self.assertEqual(self.contadores(self.origen), {
+            'total_entregables': 1, 'entregables_pendientes': 1, 'suma_porcentaje': 30,
+        })
+        self.assertEqual(self.contadores(self.destino), {'total_entregables': 1, 'entregables_pendientes': 1})
+
+    def test_lista_sin_joins_a_entregables(self):
+        crear_entregable(self.origen, porcentaje_completado=50)
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = self.client.get(reverse('proyecto_list'))
+        self.assertContains(respuesta, '50%')
+        self.assertFalse(any('entregables_entregable' in consulta['sql'] for consulta in contexto.captured_queries))
+
+
+class VencidosTests(TestCase):
+    def setUp(self):
+        self.proyecto = crear_proyecto(crear_equipo())
+        ayer = date.today() - timedelta(days=1)
+        self.vencido = crear_entregable(self.proyecto, 'Vencido', fecha_vencimiento=ayer)
+        crear_entregable(self.proyecto, 'Completado', fecha_vencimiento=ayer, fecha_completado=timezone.now())
+        crear_entregable(self.proyecto, 'A tiempo')
+
+    def test_queryset_y_anotacion(self):
+        self.assertEqual(list(Entregable.objects.vencidos().values_list('titulo', flat=True)), ['Vencido'])
+        anotados = dict(Entregable.objects.annotate_vencido().values_list('titulo', 'vencido'))
+        self.assertEqual(anotados, {'Vencido': True, 'Completado': False, 'A tiempo': False})
+        # El conteo es una búsqueda por rango en el índice parcial
+        sql, params = Entregable.objects.vencidos().order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            self.assertIn('entregable_vencidos_idx', ' '.join(fila[-1] for fila in cursor.fetchall()))
+
+    def test_filtro_en_lista_y_dashboard(self):
+        respuesta = self.client.get(reverse('entregable_list'), {'vencidos': '1'})
+        self.assertEqual([e.titulo for e in respuesta.context['entregables']], ['Vencido'])
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('index')).context['vencidos_count'], 1)
+
+    def test_barrido_en_lotes(self):
+        for i in range(4):
+            crear_entregable(self.proyecto, f'Vencido {i}', fecha_vencimiento=date.today() - timedelta(days=2))
+        salida = StringIO()
+        # 5 vencidos en lotes de 2: 3 UPDATE (el último incompleto) + recálculo de contadores
+        with CaptureQueriesContext(connection) as contexto:
+            call_command('barrer_vencidos', '--lote', '2', stdout=salida)
+        self.assertIn('5 entregables vencidos marcados', salida.getvalue())
+        self.assertEqual(sum(c['sql'].startswith('UPDATE "entregables_entregable"') for c in contexto.captured_queries), 3)
+        self.assertFalse(any(c['sql'].startswith('SELECT "entregables_entregable"."id", "entregables_entregable"."titulo"')
+                             for c in contexto.captured_queries))
+        # Ni se vuelve a leer el lote por fecha_aviso_vencido, que no tiene índice
+        self.assertFalse(any('"fecha_aviso_vencido" =' in c['sql'] for c in contexto.captured_queries
+                             if c['sql'].startswith('SELECT')))
+
+        call_command('barrer_vencidos', stdout=salida)
+        self.assertIn('0 entregables vencidos marcados', salida.getvalue())
+
+        # Si se mueve el vencimiento, vuelve a avisarse al vencer de nuevo
+        Entregable.objects.filter(pk=self.vencido.pk).update(fecha_vencimiento=date.today() - timedelta(days=3))
+        self.assertEqual(vencidos.barrer()[0], 1)
+
+
+@override_settings(ROOT_URLCONF='gestion_entregables.urls_asgi')
+class VistasAsincronasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        proyecto = crear_proyecto(crear_equipo(), estado='en_progreso')
+        cls.entregable = crear_entregable(proyecto, 'Asíncrono')
+        for i in range(3):
+            Comentario.objects.create(entregable=cls.entregable, autor='Ana', contenido=f'Comentario {i}')
+
+    async def test_vistas_asincronas(self):
+        for nombre, args in [('index', []), ('entregable_list', []), ('entregable_detail', [self.entregable.pk])]:
+            with self.subTest(vista=nombre):
+                url = reverse(nombre, args=args)
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+                await cache.aclear()
+                respuesta = await self.async_client.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertContains(respuesta, 'Asíncrono')
+                # Las consultas hechas en los hilos del ORM también se miden
+                self.assertNotIn('desc="0 consultas"', respuesta['Server-Timing'])
+
+        respuesta = await self.async_client.get(reverse('entregable_detail', args=[self.entregable.pk]))
+        self.assertEqual(respuesta.context['total_comentarios'], 3)
+
+    async def test_comentar(self):
+        url = reverse('entregable_detail', args=[self.entregable.pk])
+        respuesta = await self.async_client.post(url, {'autor': 'Luis', 'contenido': 'Nuevo'})
+        self.assertRedirects(respuesta, url, fetch_redirect_response=False)
+        self.assertEqual(await Comentario.objects.filter(autor='Luis').acount(), 1)
+
+    def test_benchmark_wsgi_asgi(self):
+        ruta = Path(tempfile.mkdtemp()) / 'asgi.json'
+        salida = StringIO()
+        call_command('benchmark_asgi', '--repeticiones', '3', '--salida', str(ruta), stdout=salida)
+        resultados = json.loads(ruta.read_text(encoding='utf-8'))['resultados']
+        self.assertEqual(set(resultados), {'index', 'entregable_list', 'entregable_detail'})
+        self.assertEqual(resultados['entregable_list']['asgi']['peticiones'], 3)
+        self.assertIn('ASGI p99', salida.getvalue())
+
+
+# unittest.TestCase: usa su propia base temporal, no la de pruebas
+class ConexionSQLiteTests(unittest.TestCase):
+    def test_pragmas_y_begin_immediate(self):
+        with estres.base_temporal(settings.DATABASES['default']['OPTIONS']) as alias:
+            conexion = connections[alias]
+            with conexion.cursor() as cursor:
+                for pragma, esperado in [('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 5000), ('temp_store', 2)]:
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], esperado, pragma)
+            with CaptureQueriesContext(conexion) as contexto, transaction.atomic(using=alias):
+                conexion.cursor().execute('UPDATE contador SET valor = 1')
+            self.assertEqual(contexto.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+    def test_lectores_y_escritores_en_paralelo(self):
+        datos = estres.ejecutar(settings.DATABASES['default']['OPTIONS'], lectores=2, escritores=2, segundos=0.5)
+        self.assertGreater(datos['lecturas'], 0)
+        self.assertGreater(datos['escrituras'], 0)
+        self.assertEqual(datos['bloqueos_lectura'] + datos['bloqueos_escritura'], 0)
+        self.assertTrue(datos['consistente'])
+
+
+class FragmentosCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.proyecto = crear_proyecto(crear_equipo(), 'Proyecto Fila')
+        cls.entregable = crear_entregable(cls.proyecto, 'Título original')
+
+    def setUp(self):
+        caches['fragmentos'].clear()
+
+    def test_fecha_modificacion(self):
+        antes = Proyecto.objects.get(pk=self.proyecto.pk).fecha_modificacion
+        crear_entregable(self.proyecto, 'Otro')
+        # El contador se actualiza con update(), que también asigna la fecha
+        self.assertGreater(Proyecto.objects.get(pk=self.proyecto.pk).fecha_modificacion, antes)
+
+        antes = self.entregable.fecha_modificacion
+        self.entregable.titulo = 'Cambiado'
+        self.entregable.save()
+        self.assertGreater(self.entregable.fecha_modificacion, antes)
+
+    def test_filas_en_cache_por_fecha_modificacion(self):
+        url = reverse('entregable_list')
+        self.assertContains(self.client.get(url), 'Título original')
+        # Sin cambiar fecha_modificacion la fila sale de la caché
+        Entregable.objects.filter(pk=self.entregable.pk).update(titulo='Sin fecha')
+        self.assertContains(self.client.get(url), 'Título original')
+
+        entregable = Entregable.objects.get(pk=self.entregable.pk)
+        entregable.titulo = 'Título nuevo'
+        entregable.save()
+        respuesta = self.client.get(url)
+        self.assertContains(respuesta, 'Título nuevo')
+        self.assertNotContains(respuesta, 'Título original')
+
+    def test_fila_de_proyecto_refleja_contadores(self):
+        url = reverse('proyecto_list')
+        self.assertEqual(self.client.get(url).context['proyectos'][0].total_entregables, 1)
+        crear_entregable(self.proyecto, 'Segundo', porcentaje_completado=100)
+        self.assertContains(self.client.get(url), '50%')
+
+    def test_benchmark_fragmentos(self):
+        salida = StringIO()
+        call_command('benchmark_fragmentos', '--repeticiones', '2', stdout=salida)
+        self.assertIn('entregable_list', salida.getvalue())
+        self.assertIn('proyecto_list', salida.getvalue())
+
+
+class GetCondicionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.proyecto = crear_proyecto(crear_equipo(), 'Proyecto Condicional')
+        cls.entregable = crear_entregable(cls.proyecto, 'Condicional')
+
+    def test_304_hasta_que_cambia_una_tabla(self):
+        for nombre, args in [('entregable_list', []), ('proyecto_list', []), ('equipo_list', []),
+                             ('entregable_detail', [self.entregable.pk])]:
+            with self.subTest(vista=nombre):
+                url = reverse(nombre, args=args)
+                respuesta = self.client.get(url)
+                etag = respuesta['ETag']
+                self.assertTrue(etag.startswith('W/"'))
+                with self.assertNumQueries(1):
+                    respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(respuesta.status_code, 304)
+                respuesta = self.client.get(url, HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified'])
+                self.assertEqual(respuesta.status_code, 304)
+
+                # Un cambio hecho con update(), sin señales, también invalida el ETag
+                Proyecto.objects.filter(pk=self.proyecto.pk).update(nombre=f'Renombrado {nombre}')
+                respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(respuesta.status_code, 200)
+                self.assertNotEqual(respuesta['ETag'], etag)
+
+    @override_settings(TIME_ZONE='America/Mexico_City')
+    def test_vencidos_y_etag_cambian_a_medianoche_local(self):
+        vence = crear_entregable(self.proyecto, 'Vence hoy', fecha_vencimiento=date(2026, 3, 10))
+        url = reverse('entregable_list')
+
+        def a_las(dia, hora):
+            # timezone.now() devuelve la hora en UTC
+            return timezone.make_aware(datetime(2026, 3, dia, hora, 30)).astimezone(dt_timezone.utc)
+
+        with mock.patch('django.utils.timezone.now', return_value=a_las(10, 17)):
+            etag = self.client.get(url, {'vencidos': '1'})['ETag']
+        # 19:30 en Ciudad de México ya es el día 11 en UTC, pero localmente sigue siendo el 10
+        with mock.patch('django.utils.timezone.now', return_value=a_las(10, 19)):
+            self.assertFalse(Entregable.objects.get(pk=vence.pk).esta_vencido())
+            self.assertFalse(Entregable.objects.vencidos().exists())
+            self.assertEqual(self.client.get(url, {'vencidos': '1'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch('django.utils.timezone.now', return_value=a_las(11, 0)):
+            self.assertTrue(Entregable.objects.get(pk=vence.pk).esta_vencido())
+            respuesta = self.client.get(url, {'vencidos': '1'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertContains(respuesta, 'Vence hoy')
+
+    def test_etag_distinto_por_filtro(self):
+        url = reverse('entregable_list')
+        etag = self.client.get(url)['ETag']
+        respuesta = self.client.get(url, {'q': 'condicional'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_mensajes_pendientes_renderizan_la_pagina(self):
+        url = reverse('entregable_list')
+        etag = self.client.get(url)['ETag']
+        request = RequestFactory().get(url, HTTP_IF_NONE_MATCH=etag)
+        request._messages = CookieStorage(request)
+        messages.info(request, 'Aviso pendiente')
+        respuesta = views.entregable_list(request)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'Aviso pendiente')
+
+    def test_triggers_sobreviven_a_las_migraciones(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_version_%'")
+            triggers = {nombre for (nombre,) in cursor.fetchall()}
+        self.assertIn('entregables_entregable_version_au', triggers)
+        self.assertEqual(len(triggers), 24)
+
+    @override_settings(ROOT_URLCONF='gestion_entregables.urls_asgi')
+    async def test_vista_asincrona(self):
+        url = reverse('entregable_list')
+        respuesta = await self.async_client.get(url)
+        respuesta = await self.async_client.get(url, headers={'If-None-Match': respuesta['ETag']})
+        self.assertEqual(respuesta.status_code, 304)
+
+
+class AccionesMasivasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        equipo = crear_equipo()
+        cls.proyecto = crear_proyecto(equipo, 'Proyecto A')
+        cls.otro = crear_proyecto(equipo, 'Proyecto B')
+        cls.miembro = Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='tester', equipo=equipo)
+        cls.ids = [crear_entregable(cls.proyecto if i % 2 else cls.otro, f'E{i}').pk for i in range(30)]
+
+    def test_consultas_constantes_por_lote(self):
+        with CaptureQueriesContext(connection) as pocos:
+            acciones.ejecutar(self.ids[:4], 'estado', 'aprobado')
+        with CaptureQueriesContext(connection) as muchos:
+            acciones.ejecutar(self.ids, 'estado', 'en_revision')
+        self.assertEqual(len(pocos), len(muchos))
+        self.assertEqual(Entregable.objects.filter(estado='en_revision').count(), 30)
+        self.proyecto.refresh_from_db()
+        self.assertEqual((self.proyecto.entregables_en_revision, self.proyecto.entregables_pendientes), (15, 0))
+
+    def test_responsable_y_porcentaje(self):
+        self.assertEqual(acciones.ejecutar(self.ids[:10], 'responsable', 'ANA@ejemplo.com'), 10)
+        self.assertEqual(Entregable.objects.filter(responsable=self.miembro).count(), 10)
+        acciones.ejecutar(self.ids, 'porcentaje', '40')
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.porcentaje_promedio, 40)
+        with self.assertRaises(ValidationError):
+            acciones.ejecutar(self.ids, 'porcentaje', '140')
+        with self.assertRaises(ValidationError):
+            acciones.ejecutar(self.ids, 'responsable', 'nadie@ejemplo.com')
+
+    def test_eliminar(self):
+        Comentario.objects.create(entregable_id=self.ids[0], autor='Ana', contenido='Se borra')
+        self.assertEqual(acciones.ejecutar(self.ids[:10], 'eliminar'), 10)
+        self.assertFalse(Comentario.objects.exists())
+        self.proyecto.refresh_from_db()
+        self.otro.refresh_from_db()
+        self.assertEqual(self.proyecto.total_entregables + self.otro.total_entregables, 20)
+
+    def test_vista(self):
+        siguiente = reverse('entregable_list') + '?prioridad=media'
+        respuesta = self.client.post(reverse('entregable_acciones'), {
+            'accion': 'prioridad', 'valor': 'alta', 'seleccion': self.ids[:3], 'siguiente': siguiente,
+        }, follow=True)
+        self.assertRedirects(respuesta, siguiente)
+        self.assertContains(respuesta, '3 entregables actualizados exitosamente.')
+
+        respuesta = self.client.post(reverse('entregable_acciones'), {
+            'accion': 'estado', 'valor': 'inventado', 'seleccion': self.ids[:3], 'siguiente': 'https://externo.com/',
+        }, follow=True)
+        self.assertRedirects(respuesta, reverse('entregable_list'))
+        self.assertContains(respuesta, 'Estado no válido.')
+        self.assertEqual(self.client.get(reverse('entregable_acciones')).status_code, 405)
+
+
+class AutocompletarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo('Diseño')
+        for i in range(30):
+            crear_proyecto(cls.equipo, f'Portal {i:02d}')
+        crear_proyecto(cls.equipo, 'Migración')
+        Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='tester', equipo=cls.equipo)
+        Miembro.objects.create(nombre='Andrés', email='andres@ejemplo.com', rol='lider', equipo=cls.equipo, activo=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def resultados(self, fuente, **params):
+        respuesta = self.client.get(reverse('autocompletar', args=[fuente]), params)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.json()['resultados']
+
+    def test_prefijo_y_limite(self):
+        resultados = self.resultados('proyectos', q='portal', limite=5)
+        self.assertEqual([r['texto'] for r in resultados], [f'Portal {i:02d}' for i in range(5)])
+        self.assertEqual(len(self.resultados('proyectos', q='p', limite=500)), autocompletar.LIMITE_MAXIMO)
+        self.assertEqual(self.resultados('proyectos', q='mig')[0]['texto'], 'Migración')
+
+    def test_solo_miembros_activos(self):
+        self.assertEqual([r['texto'] for r in self.resultados('miembros', q='an')], ['Ana (Tester)'])
+        self.assertEqual(self.client.get(reverse('autocompletar', args=['usuarios'])).status_code, 404)
+
+    def test_respuesta_en_cache(self):
+        self.resultados('equipos', q='dis')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resultados('equipos', q='dis')[0]['id'], self.equipo.pk)
+
+    def test_plan_por_indice(self):
+        for fuente in autocompletar.FUENTES.values():
+            queryset = fuente.modelo.objects.all()
+            if fuente.solo_activos:
+                queryset = queryset.filter(activo=True)
+            queryset = queryset.filter(nombre__istartswith='po').order_by(Collate('nombre', 'nocase'))
+            plan = queryset[:10].explain()
+            with self.subTest(modelo=fuente.modelo.__name__):
+                self.assertIn('USING INDEX', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_formularios_sin_opciones(self):
+        # Los formularios ya no consultan todas las filas para llenar un <select>
+        for url in [reverse('entregable_create'), reverse('proyecto_create')]:
+            with self.subTest(url=url), self.assertNumQueries(0):
+                respuesta = self.client.get(url)
+            self.assertNotContains(respuesta, 'Portal 00')
+        proyecto = Proyecto.objects.get(nombre='Migración')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(reverse('proyecto_update', args=[proyecto.pk]))
+        self.assertContains(respuesta, 'value="Diseño"')
+
+
+class EstaticosTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directorio = tempfile.TemporaryDirectory()
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.directorio.name))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(Path(cls.directorio.name) / 'staticfiles.json') as manifiesto:
+            cls.rutas = json.load(manifiesto)['paths']
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.directorio.cleanup()
+
+    def test_nombres_con_hash_minificados(self):
+        hasheado = self.rutas['js/main.js']
+        self.assertRegex(hasheado, r'^js/main\.[0-9a-f]{12}\.js$')
+        destino = Path(self.directorio.name)
+        self.assertLess((destino / hasheado).stat().st_size, (Path(settings.BASE_DIR) / 'static/js/main.js').stat().st_size)
+        self.assertTrue((destino / f'{hasheado}.gz').exists())
+        self.assertContains(self.client.get(reverse('entregable_list')), f'/static/{self.rutas["css/style.css"]}')
+
+    def test_variante_segun_accept_encoding(self):
+        url = f'/static/{self.rutas["css/style.css"]}'
+        respuesta = self.client.get(url, headers={'Accept-Encoding': 'br;q=0, gzip, deflate'})
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(respuesta['Content-Type'], 'text/css')
+        self.assertEqual(respuesta['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(respuesta['Vary'], 'Accept-Encoding')
+        self.assertFalse(respuesta.has_header('Content-Disposition'))
+        respuesta = self.client.get(url)
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+        self.assertTrue(b''.join(respuesta.streaming_content).startswith(b':root{'))
+        # Sin hash en el nombre se revalida siempre
+        self.assertIn('max-age=0', self.client.get('/static/css/style.css')['Cache-Control'])
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+
+    @unittest.skipIf(estaticos.brotli is None, 'brotli no está instalado')
+    def test_brotli(self):
+        respuesta = self.client.get(f'/static/{self.rutas["js/main.js"]}', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(respuesta['Content-Encoding'], 'br')
+
+    def test_minificadores(self):
+        self.assertEqual(estaticos.minificar_css('/* x */\na , b {\n  color : red ;\n}\n.c :hover { }'),
+                         'a,b{color :red}.c :hover{}')
+        js = 'const a = 1; // fin\n\n  // comentario\n  el.innerHTML = `\n    <b>x</b>\n`;\n'
+        self.assertEqual(estaticos.minificar_js(js), 'const a = 1;\nel.innerHTML = `\n    <b>x</b>\n`;\n')
+
+    def test_minificadores_respetan_los_literales(self):
+        self.assertEqual(estaticos.minificar_css('a::after { content: "a  /* b */  c" ; } /* x */ b{}'),
+                         'a::after{content:"a  /* b */  c"}b{}')
+        js = (
+            "const a = '/*', b = \"//\"; /* c */\n"
+            "const r = /\\/*[/]/g, d = x / 2 / y;\n"
+            "const t = `\\` ${'`'} ${ {k: `/* ${a} */`}.k }\n  // dentro\n`; // fin\n"
+            "  return /a\\/b/.test(t)\n"
+        )
+        self.assertEqual(estaticos.minificar_js(js), (
+            "const a = '/*', b = \"//\";\n"
+            "const r = /\\/*[/]/g, d = x / 2 / y;\n"
+            "const t = `\\` ${'`'} ${ {k: `/* ${a} */`}.k }\n  // dentro\n`;\n"
+            "return /a\\/b/.test(t)\n"
+        ))
+
+
+class MigracionesTests(SimpleTestCase):
+    """Actualiza una base con datos desde una migración antigua, en un archivo SQLite aparte"""
+    ALIAS = 'migraciones_prueba'
+    # El alias se registra en setUpClass; '__all__' lo incluye sin declararlo en settings
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directorio = tempfile.TemporaryDirectory()
+        ruta = Path(cls.directorio.name) / 'antigua.sqlite3'
+        connections.settings[cls.ALIAS] = dict(connections.settings['default'], NAME=str(ruta))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[cls.ALIAS].close()
+        del connections[cls.ALIAS]
+        del connections.settings[cls.ALIAS]
+        cls.directorio.cleanup()
+
+    def poblar(self, migracion):
+        """Migra la base vacía hasta `migracion` y crea un proyecto con dos entregables"""
+        conexion = connections[self.ALIAS]
+        conexion.close()
+        Path(conexion.settings_dict['NAME']).unlink(missing_ok=True)
+        call_command('migrate', 'entregables', migracion, database=self.ALIAS, verbosity=0)
+        modelos = MigrationExecutor(conexion).loader.project_state(('entregables', migracion)).apps
+        equipo = modelos.get_model('entregables', 'Equipo').objects.using(self.ALIAS).create(nombre='Antiguo')
+        proyecto = modelos.get_model('entregables', 'Proyecto').objects.using(self.ALIAS).create(
+            nombre='Antiguo', descripcion='D', equipo=equipo, fecha_inicio=date(2024, 1, 1),
+            fecha_fin_estimada=date(2024, 6, 1),
+        )
+        entregables = modelos.get_model('entregables', 'Entregable').objects.using(self.ALIAS)
+        entregables.create(proyecto=proyecto, titulo='Vencido', descripcion='D', fecha_vencimiento=date(2024, 2, 1),
+                           porcentaje_completado=40)
+        entregables.create(proyecto=proyecto, titulo='Aprobado', descripcion='D', estado='aprobado',
+                           fecha_vencimiento=date(2024, 3, 1), fecha_completado=timezone.now(), porcentaje_completado=100)
+
+    def test_actualiza_una_base_con_datos(self):
+        # Las migraciones de datos no dependen del código actual (p. ej. contadores.recalcular)
+        for migracion in ['0002_alter_entregable_estado_delete_estadoentregable', '0005_archivo_por_contenido']:
+            with self.subTest(desde=migracion):
+                self.poblar(migracion)
+                call_command('migrate', 'entregables', database=self.ALIAS, verbosity=0)
+                proyecto = Proyecto.objects.using(self.ALIAS).get()
+                self.assertEqual(
+                    {campo: getattr(proyecto, campo) for campo in Proyecto.CAMPOS_CONTADORES if getattr(proyecto, campo)},
+                    {'total_entregables': 2, 'entregables_pendientes': 1, 'entregables_aprobados': 1,
+                     'entregables_vencidos': 1, 'suma_porcentaje': 140},
+                )
+                self.assertTrue(Entregable.objects.using(self.ALIAS).filter(titulo='Vencido').exists())
+
+class ReplicasTests(TestCase):
+    """La réplica es una copia de la base de pruebas en otro archivo SQLite"""
+    REPLICA = 'replica_prueba'
+    # El alias se registra en setUpClass; '__all__' lo incluye sin declararlo en settings
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directorio = tempfile.TemporaryDirectory()
+        ruta = Path(cls.directorio.name) / 'replica.sqlite3'
+        connection.ensure_connection()
+        with closing(sqlite3.connect(ruta)) as destino:
+            connection.connection.backup(destino)
+        connections.settings[cls.REPLICA] = dict(connections.settings['default'], NAME=str(ruta))
+        cls.enterClassContext(override_settings(REPLICAS={cls.REPLICA: 1}))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[cls.REPLICA].close()
+        del connections[cls.REPLICA]
+        del connections.settings[cls.REPLICA]
+        cls.directorio.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo('Primaria')
+        cls.proyecto = crear_proyecto(cls.equipo)
+        # Equipo que solo existe en la réplica: indica de dónde se leyó
+        Equipo.objects.using(cls.REPLICA).create(nombre='Solo en réplica')
+
+    def test_lecturas_get_en_la_replica(self):
+        respuesta = self.client.get(reverse('equipo_list'))
+        self.assertContains(respuesta, 'Solo en réplica')
+        self.assertNotContains(respuesta, 'Primaria')
+        # El panel va a una caché compartida: se calcula en la primaria
+        cache.clear()
+        contexto = self.client.get(reverse('index')).context
+        self.assertEqual(contexto['proyectos_count'], 1)
+        self.assertEqual(contexto['equipos_count'], 1)
+        self.assertEqual(Equipo.objects.db, 'default')  # fuera de una petición
+
+    def test_lee_de_la_primaria_tras_escribir(self):
+        respuesta = self.client.post(reverse('equipo_create'), {'nombre': 'Recién creado', 'descripcion': ''})
+        self.assertEqual(respuesta.cookies[replicas.COOKIE]['max-age'], settings.REPLICAS_VENTANA_PRIMARIA)
+        respuesta = self.client.get(reverse('equipo_list'))
+        self.assertContains(respuesta, 'Recién creado')
+        self.assertNotContains(respuesta, 'Solo en réplica')
+        # Al caducar la cookie se vuelve a la réplica
+        self.client.cookies.pop(replicas.COOKIE)
+        self.assertNotContains(self.client.get(reverse('equipo_list')), 'Recién creado')
+
+    def test_primaria_forzada(self):
+        # El proyecto no existe en la réplica: sin @primaria sería 404
+        self.assertEqual(self.client.get(reverse('proyecto_update', args=[self.proyecto.pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('proyecto_list')).context['proyectos'][:1], [])
+
+    def test_rotacion_ponderada(self):
+        with override_settings(REPLICAS={'a': 3, 'b': 1}):
+            elegidas = [replicas.elegir_replica() for _ in range(8)]
+        self.assertEqual(elegidas, ['a', 'a', 'b', 'a'] * 2)
+
+
+class AdminRapidoTests(TestCase):
+    MODELOS = ['equipo', 'miembro', 'proyecto', 'entregable', 'comentario']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('admin', 'admin@ejemplo.com', 'clave')
+        cls.poblar(2)
+
+    @classmethod
+    def poblar(cls, cantidad):
+        inicio = Equipo.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            equipo = crear_equipo(f'Equipo {i}')
+            miembro = Miembro.objects.create(nombre=f'Miembro {i}', email=f'm{i}@ejemplo.com', rol='tester', equipo=equipo)
+            proyecto = crear_proyecto(equipo, f'Proyecto {i}')
+            entregable = crear_entregable(proyecto, f'Entregable {i}', responsable=miembro)
+            Comentario.objects.create(entregable=entregable, autor=f'Autor {i}', contenido='Revisado')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def consultas(self, url, params=None):
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        return contexto.captured_queries
+
+    def test_consultas_constantes_por_lista(self):
+        proyecto = Proyecto.objects.first()
+        casos = [(modelo, None) for modelo in self.MODELOS] + [
+            ('entregable', {'q': 'entregable'}),
+            ('entregable', {'proyecto__id__exact': proyecto.pk}),
+            ('miembro', {'q': 'miem'}),
+        ]
+        antes = {i: len(self.consultas(reverse(f'admin:entregables_{m}_changelist'), p)) for i, (m, p) in enumerate(casos)}
+        self.poblar(20)
+        for i, (modelo, params) in enumerate(casos):
+            with self.subTest(modelo=modelo, params=params):
+                self.assertEqual(len(self.consultas(reverse(f'admin:entregables_{modelo}_changelist'), params)), antes[i])
+
+    def test_formulario_y_filtro_sin_todas_las_opciones(self):
+        self.poblar(10)
+        entregable = Entregable.objects.select_related('proyecto').first()
+        respuesta = self.client.get(reverse('admin:entregables_entregable_change', args=[entregable.pk]))
+        self.assertContains(respuesta, 'admin-autocomplete')
+        self.assertContains(respuesta, '<option', count=2 + len(Entregable.ESTADOS) + len(Entregable.PRIORIDADES))
+        url = reverse('admin:entregables_entregable_changelist')
+        respuesta = self.client.get(url, {'proyecto__id__exact': entregable.proyecto_id})
+        self.assertContains(respuesta, 'filtro-autocompletar')
+        self.assertContains(respuesta, f'<option value="{entregable.proyecto_id}" selected>')
+
+    def test_busqueda_por_indice(self):
+        sql = ' '.join(c['sql'] for c in self.consultas(reverse('admin:entregables_entregable_changelist'), {'q': 'entregable'}))
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_conteo_estimado(self):
+        self.poblar(8)
+        with mock.patch('entregables.admin.LIMITE_CONTEO', 5):
+            Entregable.objects.filter(pk=Entregable.objects.order_by('pk').first().pk).delete()
+            self.assertEqual(admin_entregables.PaginadorEstimado(Entregable.objects.all(), 10).count, 10)
+            self.assertEqual(admin_entregables.PaginadorEstimado(Entregable.objects.filter(estado='pendiente'), 10).count, 6)
+        self.assertEqual(admin_entregables.PaginadorEstimado(Entregable.objects.all(), 10).count, 9)
+
+    def test_jerarquia_igual_que_la_de_django(self):
+        for ano, mes, dia in [(2023, 5, 2), (2024, 1, 9), (2024, 1, 20), (2024, 3, 1)]:
+            crear_entregable(Proyecto.objects.first(), fecha_creacion=timezone.make_aware(datetime(ano, mes, dia, 23, 30)))
+        modelo_admin = admin.site._registry[Entregable]
+        for params in [{}, {'fecha_creacion__year': '2024'}, {'fecha_creacion__year': '2024', 'fecha_creacion__month': '1'}]:
+            request = RequestFactory().get('/', params)
+            request.user = self.usuario
+            cl = modelo_admin.get_changelist_instance(request)
+            with self.subTest(params=params):
+                self.assertEqual(jerarquia_fechas(cl), date_hierarchy(cl))
+
+
+class BorradoCascadaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo('Se borra')
+        cls.otro = crear_equipo('Se queda')
+        cls.miembro = Miembro.objects.create(nombre='Ana', email='ana@ejemplo.com', rol='tester', equipo=cls.equipo)
+        cls.proyectos = [crear_proyecto(cls.equipo, f'P{i}') for i in range(2)]
+        for i in range(5):
+            entregable = crear_entregable(cls.proyectos[i % 2], f'E{i}', archivo=f'entregables/{i}.pdf' if i < 2 else None)
+            Comentario.objects.create(entregable=entregable, autor='Ana', contenido='Se borra')
+        cls.ajeno = crear_entregable(
+            crear_proyecto(cls.otro), 'Ajeno', responsable=cls.miembro, archivo='entregables/0.pdf',
+        )
+
+    def eliminar(self, funcion, objeto, **kwargs):
+        with mock.patch.object(borrado, 'liberar_en_segundo_plano') as liberar:
+            with self.captureOnCommitCallbacks(execute=True):
+                borrados = funcion(objeto, **kwargs)
+        return borrados, liberar
+
+    def test_eliminar_equipo_por_lotes(self):
+        progreso = []
+        borrados, liberar = self.eliminar(
+            borrado.eliminar_equipo, self.equipo, lote=2, progreso=lambda *args: progreso.append(args),
+        )
+        self.assertEqual(borrados, {
+            'comentarios': 5, 'entregables': 5, 'proyectos': 2, 'proyectos_archivados': 0, 'miembros': 1, 'equipos': 1,
+        })
+        self.assertEqual(progreso[:3], [('comentarios', 2), ('comentarios', 4), ('comentarios', 5)])
+        liberar.assert_called_once_with({'entregables/0.pdf', 'entregables/1.pdf'})
+        self.assertEqual(list(Equipo.objects.all()), [self.otro])
+        self.assertEqual(list(Entregable.objects.all()), [self.ajeno])
+        self.ajeno.refresh_from_db()
+        self.assertIsNone(self.ajeno.responsable)
+
+    def test_eliminar_proyecto(self):
+        borrados, liberar = self.eliminar(borrado.eliminar_proyecto, self.proyectos[1])
+        self.assertEqual(borrados, {'comentarios': 2, 'entregables': 2, 'proyectos': 1})
+        liberar.assert_called_once_with({'entregables/1.pdf'})
+        self.assertEqual(Entregable.objects.filter(proyecto=self.proyectos[0]).count(), 3)
+        self.assertEqual(busqueda.filtrar_busqueda(Comentario.objects.all(), 'borra').count(), 3)
+
+    def test_liberar_en_segundo_plano(self):
+        with mock.patch.object(almacenamiento, 'liberar') as liberar:
+            borrado.liberar_en_segundo_plano({'entregables/0.pdf'}).join()
+        liberar.assert_called_once_with('entregables/0.pdf')
+
+    def test_vistas(self):
+        url = reverse('equipo_delete', args=[self.equipo.pk])
+        with mock.patch.object(borrado, 'LIMITE_CONTEO', 3):
+            respuesta = self.client.get(url)
+        self.assertContains(respuesta, '<strong>Proyectos:</strong> 2', html=False)
+        self.assertContains(respuesta, '<strong>Comentarios:</strong> más de 3', html=False)
+        self.assertContains(respuesta, '<strong>Entregables:</strong> más de 3', html=False)
+
+        with mock.patch.object(borrado, 'liberar_en_segundo_plano'):
+            respuesta = self.client.post(reverse('proyecto_delete', args=[self.proyectos[0].pk]), follow=True)
+        self.assertContains(respuesta, 'Proyecto eliminado exitosamente (3 entregables).')
+
+        respuesta = self.client.post(url, follow=True)
+        self.assertContains(respuesta, 'Equipo eliminado exitosamente (1 proyectos, 2 entregables).')
+        self.assertFalse(Miembro.objects.exists())
+
+    def test_comando(self):
+        salida = StringIO()
+        with mock.patch.object(almacenamiento, 'liberar') as liberar, self.captureOnCommitCallbacks(execute=True):
+            call_command('eliminar_en_cascada', 'proyecto', self.proyectos[0].pk, stdout=salida)
+        self.assertIn('Eliminados 3 comentarios, 3 entregables, 1 proyectos', salida.getvalue())
+        liberar.assert_called_once_with('entregables/0.pdf')
+
+
+class ArchivoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.equipo = crear_equipo()
+        cls.cerrado = crear_proyecto(cls.equipo, 'Cerrado', estado='completado')
+        cls.vivo = crear_proyecto(cls.equipo, 'Vivo', estado='completado')
+        cls.entregables = [
+            crear_entregable(cls.cerrado, 'Informe final', estado='aprobado', porcentaje_completado=100),
+            crear_entregable(cls.cerrado, 'Anexo', archivo='entregables/anexo.pdf'),
+        ]
+        crear_entregable(cls.vivo, 'Informe parcial')
+        Comentario.objects.create(entregable=cls.entregables[0], autor='Ana', contenido='Cerrado sin cambios')
+        # Crear entregables actualiza fecha_modificacion: solo el primero queda fuera de la ventana
+        Proyecto.objects.filter(pk=cls.cerrado.pk).update(fecha_modificacion=timezone.now() - timedelta(days=100))
+
+    def test_archivar_y_restaurar(self):
+        self.assertEqual(archivado.archivar(), {'proyectos': 1, 'entregables': 2, 'comentarios': 1})
+        self.assertEqual(list(Proyecto.objects.all()), [self.vivo])
+        self.assertFalse(Comentario.objects.exists())
+        self.assertEqual(list(busqueda.filtrar_busqueda(Entregable.objects.all(), 'informe')), [Entregable.objects.get()])
+        copia = ProyectoArchivado.objects.get(pk=self.cerrado.pk)
+        self.assertIsNotNone(copia.fecha_archivado)
+        self.assertEqual((copia.total_entregables, copia.porcentaje_promedio), (2, 50))
+        self.assertEqual(ComentarioArchivado.objects.get().entregable.proyecto, copia)
+
+        # El blob sigue referenciado desde el archivo
+        with mock.patch.object(almacenamiento.almacenamiento, 'delete') as borrar:
+            almacenamiento.liberar('entregables/anexo.pdf')
+        borrar.assert_not_called()
+
+        self.assertEqual(archivado.restaurar([self.cerrado.pk]), {'proyectos': 1, 'entregables': 2, 'comentarios': 1})
+        self.assertFalse(ProyectoArchivado.objects.exists())
+        self.cerrado.refresh_from_db()
+        self.assertEqual(self.cerrado.total_entregables, 2)
+        self.assertEqual(
+            sorted(Entregable.objects.filter(proyecto=self.cerrado).values_list('pk', flat=True)),
+            [entregable.pk for entregable in self.entregables],
+        )
+        self.assertEqual(busqueda.filtrar_busqueda(Comentario.objects.all(), 'cerrado').count(), 1)
+
+    def test_tablas_de_archivo_con_todas_las_columnas(self):
+        for vivo, archivado_ in zip(archivado.VIVOS, archivado.ARCHIVADOS):
+            with self.subTest(modelo=vivo.__name__):
+                comunes = archivado.columnas_comunes(vivo, archivado_)
+                self.assertEqual(len(comunes), len(vivo._meta.concrete_fields))
+
+    def test_vistas_leen_el_archivo_a_demanda(self):
+        archivado.archivar()
+        pk = self.entregables[0].pk
+        self.assertNotContains(self.client.get(reverse('entregable_list')), 'Informe final')
+        respuesta = self.client.get(reverse('entregable_list'), {'archivados': 1, 'q': 'final'})
+        self.assertContains(respuesta, 'Informe final')
+        self.assertNotContains(respuesta, 'Informe parcial')
+        self.assertNotContains(respuesta, 'acciones-masivas')
+        self.assertContains(self.client.get(reverse('proyecto_list'), {'archivados': 1}), 'Cerrado')
+
+        respuesta = self.client.get(reverse('entregable_detail', args=[pk]))
+        self.assertContains(respuesta, 'Archivado')
+        self.assertContains(respuesta, 'Cerrado sin cambios')
+        self.assertNotContains(respuesta, 'Agregar Comentario')
+        respuesta = self.client.post(reverse('entregable_detail', args=[pk]), {'autor': 'Ana', 'contenido': 'Nuevo'}, follow=True)
+        self.assertContains(respuesta, 'El entregable está archivado')
+        self.assertEqual(ComentarioArchivado.objects.count(), 1)
+        self.assertEqual(self.client.get(reverse('entregable_comentarios', args=[pk])).status_code, 200)
+        self.assertEqual(self.client.get(reverse('entregable_detail', args=[pk + 100])).status_code, 404)
+
+    def test_comandos_y_borrado_del_equipo(self):
+        salida = StringIO()
+        call_command('archivar_proyectos', '--dias', '30', stdout=salida)
+        self.assertIn('1 proyectos archivados (2 entregables, 1 comentarios)', salida.getvalue())
+        call_command('restaurar_proyectos', '--proyecto', str(self.vivo.pk), stdout=salida)
+        self.assertIn('0 proyectos restaurados', salida.getvalue())
+
+        with mock.patch.object(borrado, 'liberar_en_segundo_plano') as liberar, self.captureOnCommitCallbacks(execute=True):
+            borrados = borrado.eliminar_equipo(self.equipo)
+        self.assertEqual((borrados['proyectos'], borrados['proyectos_archivados'], borrados['entregables']), (1, 1, 3))
+        liberar.assert_called_once_with({'entregables/anexo.pdf'})
+        self.assertFalse(EntregableArchivado.objects.exists())
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, autocompletar, descargas, metricas, views
 
 urlpatterns = [
     # Index
@@ -20,7 +20,20 @@ urlpatterns = [
     # Entregables CRUD
     path('entregables/', views.entregable_list, name='entregable_list'),
     path('entregables/crear/', views.entregable_create, name='entregable_create'),
+    path('entregables/acciones/', views.entregable_acciones, name='entregable_acciones'),
     path('entregables/<int:pk>/', views.entregable_detail, name='entregable_detail'),
+    path('entregables/<int:pk>/comentarios/', views.entregable_comentarios, name='entregable_comentarios'),
+    path('entregables/<int:pk>/archivo/', descargas.descargar, name='entregable_archivo'),
     path('entregables/<int:pk>/editar/', views.entregable_update, name='entregable_update'),
     path('entregables/<int:pk>/eliminar/', views.entregable_delete, name='entregable_delete'),
+
+    # Autocompletado de los formularios
+    path('autocompletar/<slug:fuente>/', autocompletar.autocompletar, name='autocompletar'),
+
+    # API JSON
+    path('api/<slug:recurso>/', api.lista, name='api_lista'),
+    path('api/<slug:recurso>/<int:pk>/', api.detalle, name='api_detalle'),
+
+    # Métricas (Prometheus)
+    path('metrics', metricas.exponer, name='metricas'),
 ]
@@ -0,0 +1,45 @@
+"""
+Barrido de entregables vencidos para avisos.
+
+Cada lote lee del índice de vencidos solo el id y el proyecto de, como
+mucho, `lote` entregables aún no avisados y los marca con un UPDATE por
+clave primaria. Se guarda el vencimiento avisado, de modo que si la fecha
+de vencimiento cambia el entregable vuelve a avisarse cuando venza otra
+vez. Al terminar se recalculan los contadores de los proyectos tocados.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import contadores
+from .models import Entregable
+
+
+def pendientes_de_aviso(hoy=None):
+    return Entregable.objects.vencidos(hoy).filter(
+        Q(vencimiento_avisado__isnull=True) | ~Q(vencimiento_avisado=F('fecha_vencimiento'))
+    )
+
+
+def barrer(lote=1000, hoy=None):
+    """Marca los vencidos pendientes de aviso; devuelve (marcados, fecha del aviso)"""
+    marca = timezone.now()
+    pendientes = pendientes_de_aviso(hoy).order_by('fecha_vencimiento', 'id').values_list('pk', 'proyecto')
+    marcados = 0
+    proyectos = set()
+    while True:
+        with transaction.atomic():
+            filas = list(pendientes[:lote])
+            if filas:
+                # Por clave primaria: fecha_aviso_vencido no tiene índice
+                marcados += Entregable.objects.filter(pk__in=[pk for pk, _ in filas]).update(
+                    vencimiento_avisado=F('fecha_vencimiento'),
+                    fecha_aviso_vencido=marca,
+                )
+        proyectos.update(proyecto for _, proyecto in filas)
+        if len(filas) < lote:
+            break
+    if proyectos:
+        # Los contadores de vencidos de estos proyectos cambiaron con el paso del tiempo
+        contadores.recalcular(proyectos)
+    return marcados, marca
@@ -0,0 +1,178 @@
+"""
+Versiones por tabla para GET condicionales.
+
+La tabla `entregables_version` guarda, por cada tabla de la aplicación, un
+número de versión y el instante de su último cambio. Triggers de SQLite la
+actualizan en cada INSERT, UPDATE y DELETE, también en las operaciones
+masivas (bulk_create, update(), borrados en cascada) que no emiten señales.
+
+`condicion()` envuelve el decorador `condition` de Django: antes de
+consultar y renderizar, la vista lee con una sola consulta las versiones de
+las tablas que muestra y responde 304 si el cliente ya tiene esa versión.
+El ETag es débil (la página incluye el token CSRF, que cambia en cada
+renderizado) y varía con la URL, así que cada combinación de filtros y
+búsqueda tiene el suyo. En motores distintos de SQLite no hay validadores y
+las vistas responden siempre con la página completa.
+"""
+import hashlib
+from datetime import datetime, time, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.contrib import messages
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+
+TABLA = 'entregables_version'
+MODELOS_VERSIONADOS = [
+    'Equipo', 'Miembro', 'Proyecto', 'Entregable', 'Comentario',
+    'ProyectoArchivado', 'EntregableArchivado', 'ComentarioArchivado',
+]
+EVENTOS = [('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')]
+
+# Segundos desde la época con fracción (unixepoch('subsec') requiere SQLite 3.42)
+AHORA_SQL = "(julianday('now') - 2440587.5) * 86400.0"
+
+
+def _tabla(nombre):
+    return apps.get_model('entregables', nombre)._meta.db_table
+
+
+def _sql_triggers(tabla):
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {tabla}_version_{sufijo} AFTER {evento} ON {tabla} BEGIN
+            UPDATE {TABLA} SET version = version + 1, modificado = {AHORA_SQL} WHERE tabla = '{tabla}';
+        END"""
+        for sufijo, evento in EVENTOS
+    ]
+
+
+def crear(connection):
+    """Crea la tabla de versiones, una fila por tabla versionada y sus triggers"""
+    if connection.vendor != 'sqlite':
+        return
+    # Las tablas que crea una migración posterior se añaden cuando esta vuelve a llamar a crear()
+    tablas = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {TABLA} ('
+            'tabla TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0, modificado REAL NOT NULL)'
+        )
+        for nombre in MODELOS_VERSIONADOS:
+            tabla = _tabla(nombre)
+            if tabla not in tablas:
+                continue
+            cursor.execute(
+                f'INSERT OR IGNORE INTO {TABLA} (tabla, version, modificado) VALUES (%s, 0, {AHORA_SQL})', [tabla]
+            )
+            for sql in _sql_triggers(tabla):
+                cursor.execute(sql)
+
+
+def eliminar(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nombre in MODELOS_VERSIONADOS:
+            tabla = _tabla(nombre)
+            for sufijo, _ in EVENTOS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {tabla}_version_{sufijo}')
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLA}')
+
+
+def asegurar_triggers(connection):
+    """Restaura los triggers que el editor de esquema de SQLite pierde al reconstruir una tabla"""
+    if connection.vendor != 'sqlite':
+        return
+    tablas = set(connection.introspection.table_names())
+    if TABLA not in tablas:
+        return
+    with connection.cursor() as cursor:
+        for nombre in MODELOS_VERSIONADOS:
+            tabla = _tabla(nombre)
+            if tabla in tablas:
+                for sql in _sql_triggers(tabla):
+                    cursor.execute(sql)
+
+
+def leer(tablas, using=DEFAULT_DB_ALIAS):
+    """{tabla: (versión, instante del último cambio)} de las tablas dadas"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return {}
+    marcadores = ', '.join(['%s'] * len(tablas))
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT tabla, version, modificado FROM {TABLA} WHERE tabla IN ({marcadores})', list(tablas))
+        return {tabla: (version, modificado) for tabla, version, modificado in cursor.fetchall()}
+
+
+class Validador:
+    """Calcula el ETag y Last-Modified de una vista a partir de las versiones de sus tablas"""
+
+    def __init__(self, modelos, por_dia=False):
+        self.modelos = modelos
+        # Las vistas que marcan vencidos cambian al cambiar el día
+        self.por_dia = por_dia
+
+    def versiones(self, request):
+        # etag y last_modified se piden por separado: una sola lectura por petición
+        cache = request.__dict__.setdefault('_versiones', {})
+        if self not in cache:
+            cache[self] = self._leer(request)
+        return cache[self]
+
+    def _leer(self, request):
+        # Con mensajes pendientes la página debe renderizarse para mostrarlos
+        if len(messages.get_messages(request)):
+            return None
+        tablas = [_tabla(nombre) for nombre in self.modelos]
+        # La misma base de datos (primaria o réplica) de la que leerá la vista
+        versiones = leer(tablas, using=router.db_for_read(apps.get_model('entregables', self.modelos[0])))
+        if len(versiones) != len(tablas):
+            return None
+        return versiones
+
+    def etag(self, request, *args, **kwargs):
+        versiones = self.versiones(request)
+        if versiones is None:
+            return None
+        partes = [request.get_full_path()]
+        partes += [f'{tabla}:{version}' for tabla, (version, _) in sorted(versiones.items())]
+        if self.por_dia:
+            partes.append(timezone.localdate().isoformat())
+        return 'W/"%s"' % hashlib.md5('|'.join(partes).encode(), usedforsecurity=False).hexdigest()
+
+    def ultima_modificacion(self, request, *args, **kwargs):
+        versiones = self.versiones(request)
+        if versiones is None:
+            return None
+        modificado = datetime.fromtimestamp(max(m for _, m in versiones.values()), dt_timezone.utc)
+        if self.por_dia:
+            inicio_dia = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+            modificado = max(modificado, inicio_dia)
+        return modificado
+
+
+def condicion(*modelos, por_dia=False):
+    """
+    Decorador `condition` con los validadores de las tablas de `modelos`.
+
+    En las vistas asíncronas las versiones se leen antes en un hilo, porque
+    condition() llama a sus funciones de forma síncrona.
+    """
+    validador = Validador(modelos, por_dia)
+
+    def decorador(vista):
+        condicionada = condition(etag_func=validador.etag, last_modified_func=validador.ultima_modificacion)(vista)
+        if not iscoroutinefunction(vista):
+            return condicionada
+
+        @wraps(vista)
+        async def interna(request, *args, **kwargs):
+            await sync_to_async(validador.versiones)(request)
+            return await condicionada(request, *args, **kwargs)
+        return interna
+    return decorador
@@ -1,46 +1,54 @@
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
-from django.db.models import Q
-from .models import Equipo, Miembro, Proyecto, Entregable, Comentario
+from django.core.exceptions import ValidationError
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from . import acciones, archivado, borrado, dashboard
+from .replicas import primaria
+from .versiones import condicion
+from .models import Equipo, Proyecto, Entregable, Comentario, ProyectoArchivado, EntregableArchivado
+from .busqueda import campo_orden, ordenar_por_relevancia
+from .paginacion import PaginadorCursor, paginar, TAMANOS_PAGINA
 from datetime import date
 
 
+COMENTARIOS_POR_PAGINA = 20
+
+# Tablas que muestra el detalle, que también puede venir del archivo
+MODELOS_DETALLE = [
+    'Entregable', 'Proyecto', 'Equipo', 'Miembro', 'Comentario',
+    'EntregableArchivado', 'ProyectoArchivado', 'ComentarioArchivado',
+]
+
+# Detalle con proyecto, equipo y responsable en un solo JOIN
+ENTREGABLE_DETALLE = Entregable.objects.select_related('proyecto__equipo', 'responsable__equipo')
+ENTREGABLE_ARCHIVADO_DETALLE = EntregableArchivado.objects.select_related('proyecto__equipo', 'responsable__equipo')
+
+
 def index(request):
     """Vista principal con dashboard"""
-    equipos_count = Equipo.objects.filter(activo=True).count()
-    proyectos_count = Proyecto.objects.count()
-    entregables_count = Entregable.objects.count()
-    miembros_count = Miembro.objects.filter(activo=True).count()
-    
-    # Entregables recientes
-    entregables_recientes = Entregable.objects.select_related('proyecto', 'responsable').order_by('-fecha_creacion')[:5]
-    
-    # Proyectos activos
-    proyectos_activos = Proyecto.objects.filter(estado='en_progreso').select_related('equipo')[:5]
-    
-    context = {
-        'equipos_count': equipos_count,
-        'proyectos_count': proyectos_count,
-        'entregables_count': entregables_count,
-        'miembros_count': miembros_count,
-        'entregables_recientes': entregables_recientes,
-        'proyectos_activos': proyectos_activos,
-    }
+    context = dashboard.obtener()
     return render(request, 'entregables/index.html', context)
 
 
 # ===== CRUD EQUIPOS =====
+@condicion('Equipo', 'Miembro', 'Proyecto')
 def equipo_list(request):
     """Lista de equipos"""
-    equipos = Equipo.objects.all().order_by('-fecha_creacion')
+    equipos = Equipo.objects.with_counts().order_by('-fecha_creacion')
     busqueda = request.GET.get('q')
     if busqueda:
-        equipos = equipos.filter(
-            Q(nombre__icontains=busqueda) | 
-            Q(descripcion__icontains=busqueda)
-        )
-    context = {'equipos': equipos, 'busqueda': busqueda}
+        equipos = ordenar_por_relevancia(equipos, busqueda)
+    pagina = paginar(request, equipos, campo_orden(equipos, 'fecha_creacion'))
+    context = {
+        'equipos': pagina.objetos,
+        'pagina': pagina,
+        'busqueda': busqueda,
+        'tamanos_pagina': TAMANOS_PAGINA,
+    }
     return render(request, 'entregables/equipo_list.html', context)
 
 
@@ -65,6 +73,7 @@ def equipo_create(request):
     return render(request, 'entregables/equipo_form.html', {'action': 'Crear'})
 
 
+@primaria
 def equipo_update(request, pk):
     """Actualizar equipo"""
     equipo = get_object_or_404(Equipo, pk=pk)
@@ -90,34 +99,43 @@ def equipo_delete(request, pk):
     equipo = get_object_or_404(Equipo, pk=pk)
     
     if request.method == 'POST':
-        equipo.delete()
-        messages.success(request, 'Equipo eliminado exitosamente.')
+        borrados = borrado.eliminar_equipo(equipo)
+        messages.success(
+            request,
+            f"Equipo eliminado exitosamente ({borrados['proyectos']} proyectos, "
+            f"{borrados['entregables']} entregables).",
+        )
         return redirect('equipo_list')
     
-    context = {'equipo': equipo}
+    context = {'equipo': equipo, 'estimacion': borrado.estimar_equipo(equipo), 'limite': borrado.LIMITE_CONTEO}
     return render(request, 'entregables/equipo_confirm_delete.html', context)
 
 
 # ===== CRUD PROYECTOS =====
+@condicion('Proyecto', 'Equipo', 'ProyectoArchivado')
 def proyecto_list(request):
     """Lista de proyectos"""
-    proyectos = Proyecto.objects.select_related('equipo').order_by('-fecha_inicio')
+    # Los archivados solo se leen a demanda: por defecto la lista recorre la tabla viva
+    archivados = bool(request.GET.get('archivados'))
+    modelo = ProyectoArchivado if archivados else Proyecto
+    proyectos = modelo.objects.select_related('equipo').order_by('-fecha_inicio')
     estado_filter = request.GET.get('estado')
     busqueda = request.GET.get('q')
     
     if estado_filter:
         proyectos = proyectos.filter(estado=estado_filter)
     if busqueda:
-        proyectos = proyectos.filter(
-            Q(nombre__icontains=busqueda) | 
-            Q(descripcion__icontains=busqueda)
-        )
+        proyectos = ordenar_por_relevancia(proyectos, busqueda)
     
+    pagina = paginar(request, proyectos, campo_orden(proyectos, 'fecha_inicio'))
     context = {
-        'proyectos': proyectos, 
+        'proyectos': pagina.objetos,
+        'pagina': pagina,
         'busqueda': busqueda,
         'estado_filter': estado_filter,
-        'estados': Proyecto.ESTADOS
+        'archivados': archivados,
+        'estados': Proyecto.ESTADOS,
+        'tamanos_pagina': TAMANOS_PAGINA,
     }
     return render(request, 'entregables/proyecto_list.html', context)
 
@@ -148,18 +166,17 @@ def proyecto_create(request):
         else:
             messages.error(request, 'Todos los campos requeridos deben ser completados.')
     
-    equipos = Equipo.objects.filter(activo=True)
     context = {
         'action': 'Crear',
-        'equipos': equipos,
         'estados': Proyecto.ESTADOS
     }
     return render(request, 'entregables/proyecto_form.html', context)
 
 
+@primaria
 def proyecto_update(request, pk):
     """Actualizar proyecto"""
-    proyecto = get_object_or_404(Proyecto, pk=pk)
+    proyecto = get_object_or_404(Proyecto.objects.select_related('equipo'), pk=pk)
     
     if request.method == 'POST':
         proyecto.nombre = request.POST.get('nombre')
@@ -180,11 +197,9 @@ def proyecto_update(request, pk):
         else:
             messages.error(request, 'Todos los campos requeridos deben ser completados.')
     
-    equipos = Equipo.objects.filter(activo=True)
     context = {
         'proyecto': proyecto,
         'action': 'Actualizar',
-        'equipos': equipos,
         'estados': Proyecto.ESTADOS
     }
     return render(request, 'entregables/proyecto_form.html', context)
@@ -195,41 +210,75 @@ def proyecto_delete(request, pk):
     proyecto = get_object_or_404(Proyecto, pk=pk)
     
     if request.method == 'POST':
-        proyecto.delete()
-        messages.success(request, 'Proyecto eliminado exitosamente.')
+        borrados = borrado.eliminar_proyecto(proyecto)
+        messages.success(request, f"Proyecto eliminado exitosamente ({borrados['entregables']} entregables).")
         return redirect('proyecto_list')
     
-    context = {'proyecto': proyecto}
+    context = {'proyecto': proyecto, 'estimacion': borrado.estimar_proyecto(proyecto), 'limite': borrado.LIMITE_CONTEO}
     return render(request, 'entregables/proyecto_confirm_delete.html', context)
 
 
 # ===== CRUD ENTREGABLES =====
-def entregable_list(request):
-    """Lista de entregables"""
-    entregables = Entregable.objects.select_related('proyecto', 'responsable').order_by('-fecha_creacion')
-    estado_filter = request.GET.get('estado')
-    prioridad_filter = request.GET.get('prioridad')
-    busqueda = request.GET.get('q')
-    
-    if estado_filter:
-        entregables = entregables.filter(estado=estado_filter)
-    if prioridad_filter:
-        entregables = entregables.filter(prioridad=prioridad_filter)
-    if busqueda:
-        entregables = entregables.filter(
-            Q(titulo__icontains=busqueda) | 
-            Q(descripcion__icontains=busqueda)
-        )
+def filtrar_entregables(request):
+    """Queryset de la lista de entregables según los filtros de la petición"""
+    filtros = {
+        'busqueda': request.GET.get('q'),
+        'estado_filter': request.GET.get('estado'),
+        'prioridad_filter': request.GET.get('prioridad'),
+        'vencidos_filter': bool(request.GET.get('vencidos')),
+        'archivados_filter': bool(request.GET.get('archivados')),
+    }
+    modelo = EntregableArchivado if filtros['archivados_filter'] else Entregable
+    entregables = modelo.objects.select_related('proyecto', 'responsable').annotate_vencido().order_by('-fecha_creacion')
     
-    context = {
-        'entregables': entregables,
-        'busqueda': busqueda,
-        'estado_filter': estado_filter,
-        'prioridad_filter': prioridad_filter,
+    if filtros['vencidos_filter']:
+        entregables = entregables.vencidos()
+    if filtros['estado_filter']:
+        entregables = entregables.filter(estado=filtros['estado_filter'])
+    if filtros['prioridad_filter']:
+        entregables = entregables.filter(prioridad=filtros['prioridad_filter'])
+    if filtros['busqueda']:
+        entregables = ordenar_por_relevancia(entregables, filtros['busqueda'])
+    return entregables, filtros
+
+
+def contexto_entregable_list(pagina, filtros):
+    return {
+        'entregables': pagina.objetos,
+        'pagina': pagina,
+        **filtros,
         'estados': Entregable.ESTADOS,
-        'prioridades': Entregable.PRIORIDADES
+        'prioridades': Entregable.PRIORIDADES,
+        'tamanos_pagina': TAMANOS_PAGINA,
+        'acciones': acciones.ACCIONES,
     }
-    return render(request, 'entregables/entregable_list.html', context)
+
+
+@condicion('Entregable', 'Proyecto', 'Miembro', 'EntregableArchivado', 'ProyectoArchivado', por_dia=True)
+def entregable_list(request):
+    """Lista de entregables"""
+    entregables, filtros = filtrar_entregables(request)
+    pagina = paginar(request, entregables, campo_orden(entregables, 'fecha_creacion'))
+    return render(request, 'entregables/entregable_list.html', contexto_entregable_list(pagina, filtros))
+
+
+@require_POST
+def entregable_acciones(request):
+    """Aplica una acción masiva a los entregables seleccionados en la lista"""
+    accion = request.POST.get('accion')
+    try:
+        afectados = acciones.ejecutar(request.POST.getlist('seleccion'), accion, request.POST.get('valor'))
+    except ValidationError as error:
+        messages.error(request, ' '.join(error.messages))
+    else:
+        verbo = 'eliminados' if accion == 'eliminar' else 'actualizados'
+        messages.success(request, f'{afectados} entregables {verbo} exitosamente.')
+
+    # Vuelve a la lista con los mismos filtros
+    siguiente = request.POST.get('siguiente')
+    if not url_has_allowed_host_and_scheme(siguiente, allowed_hosts={request.get_host()}):
+        siguiente = reverse('entregable_list')
+    return redirect(siguiente)
 
 
 def entregable_create(request):
@@ -258,7 +307,7 @@ def entregable_create(request):
             
             # Manejar archivo adjunto
             if 'archivo' in request.FILES:
-                entregable.archivo = request.FILES['archivo']
+                entregable.adjuntar(request.FILES['archivo'])
                 entregable.save()
             
             messages.success(request, 'Entregable creado exitosamente.')
@@ -266,22 +315,19 @@ def entregable_create(request):
         else:
             messages.error(request, 'Todos los campos requeridos deben ser completados.')
     
-    proyectos = Proyecto.objects.all()
-    miembros = Miembro.objects.filter(activo=True)
-    
     context = {
         'action': 'Crear',
-        'proyectos': proyectos,
-        'miembros': miembros,
         'estados': Entregable.ESTADOS,
         'prioridades': Entregable.PRIORIDADES
     }
     return render(request, 'entregables/entregable_form.html', context)
 
 
+@primaria
 def entregable_update(request, pk):
     """Actualizar entregable"""
-    entregable = get_object_or_404(Entregable, pk=pk)
+    # Proyecto y responsable: el formulario muestra sus nombres en el autocompletado
+    entregable = get_object_or_404(Entregable.objects.select_related('proyecto', 'responsable'), pk=pk)
     
     if request.method == 'POST':
         entregable.titulo = request.POST.get('titulo')
@@ -297,7 +343,7 @@ def entregable_update(request, pk):
         if entregable.titulo and entregable.proyecto_id and entregable.estado and entregable.fecha_vencimiento:
             # Manejar archivo adjunto
             if 'archivo' in request.FILES:
-                entregable.archivo = request.FILES['archivo']
+                entregable.adjuntar(request.FILES['archivo'])
             
             entregable.save()
             messages.success(request, 'Entregable actualizado exitosamente.')
@@ -305,14 +351,9 @@ def entregable_update(request, pk):
         else:
             messages.error(request, 'Todos los campos requeridos deben ser completados.')
     
-    proyectos = Proyecto.objects.all()
-    miembros = Miembro.objects.filter(activo=True)
-    
     context = {
         'entregable': entregable,
         'action': 'Actualizar',
-        'proyectos': proyectos,
-        'miembros': miembros,
         'estados': Entregable.ESTADOS,
         'prioridades': Entregable.PRIORIDADES
     }
@@ -332,11 +373,14 @@ def entregable_delete(request, pk):
     return render(request, 'entregables/entregable_confirm_delete.html', context)
 
 
+@condicion(*MODELOS_DETALLE, por_dia=True)
 def entregable_detail(request, pk):
     """Detalle de entregable con comentarios"""
-    entregable = get_object_or_404(Entregable, pk=pk)
-    comentarios = entregable.comentarios.all()
+    entregable = archivado.obtener(ENTREGABLE_DETALLE, ENTREGABLE_ARCHIVADO_DETALLE, pk)
     
+    if request.method == 'POST' and isinstance(entregable, EntregableArchivado):
+        messages.error(request, 'El entregable está archivado: no admite comentarios nuevos.')
+        return redirect('entregable_detail', pk=pk)
     if request.method == 'POST':
         autor = request.POST.get('autor')
         contenido = request.POST.get('contenido')
@@ -350,9 +394,31 @@ def entregable_detail(request, pk):
             messages.success(request, 'Comentario agregado exitosamente.')
             return redirect('entregable_detail', pk=pk)
     
+    pagina = paginador_comentarios(entregable).pagina(despues=request.GET.get('despues'))
     context = {
         'entregable': entregable,
-        'comentarios': comentarios
+        'comentarios': pagina.objetos,
+        'pagina_comentarios': pagina,
+        'total_comentarios': entregable.comentarios.count(),
+        'archivado': isinstance(entregable, EntregableArchivado),
     }
     return render(request, 'entregables/entregable_detail.html', context)
 
+
+def paginador_comentarios(entregable):
+    """Comentarios más recientes primero, por cursor sobre (fecha_creacion, id)"""
+    return PaginadorCursor(entregable.comentarios.all(), 'fecha_creacion', COMENTARIOS_POR_PAGINA)
+
+
+def entregable_comentarios(request, pk):
+    """Siguiente página de comentarios como fragmento HTML (botón Cargar más)"""
+    entregable = archivado.obtener(Entregable.objects.only('pk'), EntregableArchivado.objects.only('pk'), pk)
+    pagina = paginador_comentarios(entregable).pagina(despues=request.GET.get('despues'))
+    siguiente = None
+    if pagina.has_next():
+        siguiente = f"{reverse('entregable_comentarios', args=[pk])}?despues={pagina.cursor_siguiente}"
+    return JsonResponse({
+        'html': render_to_string('entregables/_comentarios.html', {'comentarios': pagina.objetos}, request),
+        'siguiente': siguiente,
+    })
+
@@ -0,0 +1,71 @@
+"""
+Versiones asíncronas de las vistas más consultadas (panel, lista y detalle
+de entregables), para servir con ASGI.
+
+gestion_entregables/urls_asgi.py las antepone a las síncronas y asgi.py la
+selecciona como ROOT_URLCONF; con WSGI se siguen usando las de views.py.
+Toda la cadena de middleware admite async, de modo que la petición no pasa
+por un hilo de sync_to_async en ningún punto salvo las propias consultas:
+el ORM de Django 5.2 aún las ejecuta en el hilo síncrono compartido, así
+que las lanzadas con asyncio.gather no se solapan en la base de datos,
+pero la petición no ocupa un hilo mientras espera.
+"""
+import asyncio
+
+from django.contrib import messages
+from django.shortcuts import redirect, render
+
+from . import archivado, dashboard
+from .busqueda import campo_orden
+from .models import Comentario, EntregableArchivado
+from .paginacion import apaginar
+from .versiones import condicion
+from .views import (
+    ENTREGABLE_ARCHIVADO_DETALLE, ENTREGABLE_DETALLE, MODELOS_DETALLE, contexto_entregable_list,
+    filtrar_entregables, paginador_comentarios,
+)
+
+
+async def index(request):
+    """Vista principal con dashboard"""
+    context = await dashboard.aobtener()
+    return render(request, 'entregables/index.html', context)
+
+
+@condicion('Entregable', 'Proyecto', 'Miembro', 'EntregableArchivado', 'ProyectoArchivado', por_dia=True)
+async def entregable_list(request):
+    """Lista de entregables"""
+    entregables, filtros = filtrar_entregables(request)
+    pagina = await apaginar(request, entregables, campo_orden(entregables, 'fecha_creacion'))
+    return render(request, 'entregables/entregable_list.html', contexto_entregable_list(pagina, filtros))
+
+
+@condicion(*MODELOS_DETALLE, por_dia=True)
+async def entregable_detail(request, pk):
+    """Detalle de entregable con comentarios"""
+    entregable = await archivado.aobtener(ENTREGABLE_DETALLE, ENTREGABLE_ARCHIVADO_DETALLE, pk)
+
+    if request.method == 'POST' and isinstance(entregable, EntregableArchivado):
+        messages.error(request, 'El entregable está archivado: no admite comentarios nuevos.')
+        return redirect('entregable_detail', pk=pk)
+    if request.method == 'POST':
+        autor = request.POST.get('autor')
+        contenido = request.POST.get('contenido')
+
+        if autor and contenido:
+            await Comentario.objects.acreate(entregable=entregable, autor=autor, contenido=contenido)
+            messages.success(request, 'Comentario agregado exitosamente.')
+            return redirect('entregable_detail', pk=pk)
+
+    pagina, total = await asyncio.gather(
+        paginador_comentarios(entregable).apagina(despues=request.GET.get('despues')),
+        entregable.comentarios.acount(),
+    )
+    context = {
+        'entregable': entregable,
+        'comentarios': pagina.objetos,
+        'pagina_comentarios': pagina,
+        'total_comentarios': total,
+        'archivado': isinstance(entregable, EntregableArchivado),
+    }
+    return render(request, 'entregables/entregable_detail.html', context)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gestion_entregables.settings')
+# Con ASGI se sirven las vistas asíncronas (entregables/vistas_async.py)
+os.environ.setdefault('ROOT_URLCONF', 'gestion_entregables.urls_asgi')
 
 application = get_asgi_application()
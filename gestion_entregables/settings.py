@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +42,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: los archivos estáticos no pasan por las vistas ni cuentan en las métricas
+    'entregables.estaticos.EstaticosMiddleware',
+    'entregables.metricas.MetricasMiddleware',
+    'entregables.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,7 +55,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'gestion_entregables.urls'
+# asgi.py usa gestion_entregables.urls_asgi, con las vistas asíncronas
+ROOT_URLCONF = config('ROOT_URLCONF', default='gestion_entregables.urls')
 
 TEMPLATES = [
     {
@@ -64,11 +69,16 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'entregables.context_processors.fragmentos',
             ],
         },
     },
 ]
 
+# Sin 'loaders' explícitos, Django 5.2 ya envuelve los cargadores en
+# django.template.loaders.cached.Loader (también con DEBUG, donde se invalida
+# al editar una plantilla): cada plantilla se compila una vez por proceso.
+
 WSGI_APPLICATION = 'gestion_entregables.wsgi.application'
 
 
@@ -82,6 +92,92 @@ DATABASES = {
     }
 }
 
+# Perfil de conexión SQLite para varios procesos de trabajo: WAL deja leer
+# mientras otro proceso escribe, busy_timeout espera al bloqueo en lugar de
+# fallar con "database is locked" y BEGIN IMMEDIATE toma el bloqueo de
+# escritura al abrir la transacción, de modo que no puede fallar a mitad al
+# pasar de lectura a escritura. `python manage.py estres_sqlite` lo compara
+# con la configuración por defecto.
+
+SQLITE_RENDIMIENTO = config('SQLITE_RENDIMIENTO', default=True, cast=bool)
+SQLITE_PRAGMAS = {
+    # Primero, para que el cambio de journal_mode también espere al bloqueo
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int),
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-20000, cast=int),  # negativo: KiB
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    'temp_store': config('SQLITE_TEMP_STORE', default='MEMORY'),
+}
+
+if SQLITE_RENDIMIENTO:
+    DATABASES['default']['OPTIONS'] = {
+        'init_command': ';'.join(f'PRAGMA {nombre}={valor}' for nombre, valor in SQLITE_PRAGMAS.items()),
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+# Réplicas de solo lectura (entregables/replicas.py): DATABASE_REPLICAS es una
+# lista de archivos con peso opcional, p. ej. "replica1.sqlite3:3,replica2.sqlite3".
+# Las lecturas de las peticiones GET van a una de ellas; las escrituras, y las
+# lecturas durante REPLICAS_VENTANA_PRIMARIA segundos tras escribir, a default.
+# La copia de default a las réplicas (Litestream, LiteFS...) queda fuera de Django.
+
+REPLICAS = {}
+for numero, replica in enumerate(config('DATABASE_REPLICAS', default='', cast=Csv()), start=1):
+    nombre, _, peso = replica.partition(':')
+    REPLICAS[f'replica_{numero}'] = int(peso or 1)
+    DATABASES[f'replica_{numero}'] = dict(DATABASES['default'], NAME=BASE_DIR / nombre, TEST={'MIRROR': 'default'})
+
+REPLICAS_ESTRATEGIA = config('REPLICAS_ESTRATEGIA', default='rotacion')  # o 'ponderada' (al azar por peso)
+REPLICAS_VENTANA_PRIMARIA = config('REPLICAS_VENTANA_PRIMARIA', default=5, cast=int)
+DATABASE_ROUTERS = ['entregables.replicas.RouterReplicas']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Con varios procesos de trabajo conviene un backend compartido (Redis,
+# Memcached) para que la invalidación del dashboard llegue a todos.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='gestion-entregables'),
+    },
+    # Filas de las listas ({% cache ... using="fragmentos" %}); la clave incluye
+    # fecha_modificacion, así que las versiones antiguas solo caducan
+    'fragmentos': {
+        'BACKEND': config('FRAGMENTOS_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('FRAGMENTOS_CACHE_LOCATION', default='gestion-entregables-fragmentos'),
+        'KEY_PREFIX': 'fragmentos',
+    },
+}
+
+FRAGMENTOS_CACHE_TIMEOUT = config('FRAGMENTOS_CACHE_TIMEOUT', default=3600, cast=int)
+if CACHES['fragmentos']['BACKEND'].endswith('LocMemCache'):
+    # El límite por defecto (300) no alcanza para las filas de varias páginas
+    CACHES['fragmentos']['OPTIONS'] = {
+        'MAX_ENTRIES': config('FRAGMENTOS_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    }
+
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+
+# Respuestas del autocompletado de los formularios (0 = sin caché)
+AUTOCOMPLETAR_CACHE_TIMEOUT = config('AUTOCOMPLETAR_CACHE_TIMEOUT', default=30, cast=int)
+
+
+# Token de las escrituras de la API JSON (entregables/api.py): `Authorization: Bearer <API_TOKEN>`.
+# Vacío, solo escriben las sesiones iniciadas con token CSRF
+API_TOKEN = config('API_TOKEN', default='')
+
+
+# Métricas por vista (entregables/metricas.py), publicadas en /metrics
+
+METRICAS_SERVER_TIMING = config('METRICAS_SERVER_TIMING', default=True, cast=bool)
+METRICAS_UMBRAL_LENTO_MS = config('METRICAS_UMBRAL_LENTO_MS', default=0, cast=float)
+# /metrics solo responde a estas IP o a `Authorization: Bearer <METRICAS_TOKEN>`
+METRICAS_IPS = config('METRICAS_IPS', default='127.0.0.1,::1', cast=Csv())
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,11 +215,33 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / config('STATIC_ROOT', default='staticfiles')
+
+# collectstatic minifica los recursos propios, les pone el hash del contenido
+# en el nombre y los precomprime (.gz y, con el paquete brotli, .br); el
+# middleware de entregables/estaticos.py los sirve desde STATIC_ROOT con la
+# variante que acepte el cliente y caché inmutable de un año
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'entregables.estaticos.AlmacenamientoEstatico'},
+}
+ESTATICOS_SERVIR = config('ESTATICOS_SERVIR', default=True, cast=bool)
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Las subidas se escriben a disco por bloques mientras se calcula su hash
+# (entregables/almacenamiento.py), sin mantenerlas completas en memoria
+FILE_UPLOAD_HANDLERS = ['entregables.almacenamiento.ManejadorSubidaHash']
+
+# Descarga de adjuntos (entregables/descargas.py): '' la sirve Django con
+# sendfile si el servidor lo admite; 'x-accel-redirect' (nginx) o 'x-sendfile'
+# (Apache/lighttpd) la delegan en el proxy. Con nginx, el prefijo es la
+# location interna que apunta a MEDIA_ROOT.
+DESCARGAS_OFFLOAD = config('DESCARGAS_OFFLOAD', default='')
+DESCARGAS_OFFLOAD_PREFIJO = config('DESCARGAS_OFFLOAD_PREFIJO', default='/media-protegido/')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
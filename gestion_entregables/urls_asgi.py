@@ -0,0 +1,18 @@
+"""
+URLs para el despliegue ASGI (ver asgi.py).
+
+Antepone las vistas asíncronas de entregables/vistas_async.py a las mismas
+rutas síncronas; el resto de rutas son las de gestion_entregables/urls.py.
+"""
+from django.urls import path
+
+from entregables import vistas_async
+
+from .urls import urlpatterns as urlpatterns_wsgi
+
+urlpatterns = [
+    path('', vistas_async.index, name='index'),
+    path('entregables/', vistas_async.entregable_list, name='entregable_list'),
+    path('entregables/<int:pk>/', vistas_async.entregable_detail, name='entregable_detail'),
+    *urlpatterns_wsgi,
+]
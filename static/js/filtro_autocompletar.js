@@ -0,0 +1,11 @@
+// Filtros del admin por clave foránea con autocompletado (FiltroAutocompletar en entregables/admin.py)
+'use strict';
+{
+    django.jQuery(document).on('change', 'select.filtro-autocompletar', function() {
+        const url = new URL(this.closest('[data-query-string]').dataset.queryString, window.location.href);
+        if (this.value) {
+            url.searchParams.set(this.name, this.value);
+        }
+        window.location.href = url.toString();
+    });
+}
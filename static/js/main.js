@@ -303,7 +303,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // ============================================
     // 21. FILTER FORM AUTO-SUBMIT ON CHANGE
     // ============================================
-    const filterSelects = document.querySelectorAll('.card-body select[name="estado"], .card-body select[name="prioridad"]');
+    const filterSelects = document.querySelectorAll('.card-body select[name="estado"], .card-body select[name="prioridad"], .card-body select[name="por_pagina"], .card-body input[name="vencidos"]');
     filterSelects.forEach(select => {
         select.addEventListener('change', function() {
             // Auto-submit the filter form when selection changes
@@ -315,7 +315,168 @@ document.addEventListener('DOMContentLoaded', function() {
     });
     
     // ============================================
-    // 22. CONSOLE WELCOME MESSAGE
+    // 22. LOAD MORE (COMMENTS)
+    // ============================================
+    document.querySelectorAll('[data-cargar-mas]').forEach(button => {
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+            const destino = document.querySelector(this.dataset.destino);
+            if (!destino || this.classList.contains('disabled')) {
+                return;
+            }
+            this.classList.add('disabled');
+            fetch(this.dataset.cargarMas, { headers: { 'Accept': 'application/json' } })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    destino.insertAdjacentHTML('beforeend', data.html);
+                    if (data.siguiente) {
+                        this.dataset.cargarMas = data.siguiente;
+                        this.classList.remove('disabled');
+                    } else {
+                        this.remove();
+                    }
+                })
+                .catch(() => {
+                    this.classList.remove('disabled');
+                    showNotification('No se pudieron cargar más comentarios.', 'danger');
+                });
+        });
+    });
+    
+    // ============================================
+    // 23. BULK ACTIONS (ENTREGABLES)
+    // ============================================
+    document.querySelectorAll('[data-acciones-masivas]').forEach(form => {
+        const casillas = document.querySelectorAll(`input[name="seleccion"][form="${form.id}"]`);
+        const todos = document.querySelector('[data-seleccionar-todos]');
+        const accion = form.querySelector('select[name="accion"]');
+        const boton = form.querySelector('button[type="submit"]');
+        const contador = form.querySelector('[data-seleccionados]');
+
+        const actualizar = () => {
+            const marcadas = Array.from(casillas).filter(c => c.checked).length;
+            contador.textContent = marcadas;
+            boton.disabled = marcadas === 0 || !accion.value;
+            if (todos) {
+                todos.checked = marcadas > 0 && marcadas === casillas.length;
+                todos.indeterminate = marcadas > 0 && marcadas < casillas.length;
+            }
+        };
+
+        casillas.forEach(casilla => casilla.addEventListener('change', actualizar));
+        if (todos) {
+            todos.addEventListener('change', function() {
+                casillas.forEach(casilla => { casilla.checked = this.checked; });
+                actualizar();
+            });
+        }
+
+        // Solo se habilita (y se envía) el campo de valor de la acción elegida
+        accion.addEventListener('change', function() {
+            form.querySelectorAll('[data-accion]').forEach(campo => {
+                const activo = campo.dataset.accion === this.value;
+                const controles = campo.matches('input, select') ? [campo] : campo.querySelectorAll('input, select');
+                controles.forEach(c => { c.disabled = !activo; });
+                campo.classList.toggle('d-none', !activo);
+            });
+            actualizar();
+        });
+
+        form.addEventListener('submit', function(e) {
+            const marcadas = Array.from(casillas).filter(c => c.checked).length;
+            if (accion.value === 'eliminar' && !confirm(`¿Está seguro de que desea eliminar ${marcadas} entregables?`)) {
+                e.preventDefault();
+            }
+        });
+    });
+
+    // ============================================
+    // 24. AUTOCOMPLETE (FORM FOREIGN KEYS)
+    // ============================================
+    document.querySelectorAll('[data-autocompletar]').forEach(campo => {
+        const texto = campo.querySelector('input[type="text"]');
+        const valor = campo.querySelector('input[type="hidden"]');
+        const lista = campo.querySelector('.list-group');
+        let temporizador = null;
+        let peticion = null;
+
+        const cerrar = () => {
+            lista.classList.add('d-none');
+            lista.innerHTML = '';
+        };
+
+        const mostrar = resultados => {
+            lista.innerHTML = '';
+            resultados.forEach(resultado => {
+                const opcion = document.createElement('button');
+                opcion.type = 'button';
+                opcion.className = 'list-group-item list-group-item-action';
+                opcion.textContent = resultado.texto;
+                // mousedown: se adelanta al blur del campo, que cierra la lista
+                opcion.addEventListener('mousedown', e => {
+                    e.preventDefault();
+                    texto.value = resultado.texto;
+                    valor.value = resultado.id;
+                    texto.setCustomValidity('');
+                    cerrar();
+                });
+                lista.appendChild(opcion);
+            });
+            if (!resultados.length) {
+                lista.innerHTML = '<span class="list-group-item text-muted">Sin resultados</span>';
+            }
+            lista.classList.remove('d-none');
+        };
+
+        const buscar = () => {
+            if (peticion) {
+                peticion.abort();
+            }
+            peticion = new AbortController();
+            const url = `${campo.dataset.autocompletar}?q=${encodeURIComponent(texto.value.trim())}`;
+            fetch(url, { signal: peticion.signal, headers: { 'Accept': 'application/json' } })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(response.statusText);
+                    }
+                    return response.json();
+                })
+                .then(data => mostrar(data.resultados))
+                .catch(error => {
+                    if (error.name !== 'AbortError') {
+                        cerrar();
+                    }
+                });
+        };
+
+        texto.addEventListener('input', () => {
+            // El texto escrito deja de corresponder a la opción elegida: el
+            // formulario no se envía hasta elegir una (o vaciar el campo)
+            valor.value = '';
+            texto.setCustomValidity(texto.value.trim() ? 'Seleccione una opción de la lista.' : '');
+            clearTimeout(temporizador);
+            temporizador = setTimeout(buscar, 200);
+        });
+        texto.addEventListener('focus', () => {
+            if (!valor.value) {
+                buscar();
+            }
+        });
+        texto.addEventListener('blur', cerrar);
+        texto.addEventListener('keydown', e => {
+            if (e.key === 'Escape') {
+                cerrar();
+            }
+        });
+    });
+
+    // ============================================
+    // 25. CONSOLE WELCOME MESSAGE
     // ============================================
     console.log('%c¡Bienvenido al Sistema de Gestión de Entregables!', 
                 'color: #667eea; font-size: 20px; font-weight: bold;');
@@ -325,7 +486,7 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // ============================================
-// 23. UTILITY FUNCTIONS
+// 26. UTILITY FUNCTIONS
 // ============================================
 
 // Format currency